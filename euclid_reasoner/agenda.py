@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import time
+from typing import Any, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from .core import FactDelta, State
+from .memo import PrismMemo, child_delta, replay_delta
+from .prisms import Prism, PrismResult
+from .types import SearchStats
+
+
+class Agenda:
+    """Delta-driven scheduling of prisms over search states.
+
+    A prism that declares ``consumes`` has its activations cached per state.
+    When a child's delta leaves every consumed fact kind untouched, the
+    child inherits its parent's activations instead of re-deriving them;
+    otherwise the prism may update them from the delta (see
+    :meth:`Prism.update_activations`).  Only activations that produced a
+    child are kept for the children: facts only grow, so one that added
+    nothing is never fired again below that state.  Matching and firing
+    cost thus follow what changed rather than prisms x state size.
+    Prisms without a declaration are applied to every state as before.
+
+    With a ``memo``, prisms that declare a ``memo_key`` over the activations
+    held for a state replay the children memoized for an earlier state with
+    the same key.  With ``stats`` set,
+    per-prism call counts, children and wall time are recorded into it.
+    """
+
+    def __init__(
+        self,
+        prisms: Iterable[Prism],
+        stats: Optional[SearchStats] = None,
+        memo: Optional[PrismMemo] = None,
+    ) -> None:
+        self.prisms: List[Prism] = list(prisms)
+        self._by_name = {prism.name: prism for prism in self.prisms}
+        self.stats = stats
+        self.memo = memo
+        self.reused = 0
+        self.updated = 0
+        self.recomputed = 0
+        self.memo_hits = 0
+        self.memo_misses = 0
+
+    def activations(self, prism: Prism, state: State, delta: FactDelta) -> List[Any]:
+        key = f"agenda:{prism.name}"
+        cached = state.derived.get(key)
+        if cached is not None:
+            return cached
+
+        parent = state.parent
+        inherited = None if parent is None else parent.derived.get(key)
+        activations = None
+        if inherited is not None and state.extends_parent(delta):
+            if not delta.touches(prism.consumes):
+                self.reused += 1
+                activations = inherited
+            else:
+                activations = prism.update_activations(state, delta, inherited)
+                if activations is not None:
+                    self.updated += 1
+        if activations is None:
+            self.recomputed += 1
+            activations = prism.activations(state, delta)
+        state.derived[key] = activations
+        return activations
+
+    def _fire(self, prism: Prism, state: State, activations: List[Any]) -> Tuple[List[Any], List[PrismResult]]:
+        """Fire every activation; also return the ones that produced a child,
+        which replace the cached activations for the children to inherit."""
+        live: List[Any] = []
+        results: List[PrismResult] = []
+        for activation in activations:
+            children = prism.fire(state, activation)
+            if children:
+                live.append(activation)
+                results.extend(children)
+        state.derived[f"agenda:{prism.name}"] = live
+        return live, results
+
+    def _children(self, prism: Prism, state: State, delta: FactDelta) -> Tuple[int, Sequence[PrismResult]]:
+        """``(firings, children)`` of ``prism`` on ``state``."""
+        if prism.consumes is None:
+            return 1, prism.apply(state)
+        activations = self.activations(prism, state, delta)
+        memo = self.memo
+        key = None if memo is None else prism.memo_key(state, activations)
+        if memo is None or key is None:
+            return len(activations), self._fire(prism, state, activations)[1]
+
+        entry = memo.get(prism, state, key)
+        if entry is not None:
+            self.memo_hits += 1
+            live, deltas = entry
+            state.derived[f"agenda:{prism.name}"] = live
+            return 0, [replay_delta(state, child, self._by_name) for child in deltas]
+
+        self.memo_misses += 1
+        live, results = self._fire(prism, state, activations)
+        memo.put(prism, state, key, (live, tuple(child_delta(res) for res in results)))
+        return len(activations), results
+
+    def expand(self, state: State) -> Iterator[PrismResult]:
+        """Yield the children of ``state`` in prism order."""
+        delta = state.delta()
+        stats = self.stats
+        for prism in self.prisms:
+            started = time.perf_counter()
+            calls, results = self._children(prism, state, delta)
+            if stats is not None:
+                stats.record_prism(prism.name, calls, len(results), time.perf_counter() - started)
+            yield from results
@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import argparse
+import time
+from typing import Optional, Tuple
+
+from .core import State
+from .prisms import all_prisms
+from .search import beam_search
+from .types import SearchStats
+
+
+def _never(state: State) -> None:
+    return None
+
+
+def wide_start(points: int) -> State:
+    """A start state with ``points`` points already on ray BA, so every level
+    offers far more children than the beam keeps."""
+    state = State()
+    for idx in range(points):
+        state.facts.add_on_ray(f"D{idx:02d}", "BA")
+    return state
+
+
+def measure_search(
+    points: int, beam_k: int, steps: int, workers: Optional[int]
+) -> Tuple[float, float, SearchStats]:
+    """Run a goal-less beam search and return ``(wall seconds, CPU seconds
+    of this process, stats)``; with workers the CPU time is the part of the
+    search that does not run on the pool."""
+    started, cpu = time.perf_counter(), time.process_time()
+    result = beam_search(wide_start(points), all_prisms(), beam_k=beam_k, steps=steps, goal_fn=_never, workers=workers)
+    return time.perf_counter() - started, time.process_time() - cpu, result.stats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare serial and process-pool beam expansion on a wide beam.")
+    parser.add_argument("--points", type=int, default=24, help="Points placed on ray BA before the search.")
+    parser.add_argument("--beam", type=int, default=200)
+    parser.add_argument("--steps", type=int, default=6)
+    parser.add_argument("--workers", type=int, nargs="+", default=[2, 4, 8])
+    args = parser.parse_args()
+
+    serial, _, stats = measure_search(args.points, args.beam, args.steps, None)
+    print(f"  serial: {serial:6.2f} s, {stats.expansions} expansions")
+    for workers in args.workers:
+        elapsed, parent_cpu, stats = measure_search(args.points, args.beam, args.steps, workers)
+        print(
+            f"{workers:>2} procs: {elapsed:6.2f} s, x{serial / elapsed:.2f} vs serial, "
+            f"{parent_cpu:.2f} s in the parent process, "
+            f"{stats.states_from_parent} states rebuilt from their parent, {stats.states_shipped} shipped in full"
+        )
+
+
+if __name__ == "__main__":
+    main()
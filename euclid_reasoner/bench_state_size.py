@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+import argparse
+import tracemalloc
+from typing import Callable, Dict, Tuple
+
+from .agenda import Agenda
+from .bitset import BitsetFacts
+from .core import Facts, State
+from .prisms import all_prisms
+
+BACKENDS: Dict[str, Callable[[], Facts]] = {
+    "persistent": Facts,
+    "bitset": BitsetFacts,
+}
+
+
+def measure_bytes_per_state(facts_factory: Callable[[], Facts], levels: int = 4) -> Tuple[int, float]:
+    """Expand the full search tree ``levels`` deep, keeping every state alive,
+    and return ``(states, traced bytes per state)``."""
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        agenda = Agenda(all_prisms())
+        frontier = [State(facts=facts_factory())]
+        states = list(frontier)
+        for _ in range(levels):
+            frontier = [res.state for state in frontier for res in agenda.expand(state)]
+            states.extend(frontier)
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    return len(states), (after - before) / len(states)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure memory per search state for each Facts backend.")
+    parser.add_argument("--levels", type=int, default=4)
+    args = parser.parse_args()
+
+    for name, factory in BACKENDS.items():
+        count, per_state = measure_bytes_per_state(factory, args.levels)
+        print(f"{name:>10}: {count} states, {per_state:,.0f} bytes/state")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+from collections.abc import Set as AbstractSet
+from typing import Any, Generic, Iterable, Iterator, List, TypeVar
+
+from .core import Facts, SymbolTable
+from .persistent import zobrist_key
+
+T = TypeVar("T")
+
+
+class BitSet(AbstractSet, Generic[T]):
+    """A fact family stored as an ``int`` bitset over the problem's fact universe.
+
+    Bit ``i`` is set when ``symbols.fact(i)`` is present.  Python ints are
+    immutable, so ``fork`` is a pointer copy, ``len`` is a popcount and the
+    facts added since the fork are ``bits ^ origin``.  Iteration follows
+    fact ids, i.e. the order in which the problem first saw each fact.
+    """
+
+    __slots__ = ("_symbols", "_bits", "_origin", "_zhash")
+
+    def __init__(self, symbols: SymbolTable, items: Iterable[T] = ()) -> None:
+        self._symbols = symbols
+        self._bits = 0
+        self._origin = 0
+        self._zhash = 0
+        self.update(items)
+
+    @classmethod
+    def _from_iterable(cls, it: Iterable[T]) -> set:
+        return set(it)
+
+    def fork(self) -> "BitSet[T]":
+        child = object.__new__(BitSet)
+        child._symbols = self._symbols
+        child._bits = child._origin = self._bits
+        child._zhash = self._zhash
+        return child
+
+    @property
+    def bits(self) -> int:
+        return self._bits
+
+    @property
+    def depth(self) -> int:
+        return 0
+
+    @property
+    def hashed(self) -> bool:
+        return True
+
+    @property
+    def zobrist(self) -> int:
+        return self._zhash
+
+    def _decode(self, bits: int) -> List[T]:
+        fact = self._symbols.fact
+        items: List[T] = []
+        while bits:
+            low = bits & -bits
+            items.append(fact(low.bit_length() - 1))
+            bits ^= low
+        return items
+
+    def __contains__(self, item: object) -> bool:
+        key = self._symbols.lookup_fact(item)
+        return key is not None and (self._bits >> key) & 1 == 1
+
+    def __iter__(self) -> Iterator[T]:
+        return iter(self._decode(self._bits))
+
+    def __len__(self) -> int:
+        return self._bits.bit_count()
+
+    def __repr__(self) -> str:
+        return f"BitSet({set(self)!r})"
+
+    def add(self, item: T) -> bool:
+        """Add ``item``; return ``False`` if it was already present."""
+        bit = 1 << self._symbols.fact_id(item)
+        if self._bits & bit:
+            return False
+        self._bits |= bit
+        self._zhash ^= zobrist_key(item)
+        return True
+
+    def update(self, items: Iterable[T]) -> None:
+        for item in items:
+            self.add(item)
+
+    def delta(self) -> List[T]:
+        """Items added since this bitset was forked from its parent."""
+        return self._decode(self._bits ^ self._origin)
+
+
+class BitsetFacts(Facts):
+    """:class:`Facts` whose fact families are :class:`BitSet` s.
+
+    Same API as ``Facts``; only the storage differs, so prisms and searches
+    run unchanged on ``State(facts=BitsetFacts())``.  Indexes and equality
+    classes stay persistent maps.
+    """
+
+    def _family(self, items: Iterable[Any]) -> Any:
+        if isinstance(items, BitSet):
+            return items
+        return BitSet(self.symbols, items)
@@ -0,0 +1,269 @@
+from __future__ import annotations
+
+import hashlib
+import inspect
+import os
+import pickle
+import zlib
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Iterable, List, Optional, Tuple, Union
+
+from .core import State
+from .goals import goal_checker_prop9
+from .parallel import decode_state, encode_state
+from .prisms import Prism
+from .search import GoalFn, TranspositionTable, beam_search
+from .trace_schema import TraceRecord
+from .types import SearchResult
+
+# Bump whenever search semantics or the serialized layout change; it is
+# part of every key, so stale disk entries are simply never hit again.
+CACHE_FORMAT = 3
+
+# ``EUCLID_SOLVE_CACHE`` enables caching for ``solve_*`` calls that do not
+# pass ``cache``: "memory" keeps results in-process only, any other
+# non-empty value (except "0") is the directory of the on-disk tier.
+CACHE_ENV_VAR = "EUCLID_SOLVE_CACHE"
+
+CacheOption = Union[None, bool, "SolveCache"]
+
+
+# ---------- Keys ----------
+
+
+def _callable_id(fn: Any) -> Optional[str]:
+    """Stable identity of a goal, or ``None`` if it has none.
+
+    Goals that expose ``cache_id`` are identified by it.  Otherwise only
+    plain module-level functions qualify: the name of a partial, bound
+    method or callable instance says nothing about the arguments or state
+    that decide what it accepts.
+    """
+    explicit = getattr(fn, "cache_id", None)
+    if explicit is not None:
+        return f"id:{explicit}"
+    if not inspect.isfunction(fn):
+        return None
+    name = f"{fn.__module__}.{fn.__qualname__}"
+    if "<lambda>" in name or "<locals>" in name:
+        return None
+    return f"{name}@{getattr(fn, 'version', 0)}"
+
+
+def cache_key(
+    start: State,
+    prisms: Iterable[Prism],
+    goal_fn: GoalFn,
+    beam_k: int,
+    steps: int,
+) -> Optional[str]:
+    """Content hash of everything a deterministic ``beam_search`` depends on,
+    including the class of ``start``'s fact store.
+
+    ``None`` when the goal cannot be named stably (lambdas, closures): such
+    searches are never cached.
+    """
+    goal_id = _callable_id(goal_fn)
+    if goal_id is None:
+        return None
+    prism_ids = tuple(f"{type(p).__module__}.{type(p).__qualname__}:{p.name}@{p.version}" for p in prisms)
+    payload = (CACHE_FORMAT, encode_state(start), tuple(start.trace), prism_ids, goal_id, beam_k, steps)
+    return hashlib.sha256(repr(payload).encode("utf-8")).hexdigest()
+
+
+# ---------- Serialization ----------
+
+
+def _encode_chain(state: State) -> Tuple[Any, ...]:
+    # Deferred steps are rendered here: a cached result's trace is read
+    # anyway and rendering removes the dependency on prism instances.
+    if state.trace_head is None:
+        return ()
+    return tuple(
+        ("message", node.message) if not node.is_step else ("step", node.step, node.in_trace)
+        for node in state.trace_head.chain()
+    )
+
+
+def dumps_result(result: SearchResult) -> bytes:
+    """Compact, self-contained encoding of ``result``."""
+    payload = (
+        CACHE_FORMAT,
+        result.solved,
+        result.target,
+        encode_state(result.state),
+        _encode_chain(result.state),
+        result.stats,
+    )
+    return zlib.compress(pickle.dumps(payload, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+def loads_result(data: bytes) -> SearchResult:
+    version, solved, target, state_enc, chain, stats = pickle.loads(zlib.decompress(data))
+    if version != CACHE_FORMAT:
+        raise ValueError(f"unsupported solve cache format {version}")
+    state = decode_state(state_enc)
+    for kind, *payload in chain:
+        if kind == "message":
+            state.add_trace(payload[0])
+        else:
+            step, in_trace = payload
+            state.trace_head = TraceRecord(state.trace_head, step=step, in_trace=in_trace)
+    return SearchResult(solved, state, target, stats)
+
+
+# ---------- Cache ----------
+
+
+class SolveCache:
+    """Two-tier cache of search results keyed by :func:`cache_key`.
+
+    Both tiers hold encoded results, so every hit decodes a fresh
+    ``SearchResult`` that the caller may modify.  The memory tier is an LRU;
+    with ``directory`` set, results are also written there as compressed
+    files, and once the directory exceeds ``max_bytes`` the least recently
+    used files are deleted.
+    """
+
+    def __init__(
+        self,
+        directory: Optional[Union[str, Path]] = None,
+        *,
+        max_entries: int = 32,
+        max_bytes: int = 64 * 1024 * 1024,
+    ) -> None:
+        self.directory = None if directory is None else Path(directory)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._memory: "OrderedDict[str, bytes]" = OrderedDict()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def _path(self, key: str) -> Path:
+        assert self.directory is not None
+        return self.directory / f"{key}.bin"
+
+    def get(self, key: str) -> Optional[SearchResult]:
+        data = self._memory.get(key)
+        if data is not None:
+            self._memory.move_to_end(key)
+            self.hits += 1
+            return loads_result(data)
+        if self.directory is not None:
+            path = self._path(key)
+            try:
+                data = path.read_bytes()
+                result = loads_result(data)
+            except (OSError, ValueError, EOFError, pickle.UnpicklingError, zlib.error):
+                result = None
+            if result is not None:
+                os.utime(path)
+                self._remember(key, data)
+                self.disk_hits += 1
+                return result
+        self.misses += 1
+        return None
+
+    def put(self, key: str, result: SearchResult) -> None:
+        data = dumps_result(result)
+        self._remember(key, data)
+        if self.directory is None:
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self._path(key)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+        self._evict_disk()
+
+    def _remember(self, key: str, data: bytes) -> None:
+        self._memory[key] = data
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _evict_disk(self) -> None:
+        assert self.directory is not None
+        entries: List[Tuple[float, int, Path]] = []
+        for path in self.directory.glob("*.bin"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries, key=lambda entry: entry[0]):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+
+    def clear(self) -> None:
+        self._memory.clear()
+        if self.directory is not None:
+            for path in self.directory.glob("*.bin"):
+                path.unlink(missing_ok=True)
+
+
+_ENV_CACHE: Optional[Tuple[str, SolveCache]] = None
+
+
+def default_cache() -> Optional[SolveCache]:
+    """The process-wide cache configured through ``EUCLID_SOLVE_CACHE``."""
+    global _ENV_CACHE
+    setting = os.environ.get(CACHE_ENV_VAR, "").strip()
+    if setting in ("", "0"):
+        return None
+    if _ENV_CACHE is None or _ENV_CACHE[0] != setting:
+        _ENV_CACHE = (setting, SolveCache(None if setting == "memory" else setting))
+    return _ENV_CACHE[1]
+
+
+def _resolve(cache: CacheOption) -> Optional[SolveCache]:
+    if cache is None:
+        return default_cache()
+    if cache is False:
+        return None
+    if cache is True:
+        return default_cache() or SolveCache()
+    return cache
+
+
+def cached_beam_search(
+    start: State,
+    prisms: Iterable[Prism],
+    *,
+    goal_fn: GoalFn = goal_checker_prop9,
+    beam_k: int = 20,
+    steps: int = 10,
+    transpositions: Optional[TranspositionTable] = None,
+    cache: CacheOption = None,
+) -> SearchResult:
+    """``beam_search`` through a :class:`SolveCache`.
+
+    ``cache=None`` follows ``EUCLID_SOLVE_CACHE``, ``False`` disables
+    caching and ``True`` uses the configured cache or an in-memory one.
+    Searches given their own ``transpositions`` table always run, since the
+    caller expects it to be filled.
+    """
+    prisms = list(prisms)
+    store = _resolve(cache) if transpositions is None else None
+    key = None if store is None else cache_key(start, prisms, goal_fn, beam_k, steps)
+    if store is not None and key is not None:
+        hit = store.get(key)
+        if hit is not None:
+            return hit
+
+    result = beam_search(
+        start,
+        prisms=prisms,
+        beam_k=beam_k,
+        steps=steps,
+        goal_fn=goal_fn,
+        transpositions=transpositions,
+    )
+    if store is not None and key is not None:
+        store.put(key, result)
+    return result
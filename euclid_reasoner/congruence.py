@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from .core import Facts, Segment, State, Triangle, match_sss
+from .persistent import PersistentMap
+
+Mapping = Tuple[Tuple[str, str], ...]
+TrianglePair = Tuple[Triangle, Triangle]
+
+_CACHE_KEY = "sss"
+
+
+@dataclass
+class SSSIndex:
+    """Incrementally maintained SSS matches of one state.
+
+    Triangles are bucketed by their side-class signature (the sorted side
+    class representatives; a side in no equality stands for itself).  Two
+    triangles can only be SSS-congruent if their signatures agree, so a
+    child state re-examines only the pairs in the buckets of triangles that
+    are new or whose side classes were merged by the child's delta.
+    """
+
+    triangle_count: int
+    eqseg_count: int
+    position: PersistentMap[Triangle, int]
+    signature: PersistentMap[Triangle, Tuple[Segment, ...]]
+    by_class: PersistentMap[Segment, Tuple[Triangle, ...]]
+    buckets: PersistentMap[Tuple[Segment, ...], Tuple[Triangle, ...]]
+    matches: PersistentMap[TrianglePair, Mapping]
+
+    @classmethod
+    def empty(cls) -> "SSSIndex":
+        return cls(0, 0, PersistentMap(), PersistentMap(), PersistentMap(), PersistentMap(), PersistentMap())
+
+    def fork(self) -> "SSSIndex":
+        return SSSIndex(
+            self.triangle_count,
+            self.eqseg_count,
+            self.position.fork(),
+            self.signature.fork(),
+            self.by_class.fork(),
+            self.buckets.fork(),
+            self.matches.fork(),
+        )
+
+    def ordered_matches(self) -> List[Tuple[Triangle, Triangle, Mapping]]:
+        """Matches in triangle-list order, as a full O(T^2) scan would find them."""
+        position = self.position
+        pairs = sorted(self.matches, key=lambda pair: (position[pair[0]], position[pair[1]]))
+        return [(t1, t2, self.matches[(t1, t2)]) for t1, t2 in pairs]
+
+
+def _side_keys(facts: Facts, tri: Triangle) -> Tuple[Segment, ...]:
+    find = facts.seg_classes.find
+    keys = []
+    for side in facts.symbols.sides(tri.vertices):
+        root = find(side)
+        keys.append(side if root is None else root)
+    return tuple(keys)
+
+
+def _update(
+    index: SSSIndex,
+    facts: Facts,
+    new_triangles: List[Triangle],
+    affected: Dict[Triangle, None],
+) -> None:
+    touched: Dict[Triangle, None] = dict(affected)
+    for tri in new_triangles:
+        if tri not in index.position:
+            index.position[tri] = len(index.position)
+            touched[tri] = None
+
+    for tri in touched:
+        keys = _side_keys(facts, tri)
+        signature = tuple(sorted(keys))
+        index.signature[tri] = signature
+        for key in set(keys):
+            members = index.by_class.get(key, ())
+            if tri not in members:
+                index.by_class[key] = members + (tri,)
+        bucket = index.buckets.get(signature, ())
+        if tri not in bucket:
+            index.buckets[signature] = bucket + (tri,)
+
+    checked = set()
+    for tri in touched:
+        signature = index.signature[tri]
+        for other in index.buckets[signature]:
+            if other == tri or index.signature[other] != signature:
+                continue
+            if index.position[other] < index.position[tri]:
+                pair = (other, tri)
+            else:
+                pair = (tri, other)
+            if pair in checked:
+                continue
+            checked.add(pair)
+            mapping = match_sss(facts, pair[0], pair[1])
+            if mapping is not None:
+                index.matches[pair] = mapping
+
+
+def _build(state: State) -> SSSIndex:
+    index = SSSIndex.empty()
+    _update(index, state.facts, list(state.triangles), {})
+    return index
+
+
+def _extend(parent_index: SSSIndex, parent: State, state: State) -> Optional[SSSIndex]:
+    delta = state.delta()
+    if not state.extends_parent(delta):
+        # The parent changed after it was copied; its delta is not ours.
+        return None
+    new_triangles = list(delta.triangles)
+    new_pairs = delta.eq_segs
+
+    index = parent_index.fork()
+    parent_find = parent.facts.seg_classes.find
+    affected: Dict[Triangle, None] = {}
+    for pair in new_pairs:
+        for seg in pair:
+            root = parent_find(seg)
+            for tri in index.by_class.get(seg if root is None else root, ()):
+                affected[tri] = None
+    _update(index, state.facts, new_triangles, affected)
+    return index
+
+
+def _is_fresh(state: State) -> bool:
+    index = state.derived.get(_CACHE_KEY)
+    return (
+        index is not None
+        and index.triangle_count == len(state.triangles)
+        and index.eqseg_count == len(state.facts.eq_segs)
+    )
+
+
+def sss_index(state: State) -> SSSIndex:
+    """Return the (cached) SSS index of ``state``, built from its nearest
+    ancestor with an up-to-date index by replaying each generation's delta."""
+    lineage: List[State] = []
+    node: Optional[State] = state
+    while node is not None and not _is_fresh(node):
+        lineage.append(node)
+        node = node.parent
+
+    index = None if node is None else node.derived[_CACHE_KEY]
+    for current in reversed(lineage):
+        parent = current.parent
+        if index is not None and parent is not None:
+            index = _extend(index, parent, current)
+        if index is None:
+            index = _build(current)
+        index.triangle_count = len(current.triangles)
+        index.eqseg_count = len(current.facts.eq_segs)
+        current.derived[_CACHE_KEY] = index
+    return state.derived[_CACHE_KEY]
@@ -1,9 +1,14 @@
 from __future__ import annotations
 
-from dataclasses import dataclass, field
-from typing import Any, Dict, List, Optional, Set, Tuple
+import bisect
+import sys
+from collections.abc import Sequence
+from dataclasses import InitVar, dataclass, field
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
 
-from .trace_schema import TraceStep
+from .equality import EqualityClosure
+from .persistent import PersistentList, PersistentMap, PersistentSet
+from .trace_schema import TraceRecord, TraceStep, build_step
 
 
 # ---------- Geometry primitives ----------
@@ -25,10 +30,23 @@ class Segment:
 
 @dataclass(frozen=True)
 class Angle:
+    """The angle at vertex ``v`` between the rays towards ``a`` and ``c``.
+
+    Like :class:`Segment`, angles are stored in canonical form with the arm
+    points in name order, so ``Angle(a, v, c) == Angle(c, v, a)`` and every
+    geometric angle has a single spelling in the fact store.
+    """
+
     a: str
     v: str
     c: str
 
+    def __post_init__(self) -> None:
+        if self.a > self.c:
+            a, c = self.c, self.a
+            object.__setattr__(self, "a", a)
+            object.__setattr__(self, "c", c)
+
     def __str__(self) -> str:
         return f"ang({self.a}{self.v}{self.c})"
 
@@ -42,6 +60,125 @@ class Triangle:
         return f"{self.name}({''.join(self.vertices)})"
 
 
+# ---------- Symbol table ----------
+
+class SymbolTable:
+    """Per-problem interning of point names and geometric primitives.
+
+    Each distinct point name, segment, angle and triangle is built once and
+    handed out as a shared instance with a small integer id, in first-seen
+    order (points and primitives are numbered separately).  Prisms ask the
+    table instead of constructing primitives, so the hot loop skips
+    ``Segment`` normalisation, composed names like ``F_D1_E_D1`` are not
+    rebuilt, and dict lookups on facts hit the identity fast path.  A fact
+    store and all its copies share one table.
+    """
+
+    def __init__(self) -> None:
+        self._names: Dict[Tuple[str, ...], str] = {}
+        self._points: Dict[str, int] = {}
+        self._segments: Dict[Tuple[str, str], Segment] = {}
+        self._angles: Dict[Tuple[str, str, str], Angle] = {}
+        self._triangles: Dict[Tuple[str, Tuple[str, str, str]], Triangle] = {}
+        self._sides: Dict[Tuple[str, str, str], Tuple[Segment, Segment, Segment]] = {}
+        self._ids: Dict[Any, int] = {}
+        self._order_keys: Dict[Any, str] = {}
+        self._fact_ids: Dict[Any, int] = {}
+        self._facts: List[Any] = []
+
+    def name(self, *parts: str) -> str:
+        """The interned concatenation of ``parts``."""
+        name = self._names.get(parts)
+        if name is None:
+            name = self._names[parts] = sys.intern("".join(parts))
+        return name
+
+    def point(self, name: str) -> str:
+        """Register ``name`` as a point and return it."""
+        if name not in self._points:
+            self._points[name] = len(self._points)
+        return name
+
+    def point_id(self, name: str) -> int:
+        self.point(name)
+        return self._points[name]
+
+    def segment(self, p: str, q: str) -> Segment:
+        seg = self._segments.get((p, q))
+        if seg is None:
+            seg = self._segments.get((q, p))
+            if seg is None:
+                seg = self._intern(Segment(self.point(p), self.point(q)))
+            self._segments[p, q] = seg
+        return seg
+
+    def angle(self, a: str, v: str, c: str) -> Angle:
+        ang = self._angles.get((a, v, c))
+        if ang is None:
+            ang = self._angles.get((c, v, a))
+            if ang is None:
+                ang = self._intern(Angle(self.point(a), self.point(v), self.point(c)))
+            self._angles[a, v, c] = ang
+        return ang
+
+    def triangle(self, name: str, vertices: Tuple[str, str, str]) -> Triangle:
+        key = (name, vertices)
+        tri = self._triangles.get(key)
+        if tri is None:
+            tri = self._triangles[key] = self._intern(Triangle(name, tuple(self.point(v) for v in vertices)))
+        return tri
+
+    def sides(self, vertices: Tuple[str, str, str]) -> Tuple[Segment, Segment, Segment]:
+        """Interned ``triangle_sides(vertices)``."""
+        sides = self._sides.get(vertices)
+        if sides is None:
+            a, b, c = vertices
+            sides = self._sides[vertices] = (self.segment(a, b), self.segment(b, c), self.segment(c, a))
+        return sides
+
+    def angles(self, vertices: Tuple[str, str, str]) -> Tuple[Angle, Angle, Angle]:
+        """Interned ``triangle_angles(vertices)``."""
+        a, b, c = vertices
+        return (self.angle(b, a, c), self.angle(a, b, c), self.angle(a, c, b))
+
+    def _intern(self, primitive: Any) -> Any:
+        self.id(primitive)
+        return primitive
+
+    def id(self, primitive: Any) -> int:
+        """Small integer id of a segment, angle or triangle."""
+        key = self._ids.get(primitive)
+        if key is None:
+            key = self._ids[primitive] = len(self._ids)
+        return key
+
+    def fact_id(self, fact: Any) -> int:
+        """Position of ``fact`` in the problem's fact universe (assigned on first use)."""
+        key = self._fact_ids.get(fact)
+        if key is None:
+            key = self._fact_ids[fact] = len(self._facts)
+            self._facts.append(fact)
+        return key
+
+    def lookup_fact(self, fact: Any) -> Optional[int]:
+        """Like :meth:`fact_id`, but ``None`` for facts never seen."""
+        return self._fact_ids.get(fact)
+
+    def fact(self, key: int) -> Any:
+        return self._facts[key]
+
+    def ordered(self, x: Any, y: Any) -> Tuple[Any, Any]:
+        """``(x, y)`` in canonical fact order (by rendered name, cached)."""
+        keys = self._order_keys
+        kx = keys.get(x)
+        if kx is None:
+            kx = keys[x] = str(x)
+        ky = keys.get(y)
+        if ky is None:
+            ky = keys[y] = str(y)
+        return (x, y) if kx <= ky else (y, x)
+
+
 # ---------- Facts (atomic) ----------
 
 @dataclass(frozen=True)
@@ -84,31 +221,107 @@ class TriangleCorrespondence:
 
 @dataclass
 class Facts:
-    on_rays: Set[OnRay] = field(default_factory=set)
-    eq_segs: Set[Tuple[Segment, Segment]] = field(default_factory=set)
-    eq_angs: Set[Tuple[Angle, Angle]] = field(default_factory=set)
-    congruent: Set[Congruent] = field(default_factory=set)
-    correspondences: Set[TriangleCorrespondence] = field(default_factory=set)
+    on_rays: Set[OnRay] = field(default_factory=PersistentSet)
+    eq_segs: Set[Tuple[Segment, Segment]] = field(default_factory=PersistentSet)
+    eq_angs: Set[Tuple[Angle, Angle]] = field(default_factory=PersistentSet)
+    congruent: Set[Congruent] = field(default_factory=PersistentSet)
+    correspondences: Set[TriangleCorrespondence] = field(default_factory=PersistentSet)
+
+    # Equivalence classes closed under transitivity and secondary indexes,
+    # all derived from the sets above and maintained by the add_* methods.
+    seg_classes: EqualityClosure[Segment] = field(init=False, repr=False, compare=False)
+    ang_classes: EqualityClosure[Angle] = field(init=False, repr=False, compare=False)
+    _points_by_ray: PersistentMap[str, Tuple[str, ...]] = field(init=False, repr=False, compare=False)
+    _rays_by_point: PersistentMap[str, Tuple[str, ...]] = field(init=False, repr=False, compare=False)
+    _eqangs_by_vertex: PersistentMap[str, Tuple[Tuple[Angle, Angle], ...]] = field(
+        init=False, repr=False, compare=False
+    )
+    _segments_by_point: PersistentMap[str, Tuple[Segment, ...]] = field(init=False, repr=False, compare=False)
+
+    # Interned primitives, shared by every copy of this fact store.
+    symbols: SymbolTable = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        self.symbols = SymbolTable()
+        for name in _FACT_FAMILIES:
+            setattr(self, name, self._family(getattr(self, name)))
+        self.seg_classes = EqualityClosure()
+        self.ang_classes = EqualityClosure()
+        self._points_by_ray = PersistentMap()
+        self._rays_by_point = PersistentMap()
+        self._eqangs_by_vertex = PersistentMap()
+        self._segments_by_point = PersistentMap()
+        for fact in self.on_rays:
+            self._index_on_ray(fact)
+        for seg1, seg2 in self.eq_segs:
+            self._index_eqseg(seg1, seg2)
+        for pair in self.eq_angs:
+            self._index_eqang(pair)
+
+    def _family(self, items: Iterable[Any]) -> Any:
+        """The collection a fact family is stored in; see ``bitset.BitsetFacts``."""
+        return items if isinstance(items, PersistentSet) else PersistentSet(items)
+
+    def copy(self) -> "Facts":
+        """Return a child fact store sharing every current fact with ``self``."""
+        child = object.__new__(type(self))
+        for name in _FACT_FAMILIES + _FACT_INDEXES:
+            setattr(child, name, getattr(self, name).fork())
+        child.symbols = self.symbols
+        return child
+
+    # ----- index maintenance -----
+
+    def _index_on_ray(self, fact: OnRay) -> None:
+        points = self._points_by_ray.get(fact.ray, ())
+        idx = bisect.bisect_left(points, fact.point)
+        self._points_by_ray[fact.ray] = points[:idx] + (fact.point,) + points[idx:]
+        rays = self._rays_by_point.get(fact.point, ())
+        idx = bisect.bisect_left(rays, fact.ray)
+        self._rays_by_point[fact.point] = rays[:idx] + (fact.ray,) + rays[idx:]
+
+    def _index_eqseg(self, seg1: Segment, seg2: Segment) -> None:
+        self.seg_classes.union(seg1, seg2)
+        for seg in dict.fromkeys((seg1, seg2)):
+            for point in (seg.p, seg.q):
+                known = self._segments_by_point.get(point, ())
+                if seg not in known:
+                    self._segments_by_point[point] = known + (seg,)
+
+    def _index_eqang(self, pair: Tuple[Angle, Angle]) -> None:
+        self.ang_classes.union(pair[0], pair[1])
+        for vertex in dict.fromkeys((pair[0].v, pair[1].v)):
+            self._eqangs_by_vertex[vertex] = self._eqangs_by_vertex.get(vertex, ()) + (pair,)
+
+    def fingerprint(self) -> int:
+        """Zobrist hash of the fact set; equal fact sets hash equally."""
+        value = 0
+        for name in _FACT_FAMILIES:
+            value ^= getattr(self, name).zobrist
+        return value
 
     def add_on_ray(self, point: str, ray: str) -> bool:
         fact = OnRay(point, ray)
         if fact in self.on_rays:
             return False
         self.on_rays.add(fact)
+        self._index_on_ray(fact)
         return True
 
     def add_eqseg(self, seg1: Segment, seg2: Segment) -> bool:
-        pair = tuple(sorted((seg1, seg2), key=str))
+        pair = self.symbols.ordered(seg1, seg2)
         if pair in self.eq_segs:
             return False
         self.eq_segs.add(pair)
+        self._index_eqseg(*pair)
         return True
 
     def add_eqang(self, ang1: Angle, ang2: Angle) -> bool:
-        pair = tuple(sorted((ang1, ang2), key=str))
+        pair = self.symbols.ordered(ang1, ang2)
         if pair in self.eq_angs:
             return False
         self.eq_angs.add(pair)
+        self._index_eqang(pair)
         return True
 
     def add_congruent(self, congruent: Congruent) -> bool:
@@ -124,52 +337,254 @@ class Facts:
         return True
 
     def has_eqseg(self, seg1: Segment, seg2: Segment) -> bool:
-        pair = tuple(sorted((seg1, seg2), key=str))
-        return pair in self.eq_segs
+        """True if the segments are equal, directly or through transitivity."""
+        return self.seg_classes.same(seg1, seg2)
+
+    def has_eqang(self, ang1: Angle, ang2: Angle) -> bool:
+        """True if the angles are equal, directly or through transitivity.
+
+        Angles are canonical, so either spelling of each angle works; the
+        answer is two union-find lookups, independent of ``len(eq_angs)``.
+        """
+        return self.ang_classes.same(ang1, ang2)
 
     def all_points_on_ray(self, ray: str) -> List[str]:
-        return [fact.point for fact in sorted(self.on_rays, key=lambda r: r.point) if fact.ray == ray]
+        """Points on ``ray`` in name order, read from the per-ray index."""
+        return list(self._points_by_ray.get(ray, ()))
+
+    def rays_through(self, point: str) -> List[str]:
+        """Rays ``point`` has been placed on, in name order, read from the per-point index."""
+        return list(self._rays_by_point.get(point, ()))
 
     def eqang_with_vertex(self, vertex: str) -> List[Tuple[Angle, Angle]]:
-        return [pair for pair in self.eq_angs if pair[0].v == vertex or pair[1].v == vertex]
+        """Angle equalities with at least one angle at ``vertex``."""
+        return list(self._eqangs_by_vertex.get(vertex, ()))
+
+    def segments_at(self, point: str) -> List[Segment]:
+        """Segments ending at ``point`` that take part in some equality."""
+        return list(self._segments_by_point.get(point, ()))
+
+    def triangle_side_classes(self, tri: Triangle) -> Tuple[Optional[Segment], ...]:
+        """Equality-class representatives of the sides of ``tri`` (None if unknown)."""
+        find = self.seg_classes.find
+        return tuple(find(side) for side in self.symbols.sides(tri.vertices))
+
+
+_FACT_FAMILIES = ("on_rays", "eq_segs", "eq_angs", "congruent", "correspondences")
+FACT_KINDS = _FACT_FAMILIES + ("triangles",)
+_FACT_INDEXES = (
+    "seg_classes",
+    "ang_classes",
+    "_points_by_ray",
+    "_rays_by_point",
+    "_eqangs_by_vertex",
+    "_segments_by_point",
+)
+
+
+@dataclass(frozen=True)
+class FactDelta:
+    """Facts and triangles a state added on top of its parent."""
+
+    on_rays: Tuple[OnRay, ...] = ()
+    eq_segs: Tuple[Tuple[Segment, Segment], ...] = ()
+    eq_angs: Tuple[Tuple[Angle, Angle], ...] = ()
+    congruent: Tuple[Congruent, ...] = ()
+    correspondences: Tuple[TriangleCorrespondence, ...] = ()
+    triangles: Tuple[Triangle, ...] = ()
+
+    def kinds(self) -> Set[str]:
+        """Names (from ``FACT_KINDS``) of the fact kinds that changed."""
+        return {kind for kind in FACT_KINDS if getattr(self, kind)}
+
+    def touches(self, kinds: Tuple[str, ...]) -> bool:
+        return any(getattr(self, kind) for kind in kinds)
+
+    def __bool__(self) -> bool:
+        return self.touches(FACT_KINDS)
 
 
 # ---------- State + hierarchical trace (HPG backbone) ----------
 
 
+class TraceView(Sequence):
+    """Sequence over a state's trace chain that renders entries on access.
+
+    ``steps=True`` lists the hierarchical steps as :class:`TraceStep`
+    objects, ``steps=False`` the human-readable labels.  ``len`` never
+    renders anything, iteration streams oldest-first and indexing walks back
+    from the newest node, so ``view[-1]`` is O(1).  The view follows the
+    state, and ``append`` adds to its chain like the lists it replaces.
+    """
+
+    __slots__ = ("_state", "_steps")
+
+    def __init__(self, state: "State", *, steps: bool) -> None:
+        self._state = state
+        self._steps = steps
+
+    @property
+    def _head(self) -> Optional[TraceRecord]:
+        return self._state.trace_head
+
+    def _member(self, node: TraceRecord) -> bool:
+        return node.is_step if self._steps else node.in_trace
+
+    def _render(self, node: TraceRecord) -> Any:
+        return node.step if self._steps else node.label
+
+    def _nodes(self, stop: Optional[TraceRecord] = None) -> Iterator[TraceRecord]:
+        if self._head is None:
+            return iter(())
+        return (node for node in self._head.chain(stop) if self._member(node))
+
+    def __len__(self) -> int:
+        head = self._head
+        if head is None:
+            return 0
+        return head.step_length if self._steps else head.trace_length
+
+    def __getitem__(self, index: Any) -> Any:
+        if isinstance(index, slice):
+            return list(self)[index]
+        size = len(self)
+        if index < 0:
+            index += size
+        if not 0 <= index < size:
+            raise IndexError("trace index out of range")
+        remaining = size - 1 - index
+        node = self._head
+        while node is not None:
+            if self._member(node):
+                if remaining == 0:
+                    return self._render(node)
+                remaining -= 1
+            node = node.parent
+        raise IndexError("trace index out of range")
+
+    def __iter__(self) -> Iterator[Any]:
+        return map(self._render, self._nodes())
+
+    def delta(self) -> List[Any]:
+        """Rendered entries added since the owning state was copied."""
+        return [self._render(node) for node in self._nodes(self._state.trace_origin)]
+
+    def append(self, entry: Any) -> None:
+        """Append a label (``trace``) or a :class:`TraceStep` (``htrace``)."""
+        if self._steps:
+            self._state.add_hstep(entry)
+        else:
+            self._state.add_trace(entry)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (TraceView, list, tuple)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return f"TraceView({list(self)!r})"
+
+
 @dataclass
 class State:
     facts: Facts = field(default_factory=Facts)
-    triangles: List[Triangle] = field(default_factory=list)
+    triangles: PersistentList[Triangle] = field(default_factory=lambda: PersistentList(hashed=True))
     mode: str = "Seed"
 
-    # Human-readable trace (kept for backwards compatibility)
-    trace: List[str] = field(default_factory=list)
-
-    # Machine-readable hierarchical trace (for HPG export)
-    htrace: List[TraceStep] = field(default_factory=list)
+    # Initial labels and TraceSteps, accepted as before traces became a
+    # chain; they seed ``trace_head``.  Once constructed, ``trace`` and
+    # ``htrace`` read as the views defined below the class.
+    trace: InitVar[Optional[Iterable[str]]] = None
+    htrace: InitVar[Optional[Iterable[TraceStep]]] = None
+
+    # Newest node of the parent-linked trace chain, and the node this state
+    # was copied at.  Read the chain through the ``trace`` (labels) and
+    # ``htrace`` (TraceSteps) views, which render deferred steps on demand.
+    trace_head: Optional[TraceRecord] = field(default=None, repr=False, compare=False)
+    trace_origin: Optional[TraceRecord] = field(default=None, repr=False, compare=False)
+
+    # State this one was copied from; its delta is what incremental
+    # analyses (e.g. SSS detection) replay.
+    parent: Optional["State"] = field(default=None, repr=False, compare=False)
+
+    # Per-state caches of derived structures, keyed by the module owning them.
+    derived: Dict[str, Any] = field(default_factory=dict, init=False, repr=False, compare=False)
+
+    def __post_init__(self, trace: Optional[Iterable[str]], htrace: Optional[Iterable[TraceStep]]) -> None:
+        if not isinstance(self.triangles, PersistentList) or not self.triangles.hashed:
+            self.triangles = PersistentList(self.triangles, hashed=True)
+        for step in htrace or ():
+            self.add_hstep(step)
+        for message in trace or ():
+            self.add_trace(message)
+
+    @property
+    def symbols(self) -> SymbolTable:
+        """The problem's symbol table (shared along the whole search)."""
+        return self.facts.symbols
+
+    def iter_steps(self) -> Iterator[TraceStep]:
+        """Stream the hierarchical trace oldest-first, rendering as it goes."""
+        return iter(self.htrace)
 
     def copy(self) -> "State":
+        """Return a child state in O(1): facts, triangles and the trace chain
+        are shared with ``self`` and the child only stores what it adds
+        afterwards."""
         return State(
-            facts=Facts(
-                on_rays=set(self.facts.on_rays),
-                eq_segs=set(self.facts.eq_segs),
-                eq_angs=set(self.facts.eq_angs),
-                congruent=set(self.facts.congruent),
-                correspondences=set(self.facts.correspondences),
-            ),
-            triangles=list(self.triangles),
+            facts=self.facts.copy(),
+            triangles=self.triangles.fork(),
             mode=self.mode,
-            trace=list(self.trace),
-            htrace=list(self.htrace),
+            trace_head=self.trace_head,
+            trace_origin=self.trace_head,
+            parent=self,
+        )
+
+    def delta(self) -> FactDelta:
+        """What this state added since it was copied (everything for a root)."""
+        facts = self.facts
+        return FactDelta(
+            **{kind: tuple(getattr(facts, kind).delta()) for kind in _FACT_FAMILIES},
+            triangles=tuple(self.triangles.delta()),
         )
 
+    def extends_parent(self, delta: FactDelta) -> bool:
+        """True if ``parent`` plus ``delta`` is exactly this state.
+
+        False for roots and when the parent was modified after the copy, in
+        which case incremental analyses must start from scratch.
+        """
+        parent = self.parent
+        if parent is None:
+            return False
+        if len(self.triangles) - len(delta.triangles) != len(parent.triangles):
+            return False
+        return all(
+            len(getattr(self.facts, kind)) - len(getattr(delta, kind)) == len(getattr(parent.facts, kind))
+            for kind in _FACT_FAMILIES
+        )
+
+    def fingerprint(self) -> int:
+        """Canonical hash over facts and distinct triangles.
+
+        Mode and traces are ignored: two states reached through different
+        prism orders but holding the same facts share a fingerprint.
+        """
+        return self.facts.fingerprint() ^ self.triangles.zobrist
+
     def add_trace(self, message: str) -> None:
         """Append a human-readable message to the linear trace."""
-        self.trace.append(message)
+        self.trace_head = TraceRecord(self.trace_head, message=message)
 
     def add_hstep(self, step: TraceStep) -> None:
-        self.htrace.append(step)
+        self.trace_head = TraceRecord(self.trace_head, step=step, in_trace=False)
+
+    def defer_step(self, prism: Any, activation: Any) -> None:
+        """Record that ``prism`` fired on ``activation``; the step's strings
+        are built by ``prism.render_step`` only when the trace is read."""
+        self.trace_head = TraceRecord(self.trace_head, prism=prism, activation=activation)
 
     def add_step(
         self,
@@ -190,27 +605,40 @@ class State:
         meta: Optional[Dict[str, Any]] = None,
     ) -> None:
         """Append both human-readable and structured trace steps."""
-        self.trace.append(label)
-        step_id = f"hstep:{len(self.htrace)}"
-        self.add_hstep(
-            TraceStep(
-                id=step_id,
-                prism=prism,
-                label=label,
-                space=space,
-                uses=uses or [],
-                creates=creates or [],
-                asserts=asserts or [],
-                rewrites=rewrites or [],
-                used_facts=used_facts or [],
-                created_objects=created_objects or [],
-                derived_facts=derived_facts or [],
-                phase=phase,
-                granularity=granularity,
-                parents=parents or [],
-                meta={k: str(v) for k, v in (meta or {}).items()},
-            )
+        step = build_step(
+            f"hstep:{len(self.htrace)}",
+            prism=prism,
+            label=label,
+            space=space,
+            uses=uses,
+            creates=creates,
+            asserts=asserts,
+            rewrites=rewrites,
+            used_facts=used_facts,
+            created_objects=created_objects,
+            derived_facts=derived_facts,
+            phase=phase,
+            granularity=granularity,
+            parents=parents,
+            meta=meta,
         )
+        self.trace_head = TraceRecord(self.trace_head, step=step)
+
+
+def _trace(self: State) -> TraceView:
+    """Human-readable trace (kept for backwards compatibility)."""
+    return TraceView(self, steps=False)
+
+
+def _htrace(self: State) -> TraceView:
+    """Machine-readable hierarchical trace (for HPG export)."""
+    return TraceView(self, steps=True)
+
+
+# Installed after @dataclass has turned the ``trace``/``htrace`` InitVars
+# into constructor arguments.
+State.trace = property(_trace)  # type: ignore[assignment]
+State.htrace = property(_htrace)  # type: ignore[assignment]
 
 
 # ---------- Helpers ----------
@@ -219,31 +647,53 @@ def angle_at(vertex: str, left: str, right: str) -> Angle:
     return Angle(left, vertex, right)
 
 
-def triangle_sides(vertices: Tuple[str, str, str]) -> Tuple[Segment, Segment, Segment]:
+def triangle_sides(
+    vertices: Tuple[str, str, str], symbols: Optional[SymbolTable] = None
+) -> Tuple[Segment, Segment, Segment]:
+    if symbols is not None:
+        return symbols.sides(vertices)
     a, b, c = vertices
     return (Segment(a, b), Segment(b, c), Segment(c, a))
 
 
-def triangle_angles(vertices: Tuple[str, str, str]) -> Tuple[Angle, Angle, Angle]:
+def triangle_angles(
+    vertices: Tuple[str, str, str], symbols: Optional[SymbolTable] = None
+) -> Tuple[Angle, Angle, Angle]:
+    if symbols is not None:
+        return symbols.angles(vertices)
     a, b, c = vertices
     return (Angle(b, a, c), Angle(a, b, c), Angle(a, c, b))
 
 
+_PERMUTATIONS = ((0, 1, 2), (0, 2, 1), (1, 0, 2), (1, 2, 0), (2, 0, 1), (2, 1, 0))
+
+
 def match_sss(facts: Facts, t1: Triangle, t2: Triangle) -> Optional[Tuple[Tuple[str, str], ...]]:
+    """Find a vertex mapping under which every side of ``t1`` equals its image.
+
+    Sides are compared by equality class, so each of the six permutations
+    costs three dict lookups.  The identity correspondence of a triangle with
+    itself is trivial and never reported.
+    """
+    classes = facts.seg_classes
     v1 = t1.vertices
     v2 = t2.vertices
-    permutations = [
-        (v2[0], v2[1], v2[2]),
-        (v2[0], v2[2], v2[1]),
-        (v2[1], v2[0], v2[2]),
-        (v2[1], v2[2], v2[0]),
-        (v2[2], v2[0], v2[1]),
-        (v2[2], v2[1], v2[0]),
-    ]
-    sides1 = triangle_sides(v1)
-    for perm in permutations:
-        sides2 = triangle_sides(perm)
-        if all(facts.has_eqseg(s1, s2) for s1, s2 in zip(sides1, sides2)):
+    class1 = facts.triangle_side_classes(t1)
+    if None in class1:
+        return None
+    class2 = {
+        (i, j): classes.find(facts.symbols.segment(v2[i], v2[j]))
+        for i, j in ((0, 1), (0, 2), (1, 2))
+    }
+    for i, j, k in _PERMUTATIONS:
+        perm = (v2[i], v2[j], v2[k])
+        if perm == v1:
+            continue
+        if (
+            class1[0] == class2[min(i, j), max(i, j)]
+            and class1[1] == class2[min(j, k), max(j, k)]
+            and class1[2] == class2[min(k, i), max(k, i)]
+        ):
             return tuple(zip(v1, perm))
     return None
 
@@ -259,22 +709,22 @@ def derive_angles_from_congruence(
 
 
 def derive_angles_from_correspondence(
-    corr: TriangleCorrespondence,
+    corr: TriangleCorrespondence, symbols: Optional[SymbolTable] = None
 ) -> List[Tuple[Angle, Angle]]:
     t1_vertices = corr.t1.vertices
     map_dict = {a: b for a, b in corr.mapping}
     t2_vertices = tuple(map_dict[v] for v in t1_vertices)
-    angles1 = triangle_angles(t1_vertices)
-    angles2 = triangle_angles(t2_vertices)
+    angles1 = triangle_angles(t1_vertices, symbols)
+    angles2 = triangle_angles(t2_vertices, symbols)
     return list(zip(angles1, angles2))
 
 
 def derive_sides_from_correspondence(
-    corr: TriangleCorrespondence,
+    corr: TriangleCorrespondence, symbols: Optional[SymbolTable] = None
 ) -> List[Tuple[Segment, Segment]]:
     t1_vertices = corr.t1.vertices
     map_dict = {a: b for a, b in corr.mapping}
     t2_vertices = tuple(map_dict[v] for v in t1_vertices)
-    sides1 = triangle_sides(t1_vertices)
-    sides2 = triangle_sides(t2_vertices)
+    sides1 = triangle_sides(t1_vertices, symbols)
+    sides2 = triangle_sides(t2_vertices, symbols)
     return list(zip(sides1, sides2))
@@ -2,52 +2,35 @@ from __future__ import annotations
 
 from typing import List, Optional, Tuple
 
+from .cache import CacheOption, cached_beam_search
 from .core import Segment, State
+from .goals import goal_checker_prop10
 from .prisms import all_prisms
-from .search import beam_search
+from .search import TranspositionTable
 from .types import SearchResult
 
 
-def solve_prop10(beam_k: int = 20, steps: int = 10) -> SearchResult:
+def solve_prop10(
+    beam_k: int = 20,
+    steps: int = 10,
+    transpositions: Optional[TranspositionTable] = None,
+    cache: CacheOption = None,
+) -> SearchResult:
     start = State()
-    return beam_search(start, prisms=all_prisms(), beam_k=beam_k, steps=steps)
+    return cached_beam_search(
+        start,
+        prisms=all_prisms(),
+        beam_k=beam_k,
+        steps=steps,
+        transpositions=transpositions,
+        cache=cache,
+    )
 
 
 def find_prop10_goal(state: State) -> Optional[Tuple[Segment, Segment]]:
-    """
-    Find a midpoint-like structure:
-    - seg1 == seg2
-    - they share exactly one endpoint (candidate midpoint)
-    - the other endpoints lie on the same ray
-      (so the two equal segments can be read as two local views
-       of a single parent segment being cut)
-    """
-
-    point_to_ray = {}
-    for fact in state.facts.on_rays:
-        point_to_ray[fact.point] = fact.ray
-
-    for seg1, seg2 in sorted(state.facts.eq_segs, key=lambda pair: (str(pair[0]), str(pair[1]))):
-        pts1 = {seg1.p, seg1.q}
-        pts2 = {seg2.p, seg2.q}
-
-        common = pts1 & pts2
-        if len(common) != 1:
-            continue
-
-        other1 = (pts1 - common).pop()
-        other2 = (pts2 - common).pop()
-
-        if other1 == other2:
-            continue
-
-        ray1 = point_to_ray.get(other1)
-        ray2 = point_to_ray.get(other2)
-
-        if ray1 is not None and ray1 == ray2:
-            return seg1, seg2
-
-    return None
+    """Full evaluation of :data:`goal_checker_prop10` (usable as ``goal_fn``
+    directly for incremental evaluation inside a search)."""
+    return goal_checker_prop10.check(state)
 
 
 def _format_facts(state: State) -> List[str]:
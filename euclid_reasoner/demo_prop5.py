@@ -1,21 +1,29 @@
 from __future__ import annotations
 
-from typing import List
+from typing import List, Optional
 
+from .cache import CacheOption, cached_beam_search
 from .core import State
 from .prisms import all_prisms
-from .search import beam_search, goal_checker_prop5
+from .search import TranspositionTable, goal_checker_prop5
 from .types import SearchResult
 
 
-def solve_prop5(beam_k: int = 20, steps: int = 10) -> SearchResult:
+def solve_prop5(
+    beam_k: int = 20,
+    steps: int = 10,
+    transpositions: Optional[TranspositionTable] = None,
+    cache: CacheOption = None,
+) -> SearchResult:
     start = State()
-    return beam_search(
+    return cached_beam_search(
         start,
         prisms=all_prisms(),
         beam_k=beam_k,
         steps=steps,
         goal_fn=goal_checker_prop5,
+        transpositions=transpositions,
+        cache=cache,
     )
 
 
@@ -1,16 +1,29 @@
 from __future__ import annotations
 
-from typing import List
+from typing import List, Optional
 
+from .cache import CacheOption, cached_beam_search
 from .core import State
 from .prisms import all_prisms
-from .search import beam_search
+from .search import TranspositionTable
 from .types import SearchResult
 
 
-def solve_prop9(beam_k: int = 20, steps: int = 10) -> SearchResult:
+def solve_prop9(
+    beam_k: int = 20,
+    steps: int = 10,
+    transpositions: Optional[TranspositionTable] = None,
+    cache: CacheOption = None,
+) -> SearchResult:
     start = State()
-    return beam_search(start, prisms=all_prisms(), beam_k=beam_k, steps=steps)
+    return cached_beam_search(
+        start,
+        prisms=all_prisms(),
+        beam_k=beam_k,
+        steps=steps,
+        transpositions=transpositions,
+        cache=cache,
+    )
 
 
 def _format_facts(state: State) -> List[str]:
@@ -2,11 +2,14 @@ from __future__ import annotations
 
 import sys
 from collections import Counter
-from typing import Callable, Iterable, Tuple
+from typing import Callable, Iterable, Iterator, Tuple
 
+from .core import State
 from .demo_prop5 import solve_prop5
 from .demo_prop9 import solve_prop9
 from .demo_prop10 import solve_prop10
+from .prisms import all_prisms
+from .search import GoalFn, goal_checker_prop5, goal_checker_prop9, multi_goal_search
 from .trace_schema import TraceStep
 from .types import SearchResult
 
@@ -21,6 +24,18 @@ SOLVERS: dict[str, Solver] = {
     "prop10": solve_prop10,
 }
 
+# Goal each solver searches for; solve_prop10 uses the native prop9 target.
+PROP_GOALS: dict[str, GoalFn] = {
+    "prop5": goal_checker_prop5,
+    "prop9": goal_checker_prop9,
+    "prop10": goal_checker_prop9,
+}
+
+
+def solve_all(beam_k: int = 20, steps: int = 10) -> dict[str, SearchResult]:
+    """Results of every solver in ``SOLVERS`` from a single shared search."""
+    return multi_goal_search(State(), all_prisms(), PROP_GOALS, beam_k=beam_k, steps=steps)
+
 
 def _space_transition(step: TraceStep) -> Transition | None:
     source = step.meta.get("source_space")
@@ -33,13 +48,15 @@ def _space_transition(step: TraceStep) -> Transition | None:
     return (source, target, movement)
 
 
-def extract_space_transitions(htrace: Iterable[TraceStep]) -> list[Transition]:
-    transitions: list[Transition] = []
+def iter_space_transitions(htrace: Iterable[TraceStep]) -> Iterator[Transition]:
     for step in htrace:
         transition = _space_transition(step)
         if transition is not None:
-            transitions.append(transition)
-    return transitions
+            yield transition
+
+
+def extract_space_transitions(htrace: Iterable[TraceStep]) -> list[Transition]:
+    return list(iter_space_transitions(htrace))
 
 
 def print_space_graph(transitions: Iterable[Transition]) -> None:
@@ -79,17 +96,26 @@ def _select_solver(argv: list[str]) -> tuple[str, Solver]:
         return "prop9", solve_prop9
 
     name = argv[1].lower().strip()
-    if name not in SOLVERS:
-        valid = ", ".join(sorted(SOLVERS))
+    if name not in SOLVERS and name != "all":
+        valid = ", ".join(sorted(SOLVERS) + ["all"])
         raise SystemExit(f"Unknown proposition '{name}'. Valid options: {valid}")
 
-    return name, SOLVERS[name]
+    return name, SOLVERS.get(name, solve_prop9)
 
 
 def main() -> None:
     prop_name, solver = _select_solver(sys.argv)
-    result = solver()
-    transitions = extract_space_transitions(result.state.htrace)
+    if prop_name == "all":
+        for index, (name, result) in enumerate(solve_all().items()):
+            if index:
+                print()
+            _print_result(name, result)
+        return
+    _print_result(prop_name, solver())
+
+
+def _print_result(prop_name: str, result: SearchResult) -> None:
+    transitions = extract_space_transitions(result.state.iter_steps())
 
     print(f"Proposition: {prop_name}")
     print(f"Solved? {result.solved}")
@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+from typing import Dict, Generic, Hashable, Iterable, List, Optional, Tuple, TypeVar
+
+from .persistent import PersistentMap
+
+T = TypeVar("T", bound=Hashable)
+
+
+class EqualityClosure(Generic[T]):
+    """Union-find over geometric terms with O(1) persistent snapshots.
+
+    Parent links and class sizes live in :class:`PersistentMap` layers, so a
+    forked closure shares every union made so far and records only its own
+    unions (and path compressions) on top.  Terms that never took part in an
+    equality are unknown: they are not even equal to themselves.
+
+    Each root also keeps the members of its class in the order they joined,
+    so :meth:`members` answers without scanning the other classes.
+    """
+
+    __slots__ = ("_parent", "_size", "_members")
+
+    def __init__(self, pairs: Iterable[Tuple[T, T]] = ()) -> None:
+        self._parent: PersistentMap[T, T] = PersistentMap()
+        self._size: PersistentMap[T, int] = PersistentMap()
+        self._members: PersistentMap[T, Tuple[T, ...]] = PersistentMap()
+        for left, right in pairs:
+            self.union(left, right)
+
+    def fork(self) -> "EqualityClosure[T]":
+        child = object.__new__(EqualityClosure)
+        child._parent = self._parent.fork()
+        child._size = self._size.fork()
+        child._members = self._members.fork()
+        return child
+
+    def __contains__(self, term: object) -> bool:
+        return term in self._parent
+
+    def __len__(self) -> int:
+        return len(self._parent)
+
+    def find(self, term: T) -> Optional[T]:
+        """Return the representative of ``term``'s class, or ``None`` if unknown."""
+        parent = self._parent
+        step = parent.get(term)
+        if step is None:
+            return None
+        root = term
+        while step != root:
+            root = step
+            step = parent[root]
+        while term != root:
+            step = parent[term]
+            if step != root:
+                parent[term] = root
+            term = step
+        return root
+
+    def _register(self, term: T) -> T:
+        root = self.find(term)
+        if root is None:
+            self._parent[term] = term
+            self._size[term] = 1
+            self._members[term] = (term,)
+            root = term
+        return root
+
+    def union(self, left: T, right: T) -> Optional[Tuple[T, T]]:
+        """Merge the classes of ``left`` and ``right``.
+
+        Returns ``(kept_root, absorbed_root)`` when two distinct classes were
+        merged and ``None`` when the terms were already equal.
+        """
+        root_l = self._register(left)
+        root_r = self._register(right)
+        if root_l == root_r:
+            return None
+        size_l = self._size[root_l]
+        size_r = self._size[root_r]
+        if size_l < size_r:
+            root_l, root_r = root_r, root_l
+        self._parent[root_r] = root_l
+        self._size[root_l] = size_l + size_r
+        self._members[root_l] = self._members[root_l] + self._members[root_r]
+        return root_l, root_r
+
+    def same(self, left: T, right: T) -> bool:
+        root = self.find(left)
+        return root is not None and root == self.find(right)
+
+    def members(self, term: T) -> Tuple[T, ...]:
+        """Every term equal to ``term`` (empty if ``term`` is unknown)."""
+        root = self.find(term)
+        if root is None:
+            return ()
+        return self._members[root]
+
+    def classes(self) -> Dict[T, List[T]]:
+        """Group every known term by its representative."""
+        groups: Dict[T, List[T]] = {}
+        for term in list(self._parent):
+            groups.setdefault(self.find(term), []).append(term)
+        return groups
@@ -1,28 +1,49 @@
 from __future__ import annotations
 
 import argparse
-import json
 from pathlib import Path
 
 from .demo_prop9 import solve_prop9
-from .exporters import hpg_to_graph_json, hpg_to_opml, result_to_hpg
+from .exporters import hpg_to_graph_json, hpg_to_opml, result_to_hpg, write_graph_json, write_hpg_chunks
+from .hpg_binary import write_hpg_binary
+from .hpg_model import dumps_graph_json
+from .layout import LayoutCache, apply_layout, layout_hpg
 
 
 def main() -> None:
     parser = argparse.ArgumentParser(description="Export HPG data from the Prop 9 demo.")
-    parser.add_argument("--format", choices=["opml", "graph"], required=True)
-    parser.add_argument("--out", required=True)
+    parser.add_argument("--format", choices=["opml", "graph", "hpgb", "chunks"], required=True)
+    parser.add_argument("--out", required=True, help="Output file, or directory for --format chunks.")
+    parser.add_argument("--compact", action="store_true", help="Write graph JSON without indentation.")
+    parser.add_argument("--step-window", type=int, default=10, help="Steps per chunk for --format chunks.")
+    parser.add_argument("--layout", action="store_true", help="Precompute node positions into meta x/y.")
+    parser.add_argument("--layout-seed", type=int, default=0)
+    parser.add_argument("--layout-budget", type=float, default=5.0, help="Layout time budget in seconds.")
+    parser.add_argument("--layout-cache", help="Directory of cached layouts, reused for unchanged graphs.")
     args = parser.parse_args()
 
     result = solve_prop9()
-    hpg = result_to_hpg(result)
 
     output_path = Path(args.out)
+    indent = None if args.compact else 2
+    if args.format == "graph" and not args.layout:
+        with output_path.open("w", encoding="utf-8") as out:
+            write_graph_json(result, out, indent=indent)
+        return
+
+    hpg = result_to_hpg(result)
+    if args.layout:
+        cache = LayoutCache(args.layout_cache) if args.layout_cache else None
+        positions = layout_hpg(hpg, seed=args.layout_seed, time_budget=args.layout_budget, cache=cache)
+        apply_layout(hpg, positions)
     if args.format == "opml":
         output_path.write_text(hpg_to_opml(hpg), encoding="utf-8")
+    elif args.format == "chunks":
+        write_hpg_chunks(hpg, output_path, step_window=args.step_window)
+    elif args.format == "hpgb":
+        write_hpg_binary(hpg, output_path)
     else:
-        output = hpg_to_graph_json(hpg)
-        output_path.write_text(json.dumps(output, indent=2, sort_keys=True), encoding="utf-8")
+        output_path.write_text(dumps_graph_json(hpg_to_graph_json(hpg), indent=indent), encoding="utf-8")
 
 
 if __name__ == "__main__":
@@ -1,6 +1,10 @@
 from __future__ import annotations
 
-from typing import Dict, Optional, Set, Tuple
+import itertools
+import json
+import re
+from pathlib import Path
+from typing import Any, Dict, Optional, Set, TextIO, Tuple, Union
 
 from .core import Angle
 from .hpg_model import (
@@ -17,14 +21,19 @@ from .hpg_model import (
     FactNode,
     HPGEdge,
     HPGGraph,
+    HPGStreamWriter,
     ObjectNode,
     ProjectionNode,
     QueryNode,
     SpaceNode,
     ViewNode,
 )
+from .trace_schema import FactRef, fact_ref
 from .types import SearchResult
 
+# Anything nodes and edges can be added to: an in-memory graph or a writer.
+GraphSink = Union[HPGGraph, HPGStreamWriter]
+
 
 def _extract_object_kind(entity: str) -> Optional[str]:
     for prefix in ("triangle:", "point:", "segment:", "angle:", "ray:"):
@@ -33,6 +42,10 @@ def _extract_object_kind(entity: str) -> Optional[str]:
     return None
 
 
+# Fact kinds exported under their own ``fact_type``; others are "Fact".
+_TYPED_FACTS = ("EqSeg", "EqAng", "Congruent", "OnRay")
+
+
 def _infer_fact_type(fact_label: str) -> str:
     for prefix in ("EqSeg(", "EqAng(", "Congruent(", "OnRay("):
         if fact_label.startswith(prefix):
@@ -40,6 +53,13 @@ def _infer_fact_type(fact_label: str) -> str:
     return "Fact"
 
 
+def _fact_type(label: str, ref: Optional[FactRef]) -> str:
+    # Labels of hand-built steps carry no reference and are typed by prefix.
+    if ref is None:
+        return _infer_fact_type(label)
+    return ref.kind if ref.kind in _TYPED_FACTS else "Fact"
+
+
 def _infer_base_role(entity: str) -> str:
     if entity.startswith("triangle:"):
         return "triangle_instance"
@@ -90,21 +110,50 @@ def _is_fact_like_entity(entity: str) -> bool:
     return any(token in entity for token in ("Congruent(", "EqSeg(", "EqAng(", "OnRay("))
 
 
-def _ensure_object_and_view(graph: HPGGraph, *, entity: str, space: str) -> str:
-    if _is_fact_like_entity(entity):
-        return ""
+class _ViewResolver:
+    """Per-export cache of the view id for each ``(entity, space)``.
+
+    The first request adds the object (once per entity), the view and its
+    INTERPRETS edge to the graph; repeated requests are a dict lookup and
+    allocate nothing.  Fact-like entities resolve to ``""``.
+    """
+
+    def __init__(self, graph: GraphSink) -> None:
+        self.graph = graph
+        self._views: Dict[Tuple[str, str], str] = {}
+        self._objects: Set[str] = set()
+
+    def view(self, entity: str, space: str) -> str:
+        key = (entity, space)
+        view_id = self._views.get(key)
+        if view_id is None:
+            view_id = self._views[key] = self._add(entity, space)
+        return view_id
+
+    def _add(self, entity: str, space: str) -> str:
+        if _is_fact_like_entity(entity):
+            return ""
+
+        graph = self.graph
+        kind = _extract_object_kind(entity)
+        role = _infer_role(entity, space)
+        auxiliary = space == "fact_space"
 
-    kind = _extract_object_kind(entity)
-    role = _infer_role(entity, space)
-    view_meta: Dict[str, str] = {}
-    object_meta: Dict[str, str] = {}
-    if space == "fact_space":
-        view_meta["auxiliary"] = "true"
-        object_meta["auxiliary"] = "true"
-
-    if kind is None:
         object_id = f"object:{entity}"
-        graph.add_node(ObjectNode(id=object_id, label=entity, object_type="unknown", meta=object_meta))
+        if object_id not in self._objects:
+            self._objects.add(object_id)
+            graph.add_node(
+                ObjectNode(
+                    id=object_id,
+                    label=entity,
+                    object_type="unknown" if kind is None else kind,
+                    meta={"auxiliary": "true"} if auxiliary else {},
+                )
+            )
+
+        view_meta: Dict[str, str] = {"entity": entity} if kind is None else {}
+        if auxiliary:
+            view_meta["auxiliary"] = "true"
         view_id = f"view:{space}:{entity}:{role}"
         graph.add_node(
             ViewNode(
@@ -113,29 +162,12 @@ def _ensure_object_and_view(graph: HPGGraph, *, entity: str, space: str) -> str:
                 role=role,
                 object_id=object_id,
                 space_id=space,
-                meta={"entity": entity, **view_meta},
+                meta=view_meta,
             )
         )
         graph.add_edge(HPGEdge(from_id=view_id, to_id=object_id, type=INTERPRETS))
         return view_id
 
-    object_id = f"object:{entity}"
-    graph.add_node(ObjectNode(id=object_id, label=entity, object_type=kind, meta=object_meta))
-
-    view_id = f"view:{space}:{entity}:{role}"
-    graph.add_node(
-            ViewNode(
-                id=view_id,
-                label=f"{entity}@{role}",
-                role=role,
-                object_id=object_id,
-                space_id=space,
-                meta=view_meta,
-        )
-    )
-    graph.add_edge(HPGEdge(from_id=view_id, to_id=object_id, type=INTERPRETS))
-    return view_id
-
 
 def _fact_matches_target(fact_label: str, target: Optional[Tuple[Angle, Angle]]) -> bool:
     if target is None:
@@ -146,31 +178,36 @@ def _fact_matches_target(fact_label: str, target: Optional[Tuple[Angle, Angle]])
     return fact_label.startswith("EqAng(") and a1 in fact_label and a2 in fact_label
 
 
-def _parse_eqseg_fact(label: str) -> Tuple[str, str]:
-    inner = label[len("EqSeg(") : -1]
-    left, right = [part.strip() for part in inner.split(",", 1)]
-    return left, right
+def _fact_id(label: str) -> str:
+    return f"fact:{label}"
 
 
-def _parse_eqang_fact(label: str) -> Tuple[str, str]:
-    inner = label[len("EqAng(") : -1]
-    left, right = [part.strip() for part in inner.split(",", 1)]
-    return left, right
+class _Goal:
+    """The search target as a :class:`FactRef`, for exact support checks."""
 
+    def __init__(self, query_id: str, target: Optional[Tuple[Angle, Angle]]) -> None:
+        self.query_id = query_id
+        self.target = target
+        self.ref = None if target is None else fact_ref("EqAng", *target)
 
-def _fact_id(label: str) -> str:
-    return f"fact:{label}"
+    def supported_by(self, label: str, ref: Optional[FactRef]) -> bool:
+        if self.ref is None:
+            return False
+        if ref is None:
+            return _fact_matches_target(label, self.target)
+        return ref == self.ref
 
 
-def _add_supports_goal_edge(graph: HPGGraph, *, fact_label: str, query_id: str, target: Optional[Tuple[Angle, Angle]]) -> None:
-    if _fact_matches_target(fact_label, target):
-        graph.add_edge(HPGEdge(from_id=_fact_id(fact_label), to_id=query_id, type=SUPPORTS_GOAL))
+def _add_supports_goal_edge(graph: GraphSink, *, fact_label: str, ref: Optional[FactRef], goal: _Goal) -> None:
+    if goal.supported_by(fact_label, ref):
+        graph.add_edge(HPGEdge(from_id=_fact_id(fact_label), to_id=goal.query_id, type=SUPPORTS_GOAL))
 
 
 def _add_fact_node(
-    graph: HPGGraph,
+    graph: GraphSink,
     *,
     label: str,
+    ref: Optional[FactRef],
     space_id: str,
     origin: str,
     derived_from: Optional[Set[str]] = None,
@@ -182,54 +219,74 @@ def _add_fact_node(
         FactNode(
             id=_fact_id(label),
             label=label,
-            fact_type=_infer_fact_type(label),
+            fact_type=_fact_type(label, ref),
             space_id=space_id,
             meta=meta,
         )
     )
 
 
-def _materialize_final_entities(graph: HPGGraph, result: SearchResult) -> None:
+def _materialize_final_entities(views: _ViewResolver, result: SearchResult) -> None:
     state = result.state
-    graph.add_node(SpaceNode(id="fact_space", label="fact_space", meta={"auxiliary": "true"}))
+    views.graph.add_node(SpaceNode(id="fact_space", label="fact_space", meta={"auxiliary": "true"}))
 
     for on_ray in state.facts.on_rays:
-        _ensure_object_and_view(graph, entity=f"point:{on_ray.point}", space="fact_space")
+        views.view(f"point:{on_ray.point}", "fact_space")
     for seg1, seg2 in state.facts.eq_segs:
-        _ensure_object_and_view(graph, entity=f"segment:{seg1}", space="fact_space")
-        _ensure_object_and_view(graph, entity=f"segment:{seg2}", space="fact_space")
+        views.view(f"segment:{seg1}", "fact_space")
+        views.view(f"segment:{seg2}", "fact_space")
     for tri in state.triangles:
-        _ensure_object_and_view(graph, entity=f"triangle:{tri.name}", space="fact_space")
+        views.view(f"triangle:{tri.name}", "fact_space")
     for ang1, ang2 in state.facts.eq_angs:
-        _ensure_object_and_view(graph, entity=f"angle:{ang1}", space="fact_space")
-        _ensure_object_and_view(graph, entity=f"angle:{ang2}", space="fact_space")
+        views.view(f"angle:{ang1}", "fact_space")
+        views.view(f"angle:{ang2}", "fact_space")
     if result.target is not None:
         t1, t2 = result.target
-        _ensure_object_and_view(graph, entity=f"angle:{t1}", space="fact_space")
-        _ensure_object_and_view(graph, entity=f"angle:{t2}", space="fact_space")
+        views.view(f"angle:{t1}", "fact_space")
+        views.view(f"angle:{t2}", "fact_space")
 
 
 def result_to_hpg(result: SearchResult) -> dict:
-    state = result.state
     graph = HPGGraph()
+    _build_hpg(result, graph)
+    return graph.to_dict()
+
+
+def write_graph_json(result: SearchResult, out: TextIO, *, indent: Optional[int] = 2) -> None:
+    """Stream ``hpg_to_graph_json(result_to_hpg(result))`` to ``out`` as JSON.
+
+    The text equals ``dumps_graph_json(..., indent=indent)`` of the
+    in-memory export (``indent=None`` for compact output), but nodes and
+    edges are written as they are produced instead of being collected.
+    """
+    with HPGStreamWriter(out, indent=indent) as writer:
+        _build_hpg(result, writer)
+
+
+def _build_hpg(result: SearchResult, graph: GraphSink) -> None:
+    state = result.state
 
     query_id = "query:goal"
     query_label = "Goal"
     if result.target is not None:
         query_label = f"Goal: EqAng({result.target[0]},{result.target[1]})"
     graph.add_node(QueryNode(id=query_id, label=query_label))
+    goal = _Goal(query_id, result.target)
 
-    for step in state.htrace:
+    # Steps are streamed off the trace chain; each is rendered once and the
+    # second pass reuses the rendered step.
+    for step in state.iter_steps():
         graph.add_node(SpaceNode(id=step.space, label=step.space))
 
-    _materialize_final_entities(graph, result)
+    views = _ViewResolver(graph)
+    _materialize_final_entities(views, result)
 
     latest_view_by_object: dict[str, tuple[str, str]] = {}
     fact_origins: Dict[str, str] = {}
     fact_spaces: Dict[str, str] = {}
     fact_derived_from: Dict[str, Set[str]] = {}
 
-    for step in state.htrace:
+    for step in state.iter_steps():
         projection_id = f"projection:{step.id}"
         graph.add_node(
             ProjectionNode(
@@ -242,38 +299,40 @@ def result_to_hpg(result: SearchResult) -> dict:
         )
         graph.add_edge(HPGEdge(from_id=projection_id, to_id=step.space, type=IN_SPACE))
 
+        # One pass over ``uses``: the USES edge, then the EXPLORES edge back
+        # to the view the object was last seen through.  An entity the step
+        # also creates is re-anchored by the creates loop below instead.
+        created = set(step.creates)
         for used in step.uses:
-            view_id = _ensure_object_and_view(graph, entity=used, space=step.space)
+            view_id = views.view(used, step.space)
             if not view_id:
                 continue
             graph.add_edge(HPGEdge(from_id=projection_id, to_id=view_id, type=USES))
+            object_id = f"object:{used}"
+            if used in created or object_id not in latest_view_by_object:
+                continue
+            old_view_id, old_space = latest_view_by_object[object_id]
+            if old_space != step.space and old_view_id != view_id:
+                graph.add_edge(HPGEdge(from_id=view_id, to_id=old_view_id, type=EXPLORES))
+            latest_view_by_object[object_id] = (view_id, step.space)
 
+        refs = step.fact_refs
         for used_fact in step.used_facts:
-            _add_fact_node(graph, label=used_fact, space_id=step.space, origin="seed")
+            _add_fact_node(graph, label=used_fact, ref=refs.get(used_fact), space_id=step.space, origin="seed")
             graph.add_edge(HPGEdge(from_id=projection_id, to_id=_fact_id(used_fact), type=USES))
 
-        for created in step.creates:
-            view_id = _ensure_object_and_view(graph, entity=created, space=step.space)
+        for entity in step.creates:
+            view_id = views.view(entity, step.space)
             if not view_id:
                 continue
             graph.add_edge(HPGEdge(from_id=projection_id, to_id=view_id, type=CREATES))
-            object_id = f"object:{created}"
+            object_id = f"object:{entity}"
             if object_id in latest_view_by_object:
                 old_view_id, old_space = latest_view_by_object[object_id]
                 if old_space != step.space and old_view_id != view_id:
                     graph.add_edge(HPGEdge(from_id=view_id, to_id=old_view_id, type=REINTERPRETS))
             latest_view_by_object[object_id] = (view_id, step.space)
 
-        for used in step.uses:
-            object_id = f"object:{used}"
-            current_view_id = _ensure_object_and_view(graph, entity=used, space=step.space)
-            if not current_view_id or object_id not in latest_view_by_object:
-                continue
-            old_view_id, old_space = latest_view_by_object[object_id]
-            if old_space != step.space and old_view_id != current_view_id:
-                graph.add_edge(HPGEdge(from_id=current_view_id, to_id=old_view_id, type=EXPLORES))
-            latest_view_by_object[object_id] = (current_view_id, step.space)
-
         for asserted in step.asserts:
             fact_id = _fact_id(asserted)
             fact_origins[asserted] = "inference" if "congruence" in step.space or step.phase == "inference" else "construction"
@@ -283,12 +342,13 @@ def result_to_hpg(result: SearchResult) -> dict:
             _add_fact_node(
                 graph,
                 label=asserted,
+                ref=refs.get(asserted),
                 space_id=step.space,
                 origin=fact_origins[asserted],
                 derived_from=fact_derived_from.get(asserted),
             )
             graph.add_edge(HPGEdge(from_id=projection_id, to_id=fact_id, type=ASSERTS))
-            _add_supports_goal_edge(graph, fact_label=asserted, query_id=query_id, target=result.target)
+            _add_supports_goal_edge(graph, fact_label=asserted, ref=refs.get(asserted), goal=goal)
 
         for rewritten in step.rewrites:
             fact_id = _fact_id(rewritten)
@@ -299,68 +359,49 @@ def result_to_hpg(result: SearchResult) -> dict:
             _add_fact_node(
                 graph,
                 label=rewritten,
+                ref=refs.get(rewritten),
                 space_id=step.space,
                 origin="inference",
                 derived_from=fact_derived_from.get(rewritten),
             )
             graph.add_edge(HPGEdge(from_id=projection_id, to_id=fact_id, type=REWRITES))
-            _add_supports_goal_edge(graph, fact_label=rewritten, query_id=query_id, target=result.target)
+            _add_supports_goal_edge(graph, fact_label=rewritten, ref=refs.get(rewritten), goal=goal)
 
         for derived in step.derived_facts:
             _add_fact_node(
                 graph,
                 label=derived,
+                ref=refs.get(derived),
                 space_id=step.space,
                 origin="inference",
                 derived_from=set(step.used_facts),
             )
             graph.add_edge(HPGEdge(from_id=projection_id, to_id=_fact_id(derived), type=DERIVES))
-            _add_supports_goal_edge(graph, fact_label=derived, query_id=query_id, target=result.target)
+            _add_supports_goal_edge(graph, fact_label=derived, ref=refs.get(derived), goal=goal)
 
         for parent in step.parents:
             parent_projection_id = f"projection:{parent}"
             graph.add_node(ProjectionNode(id=parent_projection_id, label=parent))
             graph.add_edge(HPGEdge(from_id=parent_projection_id, to_id=projection_id, type=DERIVES))
 
-    for on_ray in state.facts.on_rays:
-        label = f"OnRay({on_ray.point},{on_ray.ray})"
-        _add_fact_node(
-            graph,
-            label=label,
-            space_id=fact_spaces.get(label, "fact_space"),
-            origin=fact_origins.get(label, "seed"),
-            derived_from=fact_derived_from.get(label),
-        )
-    for seg1, seg2 in state.facts.eq_segs:
-        label = f"EqSeg({seg1},{seg2})"
-        _add_fact_node(
-            graph,
-            label=label,
-            space_id=fact_spaces.get(label, "fact_space"),
-            origin=fact_origins.get(label, "seed"),
-            derived_from=fact_derived_from.get(label),
-        )
-    for congruent in state.facts.congruent:
-        label = f"Congruent({congruent.t1.name},{congruent.t2.name})"
-        _add_fact_node(
-            graph,
-            label=label,
-            space_id=fact_spaces.get(label, "fact_space"),
-            origin=fact_origins.get(label, "inference"),
-            derived_from=fact_derived_from.get(label),
-        )
-    for ang1, ang2 in state.facts.eq_angs:
-        label = f"EqAng({ang1},{ang2})"
+    final_facts = itertools.chain(
+        ((fact_ref("OnRay", fact.point, fact.ray), "seed") for fact in state.facts.on_rays),
+        ((fact_ref("EqSeg", seg1, seg2), "seed") for seg1, seg2 in state.facts.eq_segs),
+        ((fact_ref("Congruent", fact.t1.name, fact.t2.name), "inference") for fact in state.facts.congruent),
+        ((fact_ref("EqAng", ang1, ang2), "inference") for ang1, ang2 in state.facts.eq_angs),
+    )
+    for ref, default_origin in final_facts:
+        label = ref.label
         _add_fact_node(
             graph,
             label=label,
+            ref=ref,
             space_id=fact_spaces.get(label, "fact_space"),
-            origin=fact_origins.get(label, "inference"),
+            origin=fact_origins.get(label, default_origin),
             derived_from=fact_derived_from.get(label),
         )
-        _add_supports_goal_edge(graph, fact_label=label, query_id=query_id, target=result.target)
-
-    return graph.to_dict()
+        if ref.kind == "EqAng":
+            _add_supports_goal_edge(graph, fact_label=label, ref=ref, goal=goal)
 
 
 def hpg_to_graph_json(hpg: dict) -> dict:
@@ -394,3 +435,103 @@ def hpg_to_opml(hpg: dict) -> str:
         lines.append(f'      <outline text="{fact.get("label", fact["id"])}"/>')
     lines.extend(["    </outline>", "  </body>", "</opml>"])
     return "\n".join(lines)
+
+
+# ---------- Chunked export ----------
+
+CHUNK_FORMAT_VERSION = 1
+# Partition of nodes that belong to no mental space (objects, the query).
+SHARED_SPACE = "_shared"
+
+# Same step numbering as the viewer's timeline.
+_PROOF_STEP_ID = re.compile(r"^projection:hstep:(\d+)$")
+# Kinds every window needs; they go to their space's static chunk.
+_STATIC_KINDS = ("space", "object", "query")
+
+
+def node_first_steps(hpg: dict) -> Dict[str, int]:
+    """Step at which each node first appears: its own step for a proof
+    projection, else the earliest projection it shares an edge with."""
+    steps: Dict[str, int] = {}
+    for node in hpg.get("nodes", []):
+        match = _PROOF_STEP_ID.match(node["id"])
+        if match and node.get("kind") == "projection":
+            steps[node["id"]] = int(match.group(1))
+    first = dict(steps)
+    for edge in hpg.get("edges", []):
+        for source, other in ((edge["from"], edge["to"]), (edge["to"], edge["from"])):
+            step = steps.get(source)
+            if step is None or other in steps:
+                continue
+            if other not in first or step < first[other]:
+                first[other] = step
+    return first
+
+
+def hpg_to_chunks(hpg: dict, *, step_window: int = 10) -> Tuple[dict, Dict[str, dict]]:
+    """Partition an HPG by mental space and by windows of ``step_window`` steps.
+
+    Returns the manifest and the chunks by id.  Each chunk has the
+    ``hpg_to_graph_json`` shape and holds its nodes plus every edge leaving
+    them; edges that end in another chunk are summarised per chunk pair in
+    the manifest's ``cross_chunk_edges``.  Space, object and query nodes
+    sit in their space's ``static`` chunk, which every window may need.
+    """
+    if step_window < 1:
+        raise ValueError("step_window must be positive")
+    first = node_first_steps(hpg)
+    chunk_of: Dict[str, str] = {}
+    chunks: Dict[str, dict] = {}
+    entries: Dict[str, Dict[str, Any]] = {}
+
+    for node in hpg.get("nodes", []):
+        kind = node.get("kind")
+        space = node.get("space_id") or (node["id"] if kind == "space" else SHARED_SPACE)
+        step = None if kind in _STATIC_KINDS else first.get(node["id"])
+        if step is None:
+            chunk_id, window = f"{space}.static", None
+        else:
+            start = step - step % step_window
+            chunk_id, window = f"{space}.steps-{start:04d}-{start + step_window - 1:04d}", [start, start + step_window - 1]
+        if chunk_id not in chunks:
+            chunks[chunk_id] = {"nodes": [], "edges": []}
+            entries[chunk_id] = {"id": chunk_id, "space": space, "steps": window, "file": f"{chunk_id}.json"}
+        chunks[chunk_id]["nodes"].append(node)
+        chunk_of[node["id"]] = chunk_id
+
+    cross: Dict[Tuple[str, str], int] = {}
+    for edge in hpg.get("edges", []):
+        source = chunk_of.get(edge["from"], f"{SHARED_SPACE}.static")
+        chunks.setdefault(source, {"nodes": [], "edges": []})["edges"].append(edge)
+        target = chunk_of.get(edge["to"], source)
+        if target != source:
+            cross[(source, target)] = cross.get((source, target), 0) + 1
+
+    for chunk_id, chunk in chunks.items():
+        entry = entries.setdefault(
+            chunk_id, {"id": chunk_id, "space": SHARED_SPACE, "steps": None, "file": f"{chunk_id}.json"}
+        )
+        entry["nodes"] = len(chunk["nodes"])
+        entry["edges"] = len(chunk["edges"])
+
+    manifest = {
+        "version": CHUNK_FORMAT_VERSION,
+        "step_window": step_window,
+        "steps": max(first.values(), default=-1) + 1,
+        "chunks": list(entries.values()),
+        "cross_chunk_edges": [
+            {"from": source, "to": target, "edges": count} for (source, target), count in cross.items()
+        ],
+    }
+    return manifest, chunks
+
+
+def write_hpg_chunks(hpg: dict, out_dir: Union[str, Path], *, step_window: int = 10) -> dict:
+    """Write ``manifest.json`` and one JSON file per chunk into ``out_dir``."""
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    manifest, chunks = hpg_to_chunks(hpg, step_window=step_window)
+    for entry in manifest["chunks"]:
+        (out_dir / entry["file"]).write_text(json.dumps(chunks[entry["id"]], sort_keys=True), encoding="utf-8")
+    (out_dir / "manifest.json").write_text(json.dumps(manifest, indent=2, sort_keys=True), encoding="utf-8")
+    return manifest
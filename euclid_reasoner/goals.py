@@ -0,0 +1,178 @@
+from __future__ import annotations
+
+from typing import Any, Iterable, List, Optional, Tuple
+
+from .core import Angle, FactDelta, Facts, Segment, State
+
+
+class IncrementalGoal:
+    """A goal test that can be re-evaluated from the facts a prism just added.
+
+    Calling the goal runs the full check, so instances work anywhere a plain
+    ``GoalFn`` does.  Search engines instead call :meth:`check_child` on
+    children of states already known not to satisfy the goal: only the
+    child's delta is inspected, and deltas that leave ``consumes`` untouched
+    are rejected without looking at the facts at all.
+    """
+
+    # Fact kinds (see ``core.FACT_KINDS``) the goal depends on.
+    consumes: Tuple[str, ...] = ()
+    # Bump when the goal's semantics change; part of ``cache_id``.
+    version = 1
+
+    @property
+    def cache_id(self) -> Optional[str]:
+        """Identity of the goal for the solve cache.
+
+        Goals without instance state are identified by their class.  Goals
+        with parameters get ``None`` (never cached) unless they override
+        this with an id that covers their parameters.
+        """
+        if vars(self):
+            return None
+        cls = type(self)
+        return f"{cls.__module__}.{cls.__qualname__}@{self.version}"
+
+    def __call__(self, state: State) -> Optional[Tuple[Any, Any]]:
+        return self.check(state)
+
+    def check(self, state: State) -> Optional[Tuple[Any, Any]]:
+        """Full evaluation over every fact of ``state``."""
+        raise NotImplementedError
+
+    def check_delta(self, state: State, delta: FactDelta) -> Optional[Tuple[Any, Any]]:
+        """Evaluation assuming ``state.parent`` fails the goal and ``delta``
+        is exactly what ``state`` added to it."""
+        raise NotImplementedError
+
+    def check_child(self, state: State) -> Optional[Tuple[Any, Any]]:
+        """Evaluate ``state`` whose parent is known to fail the goal."""
+        delta = state.delta()
+        if not state.extends_parent(delta):
+            return self.check(state)
+        if not delta.touches(self.consumes):
+            return None
+        return self.check_delta(state, delta)
+
+
+def evaluate_goal(goal_fn: Any, state: State, *, parent_failed: bool = False) -> Optional[Tuple[Any, Any]]:
+    """Run ``goal_fn`` on ``state``, incrementally when that is sound."""
+    if parent_failed and isinstance(goal_fn, IncrementalGoal):
+        return goal_fn.check_child(state)
+    return goal_fn(state)
+
+
+def _roots(facts: Facts, pairs: Iterable[Tuple[Angle, Angle]]) -> List[Angle]:
+    find = facts.ang_classes.find
+    return list(dict.fromkeys(find(pair[0]) for pair in pairs))
+
+
+class Prop9Goal(IncrementalGoal):
+    """Two distinct angles at B sharing an arm, in one equality class."""
+
+    consumes = ("eq_angs",)
+
+    def check(self, state: State) -> Optional[Tuple[Angle, Angle]]:
+        facts = state.facts
+        seen: dict[tuple[Angle, str], Angle] = {}
+        for pair in facts.eqang_with_vertex("B"):
+            for ang in pair:
+                if ang.v != "B":
+                    continue
+                root = facts.ang_classes.find(ang)
+                for arm in (ang.c, ang.a):
+                    other = seen.setdefault((root, arm), ang)
+                    if other != ang:
+                        return (other, ang)
+        return None
+
+    def check_delta(self, state: State, delta: FactDelta) -> Optional[Tuple[Angle, Angle]]:
+        # Only classes that a new equality touched can have gained a match.
+        facts = state.facts
+        for root in _roots(facts, delta.eq_angs):
+            seen: dict[str, Angle] = {}
+            for ang in facts.ang_classes.members(root):
+                if ang.v != "B":
+                    continue
+                for arm in (ang.c, ang.a):
+                    other = seen.setdefault(arm, ang)
+                    if other != ang:
+                        return (other, ang)
+        return None
+
+
+class Prop5Goal(IncrementalGoal):
+    """Two distinct angles away from B in one equality class."""
+
+    consumes = ("eq_angs",)
+
+    def _first(self, facts: Facts, pairs: Iterable[Tuple[Angle, Angle]]) -> Optional[Tuple[Angle, Angle]]:
+        for root in _roots(facts, pairs):
+            off_b = [ang for ang in facts.ang_classes.members(root) if ang.v != "B"]
+            if len(off_b) >= 2:
+                return (off_b[0], off_b[1])
+        return None
+
+    def check(self, state: State) -> Optional[Tuple[Angle, Angle]]:
+        return self._first(state.facts, state.facts.eq_angs)
+
+    def check_delta(self, state: State, delta: FactDelta) -> Optional[Tuple[Angle, Angle]]:
+        return self._first(state.facts, delta.eq_angs)
+
+
+def _sort_pairs(pairs: Iterable[Tuple[Segment, Segment]]) -> List[Tuple[Segment, Segment]]:
+    return sorted(pairs, key=lambda pair: (str(pair[0]), str(pair[1])))
+
+
+class Prop10Goal(IncrementalGoal):
+    """
+    Find a midpoint-like structure:
+    - seg1 == seg2
+    - they share exactly one endpoint (candidate midpoint)
+    - the other endpoints lie on the same ray
+      (so the two equal segments can be read as two local views
+       of a single parent segment being cut)
+    """
+
+    consumes = ("eq_segs", "on_rays")
+
+    def _first(self, facts: Facts, pairs: Iterable[Tuple[Segment, Segment]]) -> Optional[Tuple[Segment, Segment]]:
+        for seg1, seg2 in _sort_pairs(pairs):
+            pts1 = {seg1.p, seg1.q}
+            pts2 = {seg2.p, seg2.q}
+
+            common = pts1 & pts2
+            if len(common) != 1:
+                continue
+
+            other1 = (pts1 - common).pop()
+            other2 = (pts2 - common).pop()
+
+            if other1 == other2:
+                continue
+
+            if set(facts.rays_through(other1)) & set(facts.rays_through(other2)):
+                return seg1, seg2
+
+        return None
+
+    def check(self, state: State) -> Optional[Tuple[Segment, Segment]]:
+        return self._first(state.facts, state.facts.eq_segs)
+
+    def check_delta(self, state: State, delta: FactDelta) -> Optional[Tuple[Segment, Segment]]:
+        facts = state.facts
+        candidates = dict.fromkeys(delta.eq_segs)
+        # A point newly placed on a ray can complete an older equality: look
+        # up the stored pairs through the classes of the segments ending there.
+        for fact in delta.on_rays:
+            for seg in facts.segments_at(fact.point):
+                for other in facts.seg_classes.members(seg):
+                    pair = facts.symbols.ordered(seg, other)
+                    if pair in facts.eq_segs:
+                        candidates[pair] = None
+        return self._first(facts, candidates)
+
+
+goal_checker_prop9 = Prop9Goal()
+goal_checker_prop5 = Prop5Goal()
+goal_checker_prop10 = Prop10Goal()
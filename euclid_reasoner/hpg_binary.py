@@ -0,0 +1,297 @@
+from __future__ import annotations
+
+import mmap
+import struct
+import sys
+import zlib
+from array import array
+from collections.abc import Sequence
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, List, Optional, Tuple, Union
+
+# ---------- Container layout ----------
+#
+# An HPG container is a fixed header, a section directory and the sections:
+#
+#   header     magic "HPGB", format version, flags, section count,
+#              node count, edge count
+#   directory  per section: name, offset, stored length, raw length
+#
+# Every string (ids, labels, kinds, meta keys and values) is stored once in
+# a string table; string id 0 means "field absent".  Nodes and edges are
+# tables of string ids laid out column by column (all ids of a column are
+# contiguous), plus a CSR-style meta column: per-row offsets into a flat
+# array of (key, value) id pairs.  Integer sections are little-endian
+# uint32; with FLAG_ZLIB each section is compressed on its own.
+
+MAGIC = b"HPGB"
+FORMAT_VERSION = 1
+FLAG_ZLIB = 1
+
+_HEADER = struct.Struct("<4sHHIII")
+_ENTRY = struct.Struct("<8sQQQ")
+_ALIGN = 8
+
+_U32 = "I" if array("I").itemsize == 4 else "L"
+_SWAP = sys.byteorder != "little"
+
+
+def _u32(values: Any) -> bytes:
+    data = array(_U32, values)
+    if _SWAP:
+        data.byteswap()
+    return data.tobytes()
+
+
+class _StringTable:
+    def __init__(self) -> None:
+        self.ids: Dict[str, int] = {}
+        self.strings: List[str] = []
+
+    def id(self, value: str) -> int:
+        # 0 is reserved for absent fields; a present ``None`` could not be
+        # told apart from one, so it is rejected like any other non-string.
+        if not isinstance(value, str):
+            raise TypeError(f"HPG containers only store strings, got {type(value).__name__}")
+        key = self.ids.get(value)
+        if key is None:
+            self.strings.append(value)
+            key = self.ids[value] = len(self.strings)
+        return key
+
+    def sections(self) -> List[Tuple[bytes, bytes]]:
+        encoded = [s.encode("utf-8") for s in self.strings]
+        offsets = [0]
+        for blob in encoded:
+            offsets.append(offsets[-1] + len(blob))
+        return [(b"stroff", _u32(offsets)), (b"strblob", b"".join(encoded))]
+
+
+def _table_sections(prefix: bytes, rows: List[Dict[str, Any]], strings: _StringTable) -> List[Tuple[bytes, bytes]]:
+    columns: Dict[str, None] = {}
+    for row in rows:
+        columns.update(dict.fromkeys(key for key in row if key != "meta"))
+    data: List[int] = []
+    for column in columns:
+        data.extend(strings.id(row[column]) if column in row else 0 for row in rows)
+    meta_offsets = [0]
+    meta: List[int] = []
+    for row in rows:
+        for key, value in (row.get("meta") or {}).items():
+            meta.append(strings.id(key))
+            meta.append(strings.id(value))
+        meta_offsets.append(len(meta) // 2)
+    return [
+        (prefix + b"cols", _u32(strings.id(column) for column in columns)),
+        (prefix + b"data", _u32(data)),
+        (prefix + b"metaoff", _u32(meta_offsets)),
+        (prefix + b"meta", _u32(meta)),
+    ]
+
+
+# ---------- Writer ----------
+
+
+def dumps_hpg_binary(hpg: dict, *, compress: bool = True) -> bytes:
+    """Encode an HPG dict (as returned by ``result_to_hpg``) as a container.
+
+    Every field and meta value must be a string: ``None`` values are
+    rejected with ``TypeError`` since they would read back as absent.
+    """
+    nodes = hpg.get("nodes", [])
+    edges = hpg.get("edges", [])
+    strings = _StringTable()
+    sections = _table_sections(b"n", nodes, strings) + _table_sections(b"e", edges, strings)
+    sections = strings.sections() + sections
+
+    directory_end = _HEADER.size + _ENTRY.size * len(sections)
+    offset = -(-directory_end // _ALIGN) * _ALIGN
+    entries: List[bytes] = []
+    payloads: List[bytes] = []
+    for name, raw in sections:
+        stored = zlib.compress(raw) if compress else raw
+        padding = -len(stored) % _ALIGN
+        entries.append(_ENTRY.pack(name, offset, len(stored), len(raw)))
+        payloads.append(stored + b"\0" * padding)
+        offset += len(stored) + padding
+
+    header = _HEADER.pack(MAGIC, FORMAT_VERSION, FLAG_ZLIB if compress else 0, len(sections), len(nodes), len(edges))
+    head = header + b"".join(entries)
+    return head + b"\0" * (-len(head) % _ALIGN) + b"".join(payloads)
+
+
+def write_hpg_binary(hpg: dict, out: Union[str, Path, BinaryIO], *, compress: bool = True) -> None:
+    data = dumps_hpg_binary(hpg, compress=compress)
+    if isinstance(out, (str, Path)):
+        Path(out).write_bytes(data)
+    else:
+        out.write(data)
+
+
+# ---------- Reader ----------
+
+
+class _Records(Sequence):
+    """Nodes or edges of a container, decoded on access."""
+
+    def __init__(self, reader: "HPGBinaryReader", prefix: bytes, count: int) -> None:
+        self._reader = reader
+        self._prefix = prefix
+        self._count = count
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index: Any) -> Any:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._count))]
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("HPG record index out of range")
+        return self._reader._record(self._prefix, self._count, index)
+
+
+class HPGBinaryReader:
+    """Read an HPG container, memory-mapping it when given a path.
+
+    Only the header and directory are parsed up front.  A section is
+    decompressed (or, uncompressed, viewed in place in the mapping) the
+    first time it is needed, strings are decoded once on first use, and
+    ``nodes``/``edges`` decode one record per access.
+    """
+
+    def __init__(self, source: Union[str, Path, bytes]) -> None:
+        self._file: Optional[BinaryIO] = None
+        self._mmap: Optional[mmap.mmap] = None
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            buffer: Any = bytes(source)
+        else:
+            self._file = open(source, "rb")
+            buffer = self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._buffer = memoryview(buffer)
+        self._sections: Dict[bytes, Any] = {}
+        self._strings: Dict[int, str] = {}
+        try:
+            self._read_directory()
+        except Exception:
+            self.close()
+            raise
+
+    def _read_directory(self) -> None:
+        if len(self._buffer) < _HEADER.size:
+            raise ValueError("not an HPG container")
+        magic, version, flags, count, nodes, edges = _HEADER.unpack_from(self._buffer, 0)
+        if magic != MAGIC:
+            raise ValueError("not an HPG container")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"unsupported HPG container version {version}")
+        self.version = version
+        self.compressed = bool(flags & FLAG_ZLIB)
+        self._directory: Dict[bytes, Tuple[int, int, int]] = {}
+        for index in range(count):
+            name, offset, stored, raw = _ENTRY.unpack_from(self._buffer, _HEADER.size + index * _ENTRY.size)
+            self._directory[name.rstrip(b"\0")] = (offset, stored, raw)
+        self.nodes = _Records(self, b"n", nodes)
+        self.edges = _Records(self, b"e", edges)
+
+    def __enter__(self) -> "HPGBinaryReader":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        # Views must be released before the mapping can close; casts were
+        # added after the slices they view.
+        for section in reversed(list(self._sections.values())):
+            if isinstance(section, memoryview):
+                section.release()
+        self._sections.clear()
+        self._buffer.release()
+        if self._mmap is not None:
+            self._mmap.close()
+        if self._file is not None:
+            self._file.close()
+
+    def _bytes(self, name: bytes) -> Any:
+        section = self._sections.get(name)
+        if section is None:
+            offset, stored, _ = self._directory[name]
+            section = self._buffer[offset : offset + stored]
+            if self.compressed:
+                section = memoryview(zlib.decompress(section))
+            self._sections[name] = section
+        return section
+
+    def _ints(self, name: bytes) -> Any:
+        key = name + b"#"
+        ints = self._sections.get(key)
+        if ints is None:
+            raw = self._bytes(name)
+            if _SWAP:
+                ints = array(_U32, raw)
+                ints.byteswap()
+            else:
+                ints = raw.cast(_U32)
+            self._sections[key] = ints
+        return ints
+
+    def string(self, key: int) -> str:
+        """The string with table id ``key`` (ids start at 1)."""
+        value = self._strings.get(key)
+        if value is None:
+            offsets = self._ints(b"stroff")
+            value = self._strings[key] = str(self._bytes(b"strblob")[offsets[key - 1] : offsets[key]], "utf-8")
+        return value
+
+    def _record(self, prefix: bytes, count: int, index: int) -> Dict[str, Any]:
+        record: Dict[str, Any] = {}
+        data = self._ints(prefix + b"data")
+        for column, name_id in enumerate(self._ints(prefix + b"cols")):
+            value = data[column * count + index]
+            if value:
+                record[self.string(name_id)] = self.string(value)
+        offsets = self._ints(prefix + b"metaoff")
+        meta = self._ints(prefix + b"meta")
+        record["meta"] = {
+            self.string(meta[2 * i]): self.string(meta[2 * i + 1]) for i in range(offsets[index], offsets[index + 1])
+        }
+        return record
+
+    def _all_strings(self) -> List[Optional[str]]:
+        offsets = self._ints(b"stroff")
+        blob = bytes(self._bytes(b"strblob"))
+        return [None] + [blob[start:end].decode("utf-8") for start, end in zip(offsets, offsets[1:])]
+
+    def _all_records(self, prefix: bytes, count: int, strings: List[Optional[str]]) -> List[Dict[str, Any]]:
+        rows: List[Dict[str, Any]] = [{} for _ in range(count)]
+        data = self._ints(prefix + b"data")
+        for column, name_id in enumerate(self._ints(prefix + b"cols")):
+            name = strings[name_id]
+            for row, value in zip(rows, data[column * count : (column + 1) * count]):
+                if value:
+                    row[name] = strings[value]
+        offsets = self._ints(prefix + b"metaoff")
+        meta = [strings[key] for key in self._ints(prefix + b"meta")]
+        for index, row in enumerate(rows):
+            start, end = 2 * offsets[index], 2 * offsets[index + 1]
+            row["meta"] = dict(zip(meta[start:end:2], meta[start + 1 : end : 2]))
+        return rows
+
+    def to_dict(self) -> dict:
+        """The full HPG dict, as passed to :func:`dumps_hpg_binary`.
+
+        Decodes column by column, which is much faster than reading every
+        record through ``nodes``/``edges``.
+        """
+        strings = self._all_strings()
+        return {
+            "nodes": self._all_records(b"n", len(self.nodes), strings),
+            "edges": self._all_records(b"e", len(self.edges), strings),
+        }
+
+
+def load_hpg_binary(source: Union[str, Path, bytes]) -> dict:
+    with HPGBinaryReader(source) as reader:
+        return reader.to_dict()
@@ -1,7 +1,10 @@
 from __future__ import annotations
 
-from dataclasses import asdict, dataclass, field
-from typing import Dict, List
+import json
+import shutil
+import tempfile
+from dataclasses import dataclass, field, fields
+from typing import Any, Dict, List, Optional, TextIO, Tuple
 
 IN_SPACE = "in_space"
 INTERPRETS = "interprets"
@@ -70,6 +73,23 @@ class HPGEdge:
     meta: Dict[str, str] = field(default_factory=dict)
 
 
+_NODE_FIELDS: Dict[type, Tuple[str, ...]] = {}
+
+
+def node_to_dict(node: HPGNode) -> Dict[str, Any]:
+    """JSON-ready fields of ``node``; only ``meta`` is copied."""
+    names = _NODE_FIELDS.get(type(node))
+    if names is None:
+        names = _NODE_FIELDS[type(node)] = tuple(f.name for f in fields(node))
+    data = {name: getattr(node, name) for name in names}
+    data["meta"] = dict(node.meta)
+    return data
+
+
+def edge_to_dict(edge: HPGEdge) -> Dict[str, Any]:
+    return {"from": edge.from_id, "to": edge.to_id, "type": edge.type, "meta": dict(edge.meta)}
+
+
 @dataclass
 class HPGGraph:
     nodes: List[HPGNode] = field(default_factory=list)
@@ -92,14 +112,86 @@ class HPGGraph:
 
     def to_dict(self) -> dict:
         return {
-            "nodes": [asdict(node) for node in self.nodes],
-            "edges": [
-                {"from": edge.from_id, "to": edge.to_id, "type": edge.type, "meta": edge.meta}
-                for edge in self.edges
-            ],
+            "nodes": [node_to_dict(node) for node in self.nodes],
+            "edges": [edge_to_dict(edge) for edge in self.edges],
         }
 
 
+def dumps_graph_json(data: Any, *, indent: Optional[int] = 2) -> str:
+    """Graph JSON text of ``data``: sorted keys, ``indent`` spaces per level,
+    or with ``indent=None`` a single line without spaces after separators."""
+    separators = (",", ":") if indent is None else None
+    return json.dumps(data, sort_keys=True, indent=indent, separators=separators)
+
+
+class HPGStreamWriter:
+    """Write-through counterpart of :class:`HPGGraph` for graph JSON.
+
+    Nodes and edges are serialized as soon as they are added and only the
+    dedup keys stay in memory.  Closing the writer completes the document,
+    which is exactly ``dumps_graph_json({"nodes": ..., "edges": ...},
+    indent=indent)``.  Edges sort first, so they go straight to ``out`` while nodes are spooled
+    to a temporary file until :meth:`close`.
+    """
+
+    def __init__(self, out: TextIO, *, indent: Optional[int] = 2) -> None:
+        self._out = out
+        self._indent = indent
+        self._pad = "" if indent is None else "\n" + " " * indent
+        self._nodes: TextIO = tempfile.TemporaryFile("w+", encoding="utf-8")
+        self._node_ids: set[str] = set()
+        self._edge_keys: set[tuple[str, str, str]] = set()
+        self._node_count = 0
+        self._edge_count = 0
+        out.write("{" + self._pad + self._key("edges"))
+
+    def __enter__(self) -> "HPGStreamWriter":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        if exc_info[0] is None:
+            self.close()
+        else:
+            self._nodes.close()
+
+    def _key(self, name: str) -> str:
+        return json.dumps(name) + (":" if self._indent is None else ": ") + "["
+
+    def _item(self, data: Dict[str, Any], index: int) -> str:
+        text = dumps_graph_json(data, indent=self._indent)
+        if self._indent is not None:
+            # json.dumps escapes newlines inside strings, so every newline
+            # here is structural and can be re-indented one list level down.
+            text = text.replace("\n", self._pad + " " * self._indent)
+        return ("," if index else "") + self._pad + " " * (self._indent or 0) + text
+
+    def _close_list(self, count: int) -> str:
+        return (self._pad if count else "") + "]"
+
+    def add_node(self, node: HPGNode) -> None:
+        if node.id in self._node_ids:
+            return
+        self._node_ids.add(node.id)
+        self._nodes.write(self._item(node_to_dict(node), self._node_count))
+        self._node_count += 1
+
+    def add_edge(self, edge: HPGEdge) -> None:
+        edge_key = (edge.from_id, edge.to_id, edge.type)
+        if edge_key in self._edge_keys:
+            return
+        self._edge_keys.add(edge_key)
+        self._out.write(self._item(edge_to_dict(edge), self._edge_count))
+        self._edge_count += 1
+
+    def close(self) -> None:
+        out = self._out
+        out.write(self._close_list(self._edge_count) + "," + self._pad + self._key("nodes"))
+        self._nodes.seek(0)
+        shutil.copyfileobj(self._nodes, out)
+        self._nodes.close()
+        out.write(self._close_list(self._node_count) + ("" if self._indent is None else "\n") + "}")
+
+
 def build_minimal_example_hpg() -> HPGGraph:
     graph = HPGGraph()
 
@@ -0,0 +1,391 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import math
+import os
+import random
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+from .exporters import node_first_steps
+
+try:  # NumPy is optional; without it the pure-Python grid backend is used.
+    import numpy as np
+except ImportError:  # pragma: no cover - depends on the environment
+    np = None
+
+# Bump whenever the force model or the stored layout changes; it is part of
+# every key, so stale cache entries are simply never hit again.
+LAYOUT_FORMAT = 2
+
+# Ideal edge length, in the viewer's pixels (its nodes are 180 x 56).
+IDEAL_LENGTH = 160.0
+# Horizontal distance between proof steps: like the viewer's left-to-right
+# dagre layout, a node that first appears at step N is pulled towards
+# column N.
+STEP_SEPARATION = 2 * IDEAL_LENGTH
+# Nodes further apart than this do not repel each other, which lets both
+# backends only look at neighbouring cells of a grid this wide.
+REPULSION_CUTOFF = 2 * IDEAL_LENGTH
+
+Positions = Dict[str, Tuple[float, float]]
+
+
+# ---------- Keys ----------
+
+
+def graph_hash(hpg: dict) -> str:
+    """Hash of what a layout depends on: node ids and kinds, and edges.
+
+    Labels and ``meta`` (including coordinates written by an earlier
+    layout) are left out, so relabelling a graph keeps its layout.
+    """
+    nodes = sorted((node["id"], node.get("kind", "")) for node in hpg.get("nodes", []))
+    edges = sorted((edge["from"], edge["to"]) for edge in hpg.get("edges", []))
+    return hashlib.sha256(repr((nodes, edges)).encode("utf-8")).hexdigest()
+
+
+def layout_key(
+    hpg: dict,
+    *,
+    seed: int,
+    iterations: int,
+    backend: str,
+    time_budget: Optional[float] = None,
+) -> str:
+    """Key of a layout; ``time_budget`` is the budget that cut the run short,
+    or ``None`` for a run that finished all ``iterations`` undisturbed."""
+    payload: Tuple[object, ...] = (LAYOUT_FORMAT, graph_hash(hpg), seed, iterations, backend)
+    if time_budget is not None:
+        payload += (time_budget,)
+    return hashlib.sha256(repr(payload).encode("utf-8")).hexdigest()
+
+
+# ---------- Cache ----------
+
+
+class LayoutCache:
+    """Layouts keyed by :func:`layout_key`: an in-memory LRU, and with
+    ``directory`` set one JSON file per layout that later processes reuse.
+    """
+
+    def __init__(self, directory: Optional[Union[str, Path]] = None, *, max_entries: int = 16) -> None:
+        self.directory = None if directory is None else Path(directory)
+        self.max_entries = max_entries
+        self._memory: "OrderedDict[str, Positions]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key: str) -> Path:
+        assert self.directory is not None
+        return self.directory / f"{key}.json"
+
+    def get(self, key: str, *fallbacks: str) -> Optional[Positions]:
+        """The layout stored under ``key``, else under the first of
+        ``fallbacks`` that has one; counts as a single hit or miss."""
+        for candidate in (key, *fallbacks):
+            positions = self._load(candidate)
+            if positions is not None:
+                self._remember(candidate, positions)
+                self.hits += 1
+                return positions
+        self.misses += 1
+        return None
+
+    def _load(self, key: str) -> Optional[Positions]:
+        positions = self._memory.get(key)
+        if positions is None and self.directory is not None:
+            try:
+                stored = json.loads(self._path(key).read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                stored = None
+            if isinstance(stored, dict):
+                positions = {node_id: (x, y) for node_id, (x, y) in stored.items()}
+        return positions
+
+    def put(self, key: str, positions: Positions) -> None:
+        self._remember(key, positions)
+        if self.directory is None:
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self._path(key)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps({node_id: list(xy) for node_id, xy in positions.items()}), encoding="utf-8")
+        os.replace(tmp, path)
+
+    def _remember(self, key: str, positions: Positions) -> None:
+        self._memory[key] = positions
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+
+# ---------- Force simulation ----------
+#
+# Fruchterman-Reingold: nodes closer than REPULSION_CUTOFF repel with
+# k^2 / d, edges attract with d^2 / k, and nodes with a proof step are also
+# pulled horizontally towards their step's column.  Each iteration moves a
+# node by at most the temperature, which cools linearly to zero over the
+# run.  Both backends bucket nodes into the same grid cells and compute the
+# same forces; NumPy does it for all pairs of an iteration at once.
+
+
+def _python_step(
+    xs: List[float],
+    ys: List[float],
+    edges: Sequence[Tuple[int, int]],
+    anchors: Sequence[Tuple[int, float]],
+    temperature: float,
+) -> None:
+    k2 = IDEAL_LENGTH * IDEAL_LENGTH
+    cutoff2 = REPULSION_CUTOFF * REPULSION_CUTOFF
+    n = len(xs)
+    dx = [0.0] * n
+    dy = [0.0] * n
+
+    grid: Dict[Tuple[int, int], List[int]] = {}
+    for i in range(n):
+        cell = (int(xs[i] // REPULSION_CUTOFF), int(ys[i] // REPULSION_CUTOFF))
+        grid.setdefault(cell, []).append(i)
+    for (cx, cy), members in grid.items():
+        neighbours = [j for ox in (-1, 0, 1) for oy in (-1, 0, 1) for j in grid.get((cx + ox, cy + oy), ())]
+        for i in members:
+            xi, yi = xs[i], ys[i]
+            fx = fy = 0.0
+            for j in neighbours:
+                ddx = xi - xs[j]
+                ddy = yi - ys[j]
+                d2 = ddx * ddx + ddy * ddy
+                if j == i or d2 >= cutoff2:
+                    continue
+                force = k2 / max(d2, 0.01)
+                fx += ddx * force
+                fy += ddy * force
+            dx[i] += fx
+            dy[i] += fy
+
+    for i, j in edges:
+        ddx = xs[i] - xs[j]
+        ddy = ys[i] - ys[j]
+        force = math.sqrt(ddx * ddx + ddy * ddy) / IDEAL_LENGTH
+        dx[i] -= ddx * force
+        dy[i] -= ddy * force
+        dx[j] += ddx * force
+        dy[j] += ddy * force
+
+    for i, target in anchors:
+        dx[i] += target - xs[i]
+
+    for i in range(n):
+        length = math.sqrt(dx[i] * dx[i] + dy[i] * dy[i])
+        if length > 0.0:
+            scale = min(length, temperature) / length
+            xs[i] += dx[i] * scale
+            ys[i] += dy[i] * scale
+
+
+def _numpy_neighbour_pairs(pos: "np.ndarray") -> Tuple["np.ndarray", "np.ndarray"]:
+    """``(i, j)`` index arrays, ``i < j``, of every pair of nodes in the same
+    or adjacent grid cells: the pairs ``_python_step`` visits, once each."""
+    cells = np.floor_divide(pos, REPULSION_CUTOFF).astype(np.int64)
+    # Shift so neighbouring cells have non-negative coordinates, then number
+    # cells row-major with room for the neighbours of the last column.
+    cells -= cells.min(axis=0) - 1
+    width = int(cells[:, 1].max()) + 2
+    keys = cells[:, 0] * width + cells[:, 1]
+    order = np.argsort(keys, kind="stable")
+    occupied, starts, counts = np.unique(keys[order], return_index=True, return_counts=True)
+
+    sources = []
+    targets = []
+    for ox in (-1, 0, 1):
+        for oy in (-1, 0, 1):
+            wanted = keys + ox * width + oy
+            slot = np.minimum(np.searchsorted(occupied, wanted), len(occupied) - 1)
+            nodes = np.flatnonzero(occupied[slot] == wanted)
+            size = counts[slot[nodes]]
+            # Ragged ranges: node ``nodes[k]`` pairs with ``size[k]`` members
+            # of its neighbour cell, stored contiguously in ``order``.
+            first = np.repeat(starts[slot[nodes]] - (np.cumsum(size) - size), size)
+            sources.append(np.repeat(nodes, size))
+            targets.append(order[first + np.arange(int(size.sum()))])
+    i = np.concatenate(sources)
+    j = np.concatenate(targets)
+    once = i < j
+    return i[once], j[once]
+
+
+def _numpy_step(
+    pos: "np.ndarray",
+    sources: "np.ndarray",
+    targets: "np.ndarray",
+    anchor_index: "np.ndarray",
+    anchor_x: "np.ndarray",
+    temperature: float,
+) -> None:
+    n = len(pos)
+    if n == 0:
+        return
+    disp = np.zeros_like(pos)
+
+    i, j = _numpy_neighbour_pairs(pos)
+    delta = pos[i] - pos[j]
+    d2 = np.einsum("ij,ij->i", delta, delta)
+    near = d2 < REPULSION_CUTOFF**2
+    i, j = i[near], j[near]
+    push = delta[near] * (IDEAL_LENGTH**2 / np.maximum(d2[near], 0.01))[:, None]
+    for axis in (0, 1):
+        disp[:, axis] += np.bincount(i, weights=push[:, axis], minlength=n)
+        disp[:, axis] -= np.bincount(j, weights=push[:, axis], minlength=n)
+
+    delta = pos[sources] - pos[targets]
+    pull = delta * (np.sqrt(np.einsum("ij,ij->i", delta, delta)) / IDEAL_LENGTH)[:, None]
+    for axis in (0, 1):
+        disp[:, axis] -= np.bincount(sources, weights=pull[:, axis], minlength=n)
+        disp[:, axis] += np.bincount(targets, weights=pull[:, axis], minlength=n)
+
+    disp[anchor_index, 0] += anchor_x - pos[anchor_index, 0]
+
+    length = np.sqrt(np.einsum("ij,ij->i", disp, disp))
+    scale = np.minimum(length, temperature) / np.maximum(length, 1e-12)
+    pos += disp * scale[:, None]
+
+
+def _resolve_backend(backend: Optional[str]) -> str:
+    if backend is None:
+        return "python" if np is None else "numpy"
+    if backend not in ("numpy", "python"):
+        raise ValueError(f"unknown layout backend {backend!r}")
+    if backend == "numpy" and np is None:
+        raise RuntimeError("the numpy layout backend needs NumPy installed")
+    return backend
+
+
+def _simulate(
+    hpg: dict,
+    *,
+    seed: int,
+    iterations: int,
+    time_budget: Optional[float],
+    backend: str,
+) -> Tuple[Positions, bool]:
+    """Run the simulation; also return whether the budget never interfered.
+
+    Only then is the run finished and its result determined by ``seed``,
+    ``iterations`` and ``backend`` alone.
+    """
+    ids = [node["id"] for node in hpg.get("nodes", [])]
+    index = {node_id: i for i, node_id in enumerate(ids)}
+    edges = sorted(
+        {
+            (min(index[e["from"]], index[e["to"]]), max(index[e["from"]], index[e["to"]]))
+            for e in hpg.get("edges", [])
+            if e["from"] in index and e["to"] in index and e["from"] != e["to"]
+        }
+    )
+    steps = node_first_steps(hpg)
+    anchors = [(index[node_id], step * STEP_SEPARATION) for node_id, step in steps.items() if node_id in index]
+
+    rng = random.Random(seed)
+    spread = IDEAL_LENGTH * math.sqrt(max(len(ids), 1))
+    anchor_of = dict(anchors)
+    xs = [anchor_of.get(i, rng.uniform(0.0, spread)) + rng.uniform(-1.0, 1.0) for i in range(len(ids))]
+    ys = [rng.uniform(0.0, spread) for _ in ids]
+
+    if backend == "numpy":
+        pos = np.array([xs, ys], dtype=float).T.copy()
+        sources = np.array([i for i, _ in edges], dtype=np.intp)
+        targets = np.array([j for _, j in edges], dtype=np.intp)
+        anchor_index = np.array([i for i, _ in anchors], dtype=np.intp)
+        anchor_x = np.array([x for _, x in anchors], dtype=float)
+
+    started = time.perf_counter()
+    initial = IDEAL_LENGTH
+    finished = True
+    for iteration in range(iterations):
+        progress = iteration / iterations
+        if time_budget is not None:
+            elapsed = time.perf_counter() - started
+            if iteration and elapsed >= time_budget:
+                finished = False
+                break
+            # Cool by whichever runs out first, so a layout cut short by the
+            # budget has still settled.
+            spent = elapsed / time_budget if time_budget > 0 else 1.0
+            if spent > progress:
+                finished = False
+                progress = spent
+        temperature = initial * (1.0 - progress) + 1.0
+        if backend == "numpy":
+            _numpy_step(pos, sources, targets, anchor_index, anchor_x, temperature)
+        else:
+            _python_step(xs, ys, edges, anchors, temperature)
+
+    if backend == "numpy":
+        xs, ys = pos[:, 0].tolist(), pos[:, 1].tolist()
+    # Shift to the positive quadrant; the viewer treats these as node centres.
+    min_x = min(xs, default=0.0)
+    min_y = min(ys, default=0.0)
+    positions = {node_id: (round(x - min_x, 1), round(y - min_y, 1)) for node_id, x, y in zip(ids, xs, ys)}
+    return positions, finished
+
+
+# ---------- Public API ----------
+
+
+def layout_hpg(
+    hpg: dict,
+    *,
+    seed: int = 0,
+    iterations: int = 300,
+    time_budget: Optional[float] = 5.0,
+    cache: Optional[LayoutCache] = None,
+    backend: Optional[str] = None,
+) -> Positions:
+    """Force-directed node positions for ``hpg``, keyed by node id.
+
+    ``backend`` is "numpy" (vectorized, the default when NumPy is
+    installed) or "python" (a grid over the cutoff radius).  The run stops
+    after ``iterations`` or ``time_budget`` seconds, whichever comes first,
+    and cools faster when the budget would run out first.
+
+    With a ``cache``, a finished layout (one the budget did not affect) is
+    stored under the graph, ``seed``, ``iterations`` and ``backend`` and
+    served to every later call, whatever its budget.  A layout the budget
+    cut short is stored under that budget as well and only served to calls
+    with the same budget, so re-exporting an unchanged large graph is
+    instant while ``time_budget=None`` or a different budget still
+    recomputes it.
+    """
+    backend = _resolve_backend(backend)
+    if cache is not None:
+        full_key = layout_key(hpg, seed=seed, iterations=iterations, backend=backend)
+        keys = [full_key]
+        if time_budget is not None:
+            keys.append(layout_key(hpg, seed=seed, iterations=iterations, backend=backend, time_budget=time_budget))
+        positions = cache.get(*keys)
+        if positions is not None:
+            return positions
+    positions, finished = _simulate(
+        hpg, seed=seed, iterations=iterations, time_budget=time_budget, backend=backend
+    )
+    if cache is not None:
+        cache.put(keys[0] if finished else keys[-1], positions)
+    return positions
+
+
+def apply_layout(hpg: dict, positions: Positions) -> dict:
+    """Write ``positions`` into node ``meta`` as ``x``/``y`` and return ``hpg``.
+
+    Like every HPG meta value the coordinates are strings.
+    """
+    for node in hpg.get("nodes", []):
+        xy = positions.get(node["id"])
+        if xy is not None:
+            meta = node.setdefault("meta", {})
+            meta["x"] = f"{xy[0]:.1f}"
+            meta["y"] = f"{xy[1]:.1f}"
+    return hpg
@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from dataclasses import replace
+from typing import Any, Hashable, List, Mapping, Optional, Tuple
+
+from .core import FactDelta, State
+from .prisms import Prism, PrismResult
+from .trace_schema import TraceRecord
+
+# Trace entries a child appended since it was copied, as plain tuples:
+# ``("message", text)``, ``("step", step, in_trace)`` or, for a step not
+# rendered yet, ``("defer", prism name, activation)``.  Holding no trace
+# records keeps parents' chains collectable and the tuples picklable.
+EncodedTrace = Tuple[Tuple[Any, ...], ...]
+# What one firing added to its parent: fact delta, resulting mode and trace.
+ChildDelta = Tuple[FactDelta, str, EncodedTrace]
+MemoEntry = Tuple[List[Any], Tuple[ChildDelta, ...]]
+
+
+def encode_trace(state: State) -> EncodedTrace:
+    """Encode the trace chain ``state`` added since the copy, unrendered."""
+    if state.trace_head is None:
+        return ()
+    encoded: List[Tuple[Any, ...]] = []
+    for node in state.trace_head.chain(state.trace_origin):
+        if not node.is_step:
+            encoded.append(("message", node.message))
+        elif node.rendered:
+            encoded.append(("step", node.step, node.in_trace))
+        else:
+            encoded.append(("defer", node.prism.name, node.activation))
+    return tuple(encoded)
+
+
+def apply_delta(state: State, delta: FactDelta) -> None:
+    """Add every fact and triangle of ``delta`` to ``state``."""
+    facts = state.facts
+    for fact in delta.on_rays:
+        facts.add_on_ray(fact.point, fact.ray)
+    for seg1, seg2 in delta.eq_segs:
+        facts.add_eqseg(seg1, seg2)
+    for ang1, ang2 in delta.eq_angs:
+        facts.add_eqang(ang1, ang2)
+    for fact in delta.congruent:
+        facts.add_congruent(fact)
+    for corr in delta.correspondences:
+        facts.add_correspondence(corr)
+    state.triangles.extend(delta.triangles)
+
+
+def replay_child(
+    parent: State,
+    delta: FactDelta,
+    mode: str,
+    trace: EncodedTrace,
+    prisms: Mapping[str, Prism],
+) -> PrismResult:
+    """Rebuild a child as a copy of ``parent`` plus what it added.
+
+    Deferred steps are re-deferred on the prism of that name in ``prisms``.
+    Steps are renumbered against the new parent's trace, since they were
+    recorded on another state (or in another process).
+    """
+    child = parent.copy()
+    apply_delta(child, delta)
+    child.mode = mode
+    for kind, *payload in trace:
+        if kind == "message":
+            child.add_trace(payload[0])
+        elif kind == "defer":
+            child.defer_step(prisms[payload[0]], payload[1])
+        else:
+            step, in_trace = payload
+            step = replace(step, id=f"hstep:{len(child.htrace)}")
+            child.trace_head = TraceRecord(child.trace_head, step=step, in_trace=in_trace)
+    return PrismResult(child)
+
+
+def child_delta(res: PrismResult) -> ChildDelta:
+    child = res.state
+    return child.delta(), child.mode, encode_trace(child)
+
+
+def replay_delta(parent: State, delta: ChildDelta, prisms: Mapping[str, Prism]) -> PrismResult:
+    """Rebuild a memoized child as a copy of ``parent`` plus ``delta``."""
+    return replay_child(parent, *delta, prisms)
+
+
+class PrismMemo:
+    """Bounded LRU of prism expansions keyed by relevant facts.
+
+    For a prism whose :meth:`Prism.memo_key` is not ``None``, the entry under
+    ``(prism, key)`` holds the activations and the delta of every child the
+    prism produced.  Any other state with the same key gets the same
+    children by replaying those deltas, without matching or firing again.
+    Children inherit their parent's mode, so entries are also keyed by it.
+    Keys only mention hashable facts, so a memo can be shared by several
+    searches in one process.
+    """
+
+    def __init__(self, max_entries: int = 4096) -> None:
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, MemoEntry]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, prism: Prism, state: State, key: Hashable) -> Optional[MemoEntry]:
+        full_key = (prism.name, prism.version, state.mode, key)
+        entry = self._entries.get(full_key)
+        if entry is not None:
+            self._entries.move_to_end(full_key)
+        return entry
+
+    def put(self, prism: Prism, state: State, key: Hashable, entry: MemoEntry) -> None:
+        full_key = (prism.name, prism.version, state.mode, key)
+        self._entries[full_key] = entry
+        self._entries.move_to_end(full_key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
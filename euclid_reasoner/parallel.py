@@ -0,0 +1,396 @@
+from __future__ import annotations
+
+import itertools
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+from .agenda import Agenda
+from .core import (
+    Angle,
+    Congruent,
+    FactDelta,
+    OnRay,
+    Segment,
+    State,
+    SymbolTable,
+    Triangle,
+    TriangleCorrespondence,
+)
+from .goals import evaluate_goal
+from .memo import PrismMemo, apply_delta, encode_trace, replay_child
+from .prisms import Prism, PrismResult
+from .types import SearchStats
+
+# ---------- Compact picklable encoding ----------
+#
+# States cross the process boundary as nested tuples of strings plus the
+# class of their fact store: no instances, traces or derived indexes.  Children come back as
+# the delta their prism added, which the parent process replays onto a
+# structural-sharing copy of the original state.  Deferred trace steps are
+# shipped unrendered, as the activation their prism fired on.
+
+EncodedState = Tuple[Any, ...]
+EncodedChild = Tuple[Any, ...]
+
+
+def _enc_seg(seg: Segment) -> Tuple[str, str]:
+    return (seg.p, seg.q)
+
+
+def _enc_ang(ang: Angle) -> Tuple[str, str, str]:
+    return (ang.a, ang.v, ang.c)
+
+
+def _enc_tri(tri: Triangle) -> Tuple[str, Tuple[str, str, str]]:
+    return (tri.name, tri.vertices)
+
+
+def _dec_tri(symbols: SymbolTable, enc: Tuple[str, Tuple[str, str, str]]) -> Triangle:
+    return symbols.triangle(enc[0], tuple(enc[1]))
+
+
+def _encode_facts(
+    on_rays: Iterable[OnRay],
+    eq_segs: Iterable[Tuple[Segment, Segment]],
+    eq_angs: Iterable[Tuple[Angle, Angle]],
+    congruent: Iterable[Congruent],
+    correspondences: Iterable[TriangleCorrespondence],
+    triangles: Iterable[Triangle],
+) -> Tuple[Any, ...]:
+    return (
+        tuple((f.point, f.ray) for f in on_rays),
+        tuple((_enc_seg(a), _enc_seg(b)) for a, b in eq_segs),
+        tuple((_enc_ang(a), _enc_ang(b)) for a, b in eq_angs),
+        tuple((_enc_tri(c.t1), _enc_tri(c.t2), c.mapping) for c in congruent),
+        tuple((_enc_tri(c.t1), _enc_tri(c.t2), c.mapping) for c in correspondences),
+        tuple(_enc_tri(t) for t in triangles),
+    )
+
+
+def _decode_facts(sym: SymbolTable, encoded: Tuple[Any, ...]) -> FactDelta:
+    on_rays, eq_segs, eq_angs, congruent, correspondences, triangles = encoded
+    return FactDelta(
+        on_rays=tuple(OnRay(point, ray) for point, ray in on_rays),
+        eq_segs=tuple((sym.segment(*a), sym.segment(*b)) for a, b in eq_segs),
+        eq_angs=tuple((sym.angle(*a), sym.angle(*b)) for a, b in eq_angs),
+        congruent=tuple(Congruent(_dec_tri(sym, t1), _dec_tri(sym, t2), mapping) for t1, t2, mapping in congruent),
+        correspondences=tuple(
+            TriangleCorrespondence(_dec_tri(sym, t1), _dec_tri(sym, t2), mapping) for t1, t2, mapping in correspondences
+        ),
+        triangles=tuple(_dec_tri(sym, t) for t in triangles),
+    )
+
+
+def encode_state(state: State) -> EncodedState:
+    """Encode the facts, triangles, mode and fact-store class of ``state``
+    (not its trace); :func:`decode_state` rebuilds the same backend."""
+    facts = state.facts
+    return (
+        _encode_facts(
+            facts.on_rays,
+            facts.eq_segs,
+            facts.eq_angs,
+            facts.congruent,
+            facts.correspondences,
+            state.triangles,
+        ),
+        state.mode,
+        type(facts),
+    )
+
+
+def decode_state(encoded: EncodedState) -> State:
+    facts_enc, mode, facts_class = encoded
+    state = State(facts=facts_class(), mode=mode)
+    apply_delta(state, _decode_facts(state.symbols, facts_enc))
+    return state
+
+
+def encode_child(res: PrismResult) -> EncodedChild:
+    child = res.state
+    delta = child.delta()
+    return (
+        _encode_facts(
+            delta.on_rays,
+            delta.eq_segs,
+            delta.eq_angs,
+            delta.congruent,
+            delta.correspondences,
+            delta.triangles,
+        ),
+        child.mode,
+        encode_trace(child),
+    )
+
+
+def decode_child(parent: State, encoded: EncodedChild, prisms: Dict[str, Prism]) -> PrismResult:
+    """Rebuild a worker-produced child as a copy of ``parent`` plus its delta.
+
+    ``prisms`` maps names to the prisms deferred steps are rendered with.
+    """
+    facts_enc, mode, trace = encoded
+    return replay_child(parent, _decode_facts(parent.symbols, facts_enc), mode, trace, prisms)
+
+
+# ---------- Worker side ----------
+#
+# Every worker holds the whole previous beam.  Each new beam state is sent
+# to all workers as the position of its parent in that beam plus the delta
+# it added, so rebuilding the beam costs each worker O(delta) per state
+# instead of decoding whole states.  A worker then expands its share of the
+# beam; states whose parent it expanded itself still carry the activations
+# the agenda derived there, so those are updated incrementally as in the
+# serial run.  Each child goes back with its fingerprint, score and goal
+# verdicts, so the parent only rebuilds the children it keeps.
+
+_WORKER_AGENDA: Optional[Agenda] = None
+_WORKER_SCORE: Optional[Callable[[State], int]] = None
+_WORKER_BEAM: List[State] = []
+
+# ``("child", parent position in the previous beam, facts delta, mode)``
+# or ``("full", encoded state)``.
+Request = Tuple[Any, ...]
+# ``(encoded child, fingerprint, score, {goal name: verdict})``.
+ExpandedChild = Tuple[EncodedChild, int, int, Dict[str, Any]]
+
+
+def _init_worker(prisms: List[Prism], score: Callable[[State], int]) -> None:
+    global _WORKER_AGENDA, _WORKER_SCORE
+    _WORKER_AGENDA = Agenda(prisms)
+    _WORKER_SCORE = score
+
+
+def _request_state(request: Request, previous: List[State]) -> State:
+    if request[0] == "full":
+        return decode_state(request[1])
+    _, position, facts_enc, mode = request
+    parent = previous[position]
+    state = parent.copy()
+    apply_delta(state, _decode_facts(parent.symbols, facts_enc))
+    state.mode = mode
+    return state
+
+
+def _expand_level(
+    beam: List[Request],
+    assigned: List[int],
+    goals: Mapping[str, Any],
+) -> List[List[ExpandedChild]]:
+    """Rebuild the whole ``beam``, then expand the states at ``assigned``."""
+    global _WORKER_BEAM
+    assert _WORKER_AGENDA is not None and _WORKER_SCORE is not None
+    states = [_request_state(request, _WORKER_BEAM) for request in beam]
+    _WORKER_BEAM = states
+    expanded = []
+    for i in assigned:
+        children = []
+        for res in _WORKER_AGENDA.expand(states[i]):
+            child = res.state
+            verdicts = {name: evaluate_goal(goal, child, parent_failed=True) for name, goal in goals.items()}
+            children.append((encode_child(res), child.fingerprint(), _WORKER_SCORE(child), verdicts))
+        expanded.append(children)
+    return expanded
+
+
+def _picklable(value: Any) -> bool:
+    try:
+        pickle.dumps(value)
+    except Exception:
+        return False
+    return True
+
+
+# ---------- Level expanders ----------
+
+_EXPANDER_IDS = itertools.count()
+
+
+class RemoteResult:
+    """A child expanded by a worker, rebuilt from its delta when ``state``
+    is first read.
+
+    ``fingerprint`` and ``score`` were computed by the worker, and
+    ``goals`` maps the name of every goal the worker tested to its verdict.
+    """
+
+    __slots__ = ("fingerprint", "score", "goals", "_parent", "_encoded", "_origin", "_expander", "_state")
+
+    def __init__(
+        self,
+        parent: State,
+        expanded: ExpandedChild,
+        origin: Tuple[str, Tuple[Any, ...]],
+        expander: "ParallelExpander",
+    ) -> None:
+        self._encoded, self.fingerprint, self.score, self.goals = expanded
+        self._parent = parent
+        self._origin = origin
+        self._expander = expander
+        self._state: Optional[State] = None
+
+    @property
+    def state(self) -> State:
+        if self._state is None:
+            self._state = decode_child(self._parent, self._encoded, self._expander.prisms).state
+            key, origin = self._origin
+            self._state.derived[key] = origin
+        return self._state
+
+    @property
+    def description(self) -> str:
+        """Label of the step that produced ``state`` (rendered on demand)."""
+        return self.state.trace[-1]
+
+
+class SerialExpander:
+    """Expand every beam state in the calling process."""
+
+    def __init__(
+        self,
+        prisms: Iterable[Prism],
+        stats: Optional[SearchStats] = None,
+        memo: Optional[PrismMemo] = None,
+    ) -> None:
+        self.agenda = Agenda(prisms, stats=stats, memo=memo)
+
+    def expand_level(
+        self,
+        beam: Sequence[State],
+        goals: Optional[Mapping[str, Any]] = None,
+    ) -> Iterator[Tuple[State, List[PrismResult]]]:
+        """Yield each beam state with its children, in beam order.
+
+        ``goals`` is accepted for parity with :class:`ParallelExpander`;
+        children are goal-tested by the caller.
+        """
+        for state in beam:
+            yield state, list(self.agenda.expand(state))
+
+    def close(self) -> None:
+        pass
+
+
+class ParallelExpander:
+    """Fan prism expansion of a beam out over ``workers`` processes.
+
+    Every worker rebuilds the beam from the previous one (see
+    ``_expand_level``).  Each state is expanded by the worker that expanded
+    its parent unless that worker already has its share of the level; the
+    rest go to the least loaded workers.  Results are merged in beam order
+    and, within a state, in prism order, so the children (and hence the
+    whole search) match the serial run.
+
+    Children come back as :class:`RemoteResult`: workers fingerprint them,
+    rate them with ``score`` and test them against the picklable ``goals``
+    of :meth:`expand_level`, so the parent process only rebuilds the
+    children it reads.
+    """
+
+    def __init__(
+        self,
+        prisms: Iterable[Prism],
+        workers: int,
+        score: Callable[[State], int],
+        stats: Optional[SearchStats] = None,
+    ) -> None:
+        prisms = list(prisms)
+        self.workers = workers
+        self.stats = stats
+        self.prisms = {prism.name: prism for prism in prisms}
+        # One single-process pool per worker, so states can be routed.
+        self._pools = [
+            ProcessPoolExecutor(max_workers=1, initializer=_init_worker, initargs=(prisms, score))
+            for _ in range(workers)
+        ]
+        # Children decoded here carry ``(level, parent position, facts delta,
+        # mode)`` under this key; the workers hold the beam of ``_level``.
+        self._origin_key = f"parallel:{next(_EXPANDER_IDS)}"
+        self._level = 0
+        self._owners: List[int] = []
+
+    def _route(self, beam: Sequence[State]) -> Tuple[List[Request], List[int]]:
+        """The beam as worker requests, and the worker expanding each state."""
+        share = -(-len(beam) // self.workers)
+        requests: List[Request] = []
+        owners: List[Optional[int]] = []
+        loads = [0] * self.workers
+        for state in beam:
+            origin = state.derived.get(self._origin_key)
+            if origin is not None and origin[0] == self._level:
+                _, position, facts_enc, mode = origin
+                requests.append(("child", position, facts_enc, mode))
+                owner = self._owners[position]
+            else:
+                requests.append(("full", encode_state(state)))
+                owner = None
+            if owner is not None and loads[owner] < share:
+                loads[owner] += 1
+                owners.append(owner)
+            else:
+                owners.append(None)
+        for i, owner in enumerate(owners):
+            if owner is None:
+                owner = min(range(self.workers), key=loads.__getitem__)
+                loads[owner] += 1
+                owners[i] = owner
+        if self.stats is not None:
+            shipped = sum(request[0] == "full" for request in requests)
+            self.stats.states_from_parent += len(beam) - shipped
+            self.stats.states_shipped += shipped
+        return requests, owners  # type: ignore[return-value]
+
+    def expand_level(
+        self,
+        beam: Sequence[State],
+        goals: Optional[Mapping[str, Any]] = None,
+    ) -> Iterator[Tuple[State, List[RemoteResult]]]:
+        """Yield each beam state with its children, in beam order.
+
+        Goals that cannot be pickled are left out of the children's
+        ``goals`` verdicts for the caller to test.
+        """
+        shipped = {name: goal for name, goal in (goals or {}).items() if _picklable(goal)}
+        requests, owners = self._route(beam)
+        assigned: List[List[int]] = [[] for _ in self._pools]
+        for i, owner in enumerate(owners):
+            assigned[owner].append(i)
+        futures = [
+            pool.submit(_expand_level, requests, positions, shipped)
+            for pool, positions in zip(self._pools, assigned)
+        ]
+        self._level += 1
+        self._owners = owners
+        done: Dict[int, Iterator[List[ExpandedChild]]] = {}
+        for position, (state, owner) in enumerate(zip(beam, owners)):
+            if owner not in done:
+                done[owner] = iter(futures[owner].result())
+            children = []
+            for expanded in next(done[owner]):
+                facts_enc, mode, _ = expanded[0]
+                origin = (self._origin_key, (self._level, position, facts_enc, mode))
+                children.append(RemoteResult(state, expanded, origin, self))
+            yield state, children
+
+    def close(self) -> None:
+        for pool in self._pools:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+
+def make_expander(
+    prisms: Iterable[Prism],
+    workers: Optional[int] = None,
+    stats: Optional[SearchStats] = None,
+    memo: Optional[PrismMemo] = None,
+    score: Optional[Callable[[State], int]] = None,
+) -> Any:
+    """Serial expansion for ``workers`` in (None, 0, 1), a process pool otherwise.
+
+    ``memo`` is only used by the serial expander and ``score`` (required
+    with workers) only by the process pool.
+    """
+    if workers is None or workers <= 1:
+        return SerialExpander(prisms, stats=stats, memo=memo)
+    if score is None:
+        raise ValueError("a process pool needs a picklable score function")
+    return ParallelExpander(prisms, workers, score, stats=stats)
@@ -0,0 +1,360 @@
+from __future__ import annotations
+
+import hashlib
+from collections.abc import Mapping
+from collections.abc import Set as AbstractSet
+from collections.abc import Sequence
+from typing import Any, Generic, Iterable, Iterator, List, Optional, Tuple, TypeVar, Union, overload
+
+T = TypeVar("T")
+K = TypeVar("K")
+V = TypeVar("V")
+
+# Chains deeper than this are flattened on the next fork so that membership
+# tests and indexing stay bounded no matter how long a search lineage gets.
+MAX_LAYER_DEPTH = 16
+
+_ZOBRIST_KEYS: dict = {}
+
+
+def zobrist_key(item: Any) -> int:
+    """Return the 64-bit key of ``item``, a hash of its ``repr``.
+
+    Keys do not depend on the process, so fingerprints computed by
+    parallel workers can be compared with the parent's.
+    """
+    key = _ZOBRIST_KEYS.get(item)
+    if key is None:
+        digest = hashlib.blake2b(repr(item).encode(), digest_size=8).digest()
+        key = _ZOBRIST_KEYS[item] = int.from_bytes(digest, "little")
+    return key
+
+
+class _Layer:
+    """One frozen-once-shared level of a persistent collection."""
+
+    __slots__ = ("items", "parent", "depth", "base", "shared", "members")
+
+    def __init__(self, items: Any, parent: Optional["_Layer"]) -> None:
+        self.items = items
+        self.parent = parent
+        self.depth = 0 if parent is None else parent.depth + 1
+        self.base = 0 if parent is None else parent.base + len(parent.items)
+        self.shared = False
+        # Set of a list layer's items, built on the first membership test.
+        self.members: Optional[set] = None
+
+    def chain(self) -> List["_Layer"]:
+        """Return the layers from the root down to this one."""
+        layers: List[_Layer] = []
+        layer: Optional[_Layer] = self
+        while layer is not None:
+            layers.append(layer)
+            layer = layer.parent
+        layers.reverse()
+        return layers
+
+
+class _Persistent:
+    """Shared layering logic for the persistent set, list and map.
+
+    Every instance owns a writable top layer stacked on layers shared with its
+    ancestors.  ``fork`` is O(1): it marks the current layer as shared and
+    gives the child a fresh empty layer on top of it.  A shared layer is never
+    written again; a write to a forked parent first pushes a new layer.
+    """
+
+    __slots__ = ("_layer", "_origin", "_zhash")
+
+    _layer: _Layer
+    _origin: Optional[_Layer]
+    _zhash: Optional[int]
+
+    def _empty(self) -> Any:
+        raise NotImplementedError
+
+    def _entries(self, items: Any) -> Iterable[Any]:
+        return items
+
+    def _absorb(self, target: Any, entries: Iterable[Any]) -> None:
+        target.extend(entries)
+
+    def _writable(self) -> _Layer:
+        if self._layer.shared:
+            self._layer = _Layer(self._empty(), self._layer)
+        return self._layer
+
+    def _layers(self) -> Iterator[_Layer]:
+        return iter(self._layer.chain())
+
+    def _delta_layers(self) -> List[_Layer]:
+        layers: List[_Layer] = []
+        layer: Optional[_Layer] = self._layer
+        while layer is not None and layer is not self._origin:
+            layers.append(layer)
+            layer = layer.parent
+        layers.reverse()
+        return layers
+
+    def _compact(self) -> None:
+        """Flatten everything below the delta into a single root layer."""
+        delta = self.delta()
+        base_items = self._empty()
+        if self._origin is not None:
+            for layer in self._origin.chain():
+                self._absorb(base_items, self._entries(layer.items))
+        flat = _Layer(base_items, None)
+        flat.shared = True
+        own = self._empty()
+        self._absorb(own, delta)
+        self._layer = _Layer(own, flat)
+        self._origin = flat
+
+    def fork(self) -> Any:
+        """Return an O(1) child that shares every item currently held."""
+        if self._layer.depth >= MAX_LAYER_DEPTH:
+            self._compact()
+        self._layer.shared = True
+        child = object.__new__(type(self))
+        child._layer = _Layer(self._empty(), self._layer)
+        child._origin = self._layer
+        child._zhash = self._zhash
+        return child
+
+    def delta(self) -> List[Any]:
+        """Items added since this collection was forked from its parent."""
+        return [entry for layer in self._delta_layers() for entry in self._entries(layer.items)]
+
+    @property
+    def depth(self) -> int:
+        return self._layer.depth
+
+    @property
+    def hashed(self) -> bool:
+        return self._zhash is not None
+
+    @property
+    def zobrist(self) -> int:
+        """Order-independent hash of the distinct items, maintained on every add."""
+        if self._zhash is None:
+            raise TypeError(f"{type(self).__name__} was created without hash tracking")
+        return self._zhash
+
+
+class PersistentSet(_Persistent, AbstractSet, Generic[T]):
+    """A set whose copies share structure with the set they were forked from.
+
+    Layers are insertion-ordered (dict keys), so iteration and ``delta()``
+    replay items in the order they were added.
+    """
+
+    __slots__ = ()
+
+    def __init__(self, items: Iterable[T] = ()) -> None:
+        self._layer = _Layer(dict.fromkeys(items), None)
+        self._origin = None
+        self._zhash = 0
+        for item in self._layer.items:
+            self._zhash ^= zobrist_key(item)
+
+    def _empty(self) -> dict:
+        return {}
+
+    def _absorb(self, target: Any, entries: Iterable[Any]) -> None:
+        target.update(dict.fromkeys(entries))
+
+    @classmethod
+    def _from_iterable(cls, it: Iterable[T]) -> set:
+        return set(it)
+
+    def __contains__(self, item: object) -> bool:
+        layer: Optional[_Layer] = self._layer
+        while layer is not None:
+            if item in layer.items:
+                return True
+            layer = layer.parent
+        return False
+
+    def __iter__(self) -> Iterator[T]:
+        for layer in self._layers():
+            yield from layer.items
+
+    def __len__(self) -> int:
+        return self._layer.base + len(self._layer.items)
+
+    def __repr__(self) -> str:
+        return f"PersistentSet({set(self)!r})"
+
+    def add(self, item: T) -> bool:
+        """Add ``item``; return ``False`` if it was already present."""
+        if item in self:
+            return False
+        self._writable().items[item] = None
+        self._zhash ^= zobrist_key(item)
+        return True
+
+    def update(self, items: Iterable[T]) -> None:
+        for item in items:
+            self.add(item)
+
+
+class PersistentList(_Persistent, Sequence, Generic[T]):
+    """An append-only list whose copies share their common prefix.
+
+    With ``hashed=True`` the list also maintains a Zobrist hash over its
+    distinct items, and membership tests are one set lookup per layer
+    instead of a scan.
+    """
+
+    __slots__ = ()
+
+    def __init__(self, items: Iterable[T] = (), *, hashed: bool = False) -> None:
+        self._layer = _Layer([], None)
+        self._origin = None
+        self._zhash = 0 if hashed else None
+        self.extend(items)
+
+    def _empty(self) -> list:
+        return []
+
+    def __iter__(self) -> Iterator[T]:
+        for layer in self._layers():
+            yield from layer.items
+
+    def __len__(self) -> int:
+        return self._layer.base + len(self._layer.items)
+
+    @overload
+    def __getitem__(self, index: int) -> T: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> List[T]: ...
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[T, List[T]]:
+        if isinstance(index, slice):
+            return list(self)[index]
+        size = len(self)
+        if index < 0:
+            index += size
+        if not 0 <= index < size:
+            raise IndexError("PersistentList index out of range")
+        layer: Optional[_Layer] = self._layer
+        while layer is not None:
+            if index >= layer.base:
+                return layer.items[index - layer.base]
+            layer = layer.parent
+        raise IndexError("PersistentList index out of range")
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (PersistentList, list, tuple)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __contains__(self, item: object) -> bool:
+        if self._zhash is None:
+            return any(item in layer.items for layer in self._layers())
+        layer: Optional[_Layer] = self._layer
+        while layer is not None:
+            if layer.members is None:
+                layer.members = set(layer.items)
+            if item in layer.members:
+                return True
+            layer = layer.parent
+        return False
+
+    def __repr__(self) -> str:
+        return f"PersistentList({list(self)!r})"
+
+    def append(self, item: T) -> None:
+        if self._zhash is not None and item not in self:
+            self._zhash ^= zobrist_key(item)
+        layer = self._writable()
+        layer.items.append(item)
+        if layer.members is not None:
+            layer.members.add(item)
+
+    def extend(self, items: Iterable[T]) -> None:
+        for item in items:
+            self.append(item)
+
+
+class PersistentMap(_Persistent, Mapping, Generic[K, V]):
+    """A dict whose copies share structure; newer layers shadow older ones.
+
+    ``delta()`` yields the ``(key, value)`` pairs written since the fork.
+    """
+
+    __slots__ = ("_size",)
+
+    def __init__(self, items: Iterable[Tuple[K, V]] = ()) -> None:
+        self._layer = _Layer({}, None)
+        self._origin = None
+        self._zhash = None
+        self._size = 0
+        for key, value in dict(items).items():
+            self[key] = value
+
+    def _empty(self) -> dict:
+        return {}
+
+    def _entries(self, items: Any) -> Iterable[Any]:
+        return items.items()
+
+    def _absorb(self, target: Any, entries: Iterable[Any]) -> None:
+        target.update(entries)
+
+    def _compact(self) -> None:
+        super()._compact()
+        self._size = sum(1 for _ in self)
+
+    def fork(self) -> "PersistentMap[K, V]":
+        child = super().fork()
+        child._size = self._size
+        return child
+
+    def __getitem__(self, key: K) -> V:
+        layer: Optional[_Layer] = self._layer
+        while layer is not None:
+            items = layer.items
+            if key in items:
+                return items[key]
+            layer = layer.parent
+        raise KeyError(key)
+
+    def __contains__(self, key: object) -> bool:
+        layer: Optional[_Layer] = self._layer
+        while layer is not None:
+            if key in layer.items:
+                return True
+            layer = layer.parent
+        return False
+
+    def get(self, key: K, default: Optional[V] = None) -> Optional[V]:
+        layer: Optional[_Layer] = self._layer
+        while layer is not None:
+            items = layer.items
+            if key in items:
+                return items[key]
+            layer = layer.parent
+        return default
+
+    def __setitem__(self, key: K, value: V) -> None:
+        if key not in self:
+            self._size += 1
+        self._writable().items[key] = value
+
+    def __iter__(self) -> Iterator[K]:
+        seen: set = set()
+        for layer in reversed(self._layer.chain()):
+            for key in layer.items:
+                if key not in seen:
+                    seen.add(key)
+                    yield key
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __repr__(self) -> str:
+        return f"PersistentMap({dict(self.items())!r})"
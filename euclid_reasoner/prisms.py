@@ -1,10 +1,13 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import List
+from dataclasses import dataclass, field
+from typing import Any, Dict, Hashable, List, Optional, Tuple
 
+from .congruence import sss_index
 from .core import (
     Congruent,
+    FactDelta,
+    OnRay,
     Segment,
     State,
     Triangle,
@@ -12,14 +15,21 @@ from .core import (
     triangle_sides,
     derive_angles_from_correspondence,
     derive_sides_from_correspondence,
-    match_sss,
 )
+from .trace_schema import fact_ref
 
 
 @dataclass(frozen=True)
 class PrismResult:
     state: State
-    description: str
+    _description: Optional[str] = field(default=None, repr=False, compare=False)
+
+    @property
+    def description(self) -> str:
+        """Label of the step that produced ``state`` (rendered on demand)."""
+        if self._description is not None:
+            return self._description
+        return self.state.trace[-1]
 
 
 class Prism:
@@ -27,6 +37,13 @@ class Prism:
     source_space: str = "object_space"
     target_space: str = "object_space"
     movement: str = "unspecified"
+    # Bump when a prism's behaviour changes so cached solves are recomputed.
+    version: int = 1
+
+    # Fact kinds (see ``core.FACT_KINDS``) the prism's preconditions read.
+    # ``None`` means undeclared: the scheduler then calls ``apply`` on every
+    # state.  Declaring prisms implement ``activations`` and ``fire``.
+    consumes: Optional[Tuple[str, ...]] = None
 
     def trace_meta(self) -> dict[str, str]:
         return {
@@ -35,9 +52,81 @@ class Prism:
             "movement": self.movement,
         }
 
-    def apply(self, state: State) -> List[PrismResult]:
+    def activations(self, state: State, delta: FactDelta) -> List[Any]:
+        """Bindings the prism can fire on in ``state``.
+
+        The result may depend only on the ``consumes`` kinds, so the scheduler
+        reuses a parent's activations when ``delta`` leaves them untouched.
+        """
+        raise NotImplementedError
+
+    def update_activations(self, state: State, delta: FactDelta, previous: List[Any]) -> Optional[List[Any]]:
+        """Activations of ``state`` derived from its parent's and ``delta``.
+
+        Called when ``delta`` touches ``consumes``.  ``previous`` holds the
+        parent's activations that produced a child there: one that added
+        nothing adds nothing to any descendant either, since facts only
+        grow.  The result must equal ``activations(state, delta)`` minus such
+        activations, in the same order.  ``None`` (the default) makes the
+        scheduler call ``activations`` instead.
+        """
+        return None
+
+    def fire(self, state: State, activation: Any) -> List[PrismResult]:
+        """Build the children for one activation (none if it adds nothing).
+
+        Implementations check whether anything would be added before copying
+        ``state``, so dead activations cost no allocation.
+        """
+        raise NotImplementedError
+
+    def memo_key(self, state: State, activations: List[Any]) -> Optional[Hashable]:
+        """Hashable summary of ``activations`` and every fact ``fire`` reads
+        for them.
+
+        ``activations`` are the ones the agenda holds for ``state`` (kept up
+        to date from deltas), so a key costs O(1) per activation.  States
+        with equal keys must yield children with the same deltas; the
+        agenda's :class:`~.memo.PrismMemo` then replays those deltas instead
+        of firing again.  ``None`` (the default) opts out of memoization.
+        """
+        return None
+
+    def render_step(self, activation: Any) -> Dict[str, Any]:
+        """``State.add_step`` keyword arguments describing one firing.
+
+        Called lazily when a child's trace is read (see ``State.defer_step``),
+        so ``fire`` only has to record the activation.
+        """
         raise NotImplementedError
 
+    def apply(self, state: State) -> List[PrismResult]:
+        results: List[PrismResult] = []
+        for activation in self.activations(state, state.delta()):
+            results.extend(self.fire(state, activation))
+        return results
+
+
+def _stored_eqseg(state: State, seg1: Segment, seg2: Segment) -> bool:
+    """True if ``add_eqseg(seg1, seg2)`` would add nothing to ``state``."""
+    return state.symbols.ordered(seg1, seg2) in state.facts.eq_segs
+
+
+def _new_points(delta: FactDelta, ray: str) -> List[str]:
+    return sorted(fact.point for fact in delta.on_rays if fact.ray == ray)
+
+
+def _new_pairs(state: State, delta: FactDelta) -> List[Tuple[str, str]]:
+    """Pairs of ``BA x BC`` involving a point ``delta`` put on either ray."""
+    points_d = state.facts.all_points_on_ray("BA")
+    points_e = state.facts.all_points_on_ray("BC")
+    new_d = _new_points(delta, "BA")
+    new_e = _new_points(delta, "BC")
+    seen_d = set(new_d)
+    pairs = [(d, e) for d in new_d for e in points_e]
+    pairs.extend((d, e) for d in points_d if d not in seen_d for e in new_e)
+    return pairs
+
 
 # -------------------------------------------------------------
 
@@ -46,36 +135,43 @@ class ChoosePointOnRayBA(Prism):
     source_space = "object_space"
     target_space = "construction_space"
     movement = "construction"
+    consumes = ("on_rays",)
 
-    def apply(self, state: State) -> List[PrismResult]:
+    def activations(self, state: State, delta: FactDelta) -> List[Any]:
         if state.facts.all_points_on_ray("BA"):
             return []
+        return [f"D{idx}" for idx in range(1, 5)]
 
-        results: List[PrismResult] = []
-        for idx in range(1, 5):
-            new_state = state.copy()
-            point = f"D{idx}"
-
-            if new_state.facts.add_on_ray(point, "BA"):
-                label = f"Choose {point} on ray BA"
-
-                new_state.add_step(
-                    prism=self.name,
-                    label=label,
-                    space=self.target_space,
-                    uses=["ray:BA"],
-                    creates=[f"point:{point}"],
-                    asserts=[f"OnRay({point},BA)"],
-                    used_facts=[],
-                    created_objects=[f"point:{point}"],
-                    derived_facts=[],
-                    phase="construction",
-                    granularity="micro",
-                    meta=self.trace_meta(),
-                )
-
-                results.append(PrismResult(new_state, label))
-        return results
+    def memo_key(self, state: State, activations: List[Any]) -> Optional[Hashable]:
+        # Activations only exist while BA is empty, and then all of them fire.
+        return tuple(activations)
+
+    def fire(self, state: State, activation: Any) -> List[PrismResult]:
+        point = activation
+        if OnRay(point, "BA") in state.facts.on_rays:
+            return []
+
+        new_state = state.copy()
+        new_state.facts.add_on_ray(point, "BA")
+        new_state.defer_step(self, activation)
+        return [PrismResult(new_state)]
+
+    def render_step(self, activation: Any) -> Dict[str, Any]:
+        point = activation
+        return dict(
+            prism=self.name,
+            label=f"Choose {point} on ray BA",
+            space=self.target_space,
+            uses=["ray:BA"],
+            creates=[f"point:{point}"],
+            asserts=[fact_ref("OnRay", point, "BA")],
+            used_facts=[],
+            created_objects=[f"point:{point}"],
+            derived_facts=[],
+            phase="construction",
+            granularity="micro",
+            meta=self.trace_meta(),
+        )
 
 
 # -------------------------------------------------------------
@@ -85,43 +181,62 @@ class CopyLengthToRayBC(Prism):
     source_space = "construction_space"
     target_space = "construction_space"
     movement = "length_transport"
+    consumes = ("on_rays",)
+
+    def activations(self, state: State, delta: FactDelta) -> List[Any]:
+        return state.facts.all_points_on_ray("BA")
+
+    def _parts(self, state: State, point: str) -> Tuple[str, Segment, Segment]:
+        sym = state.symbols
+        target = sym.name("E_", point)
+        return target, sym.segment("B", point), sym.segment("B", target)
+
+    def memo_key(self, state: State, activations: List[Any]) -> Optional[Hashable]:
+        # Per activation, exactly the two facts ``fire`` may add.
+        key = []
+        for point in activations:
+            target, seg_bd, seg_be = self._parts(state, point)
+            key.append((point, OnRay(target, "BC") in state.facts.on_rays, _stored_eqseg(state, seg_bd, seg_be)))
+        return tuple(key)
+
+    def update_activations(self, state: State, delta: FactDelta, previous: List[Any]) -> Optional[List[Any]]:
+        return sorted(previous + _new_points(delta, "BA"))
+
+    def fire(self, state: State, activation: Any) -> List[PrismResult]:
+        point = activation
+        target, seg_bd, seg_be = self._parts(state, point)
+        if OnRay(target, "BC") in state.facts.on_rays and _stored_eqseg(state, seg_bd, seg_be):
+            return []
 
-    def apply(self, state: State) -> List[PrismResult]:
-        results: List[PrismResult] = []
-
-        for point in state.facts.all_points_on_ray("BA"):
-            new_state = state.copy()
-            target = f"E_{point}"
-
-            seg_bd = Segment("B", point)
-            seg_be = Segment("B", target)
-
-            changed = new_state.facts.add_on_ray(target, "BC")
-            changed = new_state.facts.add_eqseg(seg_bd, seg_be) or changed
-
-            if changed:
-                label = f"Copy {seg_bd} to ray BC -> {target} with BE=BD"
-
-                new_state.add_step(
-                    prism=self.name,
-                    label=label,
-                    space=self.target_space,
-                    uses=[f"point:{point}", f"segment:{seg_bd}", "ray:BC"],
-                    creates=[f"point:{target}"],
-                    asserts=[
-                        f"OnRay({target},BC)",
-                        f"EqSeg({seg_bd},{seg_be})",
-                    ],
-                    used_facts=[f"OnRay({point},BA)"],
-                    created_objects=[f"point:{target}", f"segment:{seg_be}"],
-                    derived_facts=[],
-                    phase="construction",
-                    granularity="micro",
-                    meta=self.trace_meta(),
-                )
-
-                results.append(PrismResult(new_state, label))
-        return results
+        new_state = state.copy()
+        new_state.facts.add_on_ray(target, "BC")
+        new_state.facts.add_eqseg(seg_bd, seg_be)
+        new_state.defer_step(self, activation)
+        return [PrismResult(new_state)]
+
+    def render_step(self, activation: Any) -> Dict[str, Any]:
+        point = activation
+        target = f"E_{point}"
+        seg_bd = Segment("B", point)
+        seg_be = Segment("B", target)
+
+        return dict(
+            prism=self.name,
+            label=f"Copy {seg_bd} to ray BC -> {target} with BE=BD",
+            space=self.target_space,
+            uses=[f"point:{point}", f"segment:{seg_bd}", "ray:BC"],
+            creates=[f"point:{target}"],
+            asserts=[
+                fact_ref("OnRay", target, "BC"),
+                fact_ref("EqSeg", seg_bd, seg_be),
+            ],
+            used_facts=[fact_ref("OnRay", point, "BA")],
+            created_objects=[f"point:{target}", f"segment:{seg_be}"],
+            derived_facts=[],
+            phase="construction",
+            granularity="micro",
+            meta=self.trace_meta(),
+        )
 
 
 # -------------------------------------------------------------
@@ -131,50 +246,68 @@ class EquilateralOnSegment(Prism):
     source_space = "construction_space"
     target_space = "equilateral_space"
     movement = "generative_blending"
+    consumes = ("on_rays",)
 
-    def apply(self, state: State) -> List[PrismResult]:
-        results: List[PrismResult] = []
-
-        points_d = state.facts.all_points_on_ray("BA")
+    def activations(self, state: State, delta: FactDelta) -> List[Any]:
         points_e = state.facts.all_points_on_ray("BC")
+        return [(d, e) for d in state.facts.all_points_on_ray("BA") for e in points_e]
+
+    def _parts(self, state: State, d: str, e: str) -> Tuple[Segment, Segment, Triangle]:
+        sym = state.symbols
+        apex = sym.name("F_", d, "_", e)
+        return sym.segment(d, apex), sym.segment(e, apex), sym.triangle(sym.name("T_eq_", d, e, apex), (d, e, apex))
+
+    def memo_key(self, state: State, activations: List[Any]) -> Optional[Hashable]:
+        key = []
+        for d, e in activations:
+            seg_df, seg_ef, tri = self._parts(state, d, e)
+            key.append((d, e, _stored_eqseg(state, seg_df, seg_ef), tri in state.triangles))
+        return tuple(key)
+
+    def update_activations(self, state: State, delta: FactDelta, previous: List[Any]) -> Optional[List[Any]]:
+        return sorted(previous + _new_pairs(state, delta))
+
+    def fire(self, state: State, activation: Any) -> List[PrismResult]:
+        d, e = activation
+        seg_df, seg_ef, tri = self._parts(state, d, e)
+        if _stored_eqseg(state, seg_df, seg_ef):
+            return []
 
-        for d in points_d:
-            for e in points_e:
-                apex = f"F_{d}_{e}"
-
-                new_state = state.copy()
-                seg_df = Segment(d, apex)
-                seg_ef = Segment(e, apex)
-                tri = Triangle(f"T_eq_{d}{e}{apex}", (d, e, apex))
-
-                if new_state.facts.add_eqseg(seg_df, seg_ef):
-                    new_state.mode = "EquilateralField"
-                    if tri not in new_state.triangles:
-                        new_state.triangles.append(tri)
-                    label = f"Construct equilateral on {d}{e} -> apex {apex}"
-
-                    new_state.add_step(
-                        prism=self.name,
-                        label=label,
-                        space=self.target_space,
-                        uses=[f"point:{d}", f"point:{e}", f"segment:{Segment(d, e)}"],
-                        creates=[f"point:{apex}", f"triangle:{tri.name}"],
-                        asserts=[f"EqSeg({seg_df},{seg_ef})"],
-                        used_facts=[f"OnRay({d},BA)", f"OnRay({e},BC)"],
-                        created_objects=[
-                            f"point:{apex}",
-                            f"segment:{seg_df}",
-                            f"segment:{seg_ef}",
-                            f"triangle:{tri.name}",
-                        ],
-                        derived_facts=[],
-                        phase="construction",
-                        granularity="micro",
-                        meta=self.trace_meta(),
-                    )
-
-                    results.append(PrismResult(new_state, label))
-        return results
+        new_state = state.copy()
+        new_state.facts.add_eqseg(seg_df, seg_ef)
+        new_state.mode = "EquilateralField"
+        if tri not in new_state.triangles:
+            new_state.triangles.append(tri)
+
+        new_state.defer_step(self, activation)
+        return [PrismResult(new_state)]
+
+    def render_step(self, activation: Any) -> Dict[str, Any]:
+        d, e = activation
+        apex = f"F_{d}_{e}"
+        seg_df = Segment(d, apex)
+        seg_ef = Segment(e, apex)
+        tri = Triangle(f"T_eq_{d}{e}{apex}", (d, e, apex))
+
+        return dict(
+            prism=self.name,
+            label=f"Construct equilateral on {d}{e} -> apex {apex}",
+            space=self.target_space,
+            uses=[f"point:{d}", f"point:{e}", f"segment:{Segment(d, e)}"],
+            creates=[f"point:{apex}", f"triangle:{tri.name}"],
+            asserts=[fact_ref("EqSeg", seg_df, seg_ef)],
+            used_facts=[fact_ref("OnRay", d, "BA"), fact_ref("OnRay", e, "BC")],
+            created_objects=[
+                f"point:{apex}",
+                f"segment:{seg_df}",
+                f"segment:{seg_ef}",
+                f"triangle:{tri.name}",
+            ],
+            derived_facts=[],
+            phase="construction",
+            granularity="micro",
+            meta=self.trace_meta(),
+        )
 
 
 # -------------------------------------------------------------
@@ -184,56 +317,76 @@ class InstantiateComparisonTriangles(Prism):
     source_space = "equilateral_space"
     target_space = "triangle_space"
     movement = "structuring"
-
-    def apply(self, state: State) -> List[PrismResult]:
-        results: List[PrismResult] = []
-
-        points_d = state.facts.all_points_on_ray("BA")
+    consumes = ("on_rays", "triangles")
+
+    def _activation(self, state: State, d: str, e: str) -> Optional[Tuple[Any, ...]]:
+        sym = state.symbols
+        apex = sym.name("F_", d, "_", e)
+        t1 = sym.triangle(sym.name("T_", d, apex, "B"), (d, apex, "B"))
+        t2 = sym.triangle(sym.name("T_", e, apex, "B"), (e, apex, "B"))
+        if t1 in state.triangles and t2 in state.triangles:
+            return None
+        return (d, e, apex, t1, t2)
+
+    def activations(self, state: State, delta: FactDelta) -> List[Any]:
         points_e = state.facts.all_points_on_ray("BC")
-
-        for d in points_d:
-            for e in points_e:
-                apex = f"F_{d}_{e}"
-
-                t1 = Triangle(f"T_{d}{apex}B", (d, apex, "B"))
-                t2 = Triangle(f"T_{e}{apex}B", (e, apex, "B"))
-
-                if t1 in state.triangles and t2 in state.triangles:
-                    continue
-
-                new_state = state.copy()
-                new_state.triangles.extend([t1, t2])
-                new_state.facts.add_eqseg(Segment("B", apex), Segment("B", apex))
-
-                label = f"Instantiate triangles {t1} and {t2} with common BF"
-
-                new_state.add_step(
-                    prism=self.name,
-                    label=label,
-                    space=self.target_space,
-                    uses=[
-                        f"point:{d}",
-                        f"point:{e}",
-                        f"point:{apex}",
-                        f"segment:{Segment('B', d)}",
-                        f"segment:{Segment('B', e)}",
-                        f"segment:{Segment('B', apex)}",
-                    ],
-                    creates=[f"triangle:{t1.name}", f"triangle:{t2.name}"],
-                    asserts=[f"EqSeg(B{apex},B{apex})"],
-                    used_facts=[
-                        f"OnRay({d},BA)",
-                        f"OnRay({e},BC)",
-                    ],
-                    created_objects=[f"triangle:{t1.name}", f"triangle:{t2.name}"],
-                    derived_facts=[],
-                    phase="triangle_instantiation",
-                    granularity="micro",
-                    meta=self.trace_meta(),
-                )
-
-                results.append(PrismResult(new_state, label))
-        return results
+        candidates = (self._activation(state, d, e) for d in state.facts.all_points_on_ray("BA") for e in points_e)
+        return [activation for activation in candidates if activation is not None]
+
+    def update_activations(self, state: State, delta: FactDelta, previous: List[Any]) -> Optional[List[Any]]:
+        triangles = state.triangles
+        if delta.triangles:
+            previous = [a for a in previous if not (a[3] in triangles and a[4] in triangles)]
+        fresh = (self._activation(state, d, e) for d, e in _new_pairs(state, delta))
+        return sorted(previous + [a for a in fresh if a is not None], key=lambda a: (a[0], a[1]))
+
+    def memo_key(self, state: State, activations: List[Any]) -> Optional[Hashable]:
+        # ``fire`` always adds both triangles; only BF = BF may be known.
+        key = []
+        for d, e, apex, _, _ in activations:
+            seg_bf = state.symbols.segment("B", apex)
+            key.append((d, e, _stored_eqseg(state, seg_bf, seg_bf)))
+        return tuple(key)
+
+    def fire(self, state: State, activation: Any) -> List[PrismResult]:
+        d, e, apex, t1, t2 = activation
+
+        new_state = state.copy()
+        new_state.triangles.extend([t1, t2])
+        seg_bf = state.symbols.segment("B", apex)
+        new_state.facts.add_eqseg(seg_bf, seg_bf)
+
+        new_state.defer_step(self, activation)
+        return [PrismResult(new_state)]
+
+    def render_step(self, activation: Any) -> Dict[str, Any]:
+        d, e, apex, t1, t2 = activation
+        seg_bf = Segment("B", apex)
+
+        return dict(
+            prism=self.name,
+            label=f"Instantiate triangles {t1} and {t2} with common BF",
+            space=self.target_space,
+            uses=[
+                f"point:{d}",
+                f"point:{e}",
+                f"point:{apex}",
+                f"segment:{Segment('B', d)}",
+                f"segment:{Segment('B', e)}",
+                f"segment:{seg_bf}",
+            ],
+            creates=[f"triangle:{t1.name}", f"triangle:{t2.name}"],
+            asserts=[fact_ref("EqSeg", seg_bf, seg_bf)],
+            used_facts=[
+                fact_ref("OnRay", d, "BA"),
+                fact_ref("OnRay", e, "BC"),
+            ],
+            created_objects=[f"triangle:{t1.name}", f"triangle:{t2.name}"],
+            derived_facts=[],
+            phase="triangle_instantiation",
+            granularity="micro",
+            meta=self.trace_meta(),
+        )
 
 
 # -------------------------------------------------------------
@@ -243,66 +396,73 @@ class CongruenceSSSPrism(Prism):
     source_space = "triangle_space"
     target_space = "correspondence_space"
     movement = "correspondence_transport"
+    consumes = ("triangles", "eq_segs", "congruent")
+
+    def activations(self, state: State, delta: FactDelta) -> List[Any]:
+        return [
+            (t1, t2, mapping)
+            for t1, t2, mapping in sss_index(state).ordered_matches()
+            if Congruent(t1, t2, mapping) not in state.facts.congruent
+        ]
+
+    def fire(self, state: State, activation: Any) -> List[PrismResult]:
+        t1, t2, mapping = activation
+        congruent = Congruent(t1, t2, mapping)
+        if congruent in state.facts.congruent:
+            return []
 
-    def apply(self, state: State) -> List[PrismResult]:
-        results: List[PrismResult] = []
-
-        tris = state.triangles
-
-        for i in range(len(tris)):
-            for j in range(i + 1, len(tris)):
-                t1, t2 = tris[i], tris[j]
-                mapping = match_sss(state.facts, t1, t2)
-                if mapping is None:
-                    continue
-
-                new_state = state.copy()
-                congruent = Congruent(t1, t2, mapping)
-
-                if not new_state.facts.add_congruent(congruent):
-                    continue
-
-                corr = TriangleCorrespondence(t1, t2, mapping)
-                new_state.facts.add_correspondence(corr)
-
-                new_state.mode = "CongruenceField"
-
-                derived = derive_angles_from_correspondence(corr)
-                side_pairs = derive_sides_from_correspondence(corr)
-                sides1 = triangle_sides(t1.vertices)
-                sides2 = triangle_sides(tuple(b for _, b in mapping))
-                side_rewrites = [f"EqSeg({s1},{s2})" for s1, s2 in side_pairs]
-                for seg1, seg2 in side_pairs:
-                    new_state.facts.add_eqseg(seg1, seg2)
-                for ang1, ang2 in derived:
-                    new_state.facts.add_eqang(ang1, ang2)
-
-                label = f"SSS congruence found between {t1} and {t2}"
-
-                new_state.add_step(
-                    prism=self.name,
-                    label=label,
-                    space=self.target_space,
-                    uses=[
-                        f"triangle:{t1.name}",
-                        f"triangle:{t2.name}",
-                        *[f"segment:{s}" for s in sides1],
-                        *[f"segment:{s}" for s in sides2],
-                    ],
-                    creates=[],
-                    asserts=[f"Congruent({t1.name},{t2.name})", str(corr)],
-                    rewrites=[f"EqAng({a1},{a2})" for (a1, a2) in derived] + side_rewrites,
-                    used_facts=side_rewrites,
-                    created_objects=[],
-                    derived_facts=[f"EqAng({a1},{a2})" for (a1, a2) in derived] + side_rewrites,
-                    phase="inference",
-                    granularity="micro",
-                    meta=self.trace_meta(),
-                )
-
-                results.append(PrismResult(new_state, label))
-
-        return results
+        new_state = state.copy()
+        new_state.facts.add_congruent(congruent)
+
+        corr = TriangleCorrespondence(t1, t2, mapping)
+        new_state.facts.add_correspondence(corr)
+
+        new_state.mode = "CongruenceField"
+
+        sym = state.symbols
+        for seg1, seg2 in derive_sides_from_correspondence(corr, sym):
+            new_state.facts.add_eqseg(seg1, seg2)
+        for ang1, ang2 in derive_angles_from_correspondence(corr, sym):
+            new_state.facts.add_eqang(ang1, ang2)
+
+        new_state.defer_step(self, activation)
+        return [PrismResult(new_state)]
+
+    def render_step(self, activation: Any) -> Dict[str, Any]:
+        t1, t2, mapping = activation
+        corr = TriangleCorrespondence(t1, t2, mapping)
+
+        derived = derive_angles_from_correspondence(corr)
+        side_pairs = derive_sides_from_correspondence(corr)
+        sides1 = triangle_sides(t1.vertices)
+        sides2 = triangle_sides(tuple(b for _, b in mapping))
+        side_rewrites = [fact_ref("EqSeg", s1, s2) for s1, s2 in side_pairs]
+        angle_rewrites = [fact_ref("EqAng", a1, a2) for a1, a2 in derived]
+        pairs = [f"{a}->{b}" for a, b in mapping]
+
+        return dict(
+            prism=self.name,
+            label=f"SSS congruence found between {t1} and {t2}",
+            space=self.target_space,
+            uses=[
+                f"triangle:{t1.name}",
+                f"triangle:{t2.name}",
+                *[f"segment:{s}" for s in sides1],
+                *[f"segment:{s}" for s in sides2],
+            ],
+            creates=[],
+            asserts=[
+                fact_ref("Congruent", t1.name, t2.name),
+                fact_ref("Correspondence", t1.name, t2.name, *pairs, label=str(corr)),
+            ],
+            rewrites=angle_rewrites + side_rewrites,
+            used_facts=side_rewrites,
+            created_objects=[],
+            derived_facts=angle_rewrites + side_rewrites,
+            phase="inference",
+            granularity="micro",
+            meta=self.trace_meta(),
+        )
 
 
 # -------------------------------------------------------------
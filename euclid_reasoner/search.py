@@ -1,42 +1,160 @@
 from __future__ import annotations
 
-from typing import Callable, Iterable, Optional, Tuple
+import heapq
+import itertools
+import time
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
 
-from .core import Angle, State
-from .prisms import Prism
-from .types import SearchResult
+from .agenda import Agenda
+from .core import State
+from .goals import evaluate_goal, goal_checker_prop5, goal_checker_prop9, goal_checker_prop10
+from .memo import PrismMemo
+from .parallel import RemoteResult, make_expander
+from .prisms import Prism, PrismResult
+from .types import SearchResult, SearchStats
 
 
-def goal_checker_prop9(state: State) -> Optional[Tuple[Angle, Angle]]:
-    for ang1, ang2 in state.facts.eq_angs:
-        if ang1.v == "B" and ang2.v == "B" and ang1.c == ang2.c:
-            return (ang1, ang2)
-    return None
+GoalFn = Callable[[State], Optional[Tuple[Any, Any]]]
 
 
-def goal_checker_prop5(state: State) -> Optional[Tuple[Angle, Angle]]:
-    for ang1, ang2 in state.facts.eq_angs:
-        if ang1 != ang2 and ang1.v != "B" and ang2.v != "B":
-            return (ang1, ang2)
-    return None
+Heuristic = Callable[[State], float]
 
 
-GoalFn = Callable[[State], Optional[Tuple[Angle, Angle]]]
-
-
-def score(state: State, goal_fn: GoalFn = goal_checker_prop9) -> int:
-    base = (
+def fact_score(state: State) -> int:
+    """The goal-independent part of :func:`score`."""
+    return (
         len(state.facts.on_rays)
         + 2 * len(state.facts.eq_segs)
         + 3 * len(state.facts.congruent)
         + 4 * len(state.facts.eq_angs)
         + len(state.triangles)
     )
+
+
+def score(state: State, goal_fn: GoalFn = goal_checker_prop9) -> int:
+    base = fact_score(state)
     if goal_fn(state):
         base += 1000
     return base
 
 
+def score_heuristic(state: State) -> float:
+    """Default best-first heuristic: richer fact sets look closer to a goal.
+
+    Lower is better, so this is the negated :func:`fact_score`.  Goal states
+    never sit on a frontier (they end the search), so the goal bonus of
+    :func:`score` is irrelevant here.
+    """
+    return -float(fact_score(state))
+
+
+class TranspositionTable:
+    """Fingerprints of every state already admitted to the search.
+
+    ``hits`` counts children dropped because an equivalent fact set was
+    reached before (on this level or an earlier one); ``misses`` counts
+    states seen for the first time.
+    """
+
+    def __init__(self) -> None:
+        self._seen: Set[int] = set()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._seen)
+
+    def admit(self, state: State) -> bool:
+        """Record ``state``; return ``False`` if it duplicates a known state."""
+        return self.admit_key(state.fingerprint())
+
+    def admit_key(self, key: int) -> bool:
+        """:meth:`admit` for a state whose fingerprint is already known."""
+        if key in self._seen:
+            self.hits += 1
+            return False
+        self._seen.add(key)
+        self.misses += 1
+        return True
+
+
+class SearchObserver:
+    """Callbacks fired by the search engines.
+
+    Subclass and override the hooks you need.  Engines only call hooks when
+    an observer is passed, so unobserved searches pay nothing for them.
+    """
+
+    def on_level(self, level: int, beam: Sequence[State], stats: SearchStats) -> None:
+        """A beam level (or a best-first pop) has been selected."""
+
+    def on_expand(self, state: State, children: Sequence[PrismResult]) -> None:
+        """``state`` was expanded into ``children`` (before deduplication).
+
+        With ``workers`` the children are
+        :class:`~euclid_reasoner.parallel.RemoteResult` objects, rebuilt
+        when their ``state`` is read.
+        """
+
+    def on_goal(self, state: State, target: Any, stats: SearchStats) -> None:
+        """A goal state was found; ``stats`` is final."""
+
+
+class _Run:
+    """Bookkeeping shared by the engines: stats, goal checks, observer."""
+
+    def __init__(
+        self,
+        engine: str,
+        transpositions: TranspositionTable,
+        observer: Optional[SearchObserver],
+    ) -> None:
+        self.stats = SearchStats(engine=engine)
+        self.transpositions = transpositions
+        self.observer = observer
+        self._started = time.perf_counter()
+        self._hits_before = transpositions.hits
+
+    def check_goal(self, goal_fn: GoalFn, state: State, *, parent_failed: bool = True) -> Optional[Tuple[Any, Any]]:
+        """Goal-test ``state``; children of failed states are tested from
+        their delta when the goal is an :class:`~euclid_reasoner.goals.IncrementalGoal`."""
+        self.stats.goal_checks += 1
+        return evaluate_goal(goal_fn, state, parent_failed=parent_failed)
+
+    def check_child(self, name: str, goal_fn: GoalFn, res: Any) -> Optional[Tuple[Any, Any]]:
+        """Goal-test a child, reusing the verdict a worker already reached."""
+        if isinstance(res, RemoteResult) and name in res.goals:
+            self.stats.goal_checks += 1
+            return res.goals[name]
+        return self.check_goal(goal_fn, res.state)
+
+    def expanded(self, state: State, children: Sequence[PrismResult]) -> None:
+        self.stats.expansions += 1
+        self.stats.generated += len(children)
+        if self.observer is not None:
+            self.observer.on_expand(state, children)
+
+    def level(self, level: int, beam: Sequence[State]) -> None:
+        self.stats.beam_sizes.append(len(beam))
+        if self.observer is not None:
+            self.observer.on_level(level, beam, self.stats)
+
+    def finish(self, solved: bool, state: State, target: Any, agenda: Optional[Agenda]) -> SearchResult:
+        stats = self.stats
+        stats.wall_time = time.perf_counter() - self._started
+        stats.duplicates = self.transpositions.hits - self._hits_before
+        stats.best_score = max(stats.best_score, fact_score(state))
+        if agenda is not None:
+            stats.activations_reused = agenda.reused
+            stats.activations_updated = agenda.updated
+            stats.activations_recomputed = agenda.recomputed
+            stats.memo_hits = agenda.memo_hits
+            stats.memo_misses = agenda.memo_misses
+        if solved and self.observer is not None:
+            self.observer.on_goal(state, target, stats)
+        return SearchResult(solved, state, target, stats.snapshot())
+
+
 def beam_search(
     start: State,
     prisms: Iterable[Prism],
@@ -44,32 +162,240 @@ def beam_search(
     beam_k: int = 20,
     steps: int = 10,
     goal_fn: GoalFn = goal_checker_prop9,
+    transpositions: Optional[TranspositionTable] = None,
+    workers: Optional[int] = None,
+    observer: Optional[SearchObserver] = None,
+    memo: Optional[PrismMemo] = None,
 ) -> SearchResult:
-    beam = [start]
+    """Level-by-level search keeping the ``beam_k`` best-scoring children.
 
-    initial_goal = goal_fn(start)
-    if initial_goal:
-        return SearchResult(True, start, initial_goal)
+    Children are streamed through a bounded min-heap, so each level holds at
+    most ``beam_k`` candidate states and selection costs O(n log k).  Each
+    child is goal-checked and scored exactly once; ties keep generation
+    order, matching a stable sort of all candidates.
+
+    With ``workers=N`` (N > 1) prism expansion of each level runs on a pool
+    of N processes; children are merged in serial order, so the result is
+    identical to the single-process run.  Per-prism timings in the attached
+    :class:`SearchStats` are only collected in serial mode.
+    """
+    results = iter_multi_goal_search(
+        start,
+        prisms,
+        {"goal": goal_fn},
+        beam_k=beam_k,
+        steps=steps,
+        transpositions=transpositions,
+        workers=workers,
+        observer=observer,
+        memo=memo,
+    )
+    _, result = next(results)
+    results.close()
+    return result
 
-    for _ in range(steps):
-        candidates = []
 
-        for state in beam:
-            for prism in prisms:
-                for res in prism.apply(state):
-                    new_state = res.state
+def multi_goal_search(
+    start: State,
+    prisms: Iterable[Prism],
+    goals: Dict[str, GoalFn],
+    **kwargs: Any,
+) -> Dict[str, SearchResult]:
+    """Explore the space once for several goals; see :func:`iter_multi_goal_search`.
+
+    Returns one result per goal name, in the order of ``goals``.
+    """
+    found = dict(iter_multi_goal_search(start, prisms, goals, **kwargs))
+    return {name: found[name] for name in goals}
 
-                    goal = goal_fn(new_state)
+
+def iter_multi_goal_search(
+    start: State,
+    prisms: Iterable[Prism],
+    goals: Dict[str, GoalFn],
+    *,
+    beam_k: int = 20,
+    steps: int = 10,
+    transpositions: Optional[TranspositionTable] = None,
+    workers: Optional[int] = None,
+    observer: Optional[SearchObserver] = None,
+    max_expansions: Optional[int] = None,
+    memo: Optional[PrismMemo] = None,
+) -> Iterator[Tuple[str, SearchResult]]:
+    """Beam search towards several named goals at once.
+
+    Beam selection does not depend on the goal, so all goals share one
+    exploration: every child is tested against the goals not reached yet and
+    ``(name, result)`` is yielded as soon as a goal is first reached.  Each
+    result equals what :func:`beam_search` returns for that goal alone.  When
+    the levels, or the shared ``max_expansions`` budget, run out, the
+    remaining goals are yielded unsolved with the best state of the last
+    level.  Every result carries a snapshot of the shared stats.
+    """
+    if transpositions is None:
+        transpositions = TranspositionTable()
+    transpositions.admit(start)
+    run = _Run("beam", transpositions, observer)
+
+    pending = dict(goals)
+    for name, goal_fn in goals.items():
+        initial_goal = run.check_goal(goal_fn, start, parent_failed=False)
+        if initial_goal:
+            del pending[name]
+            yield name, run.finish(True, start, initial_goal, None)
+    if not pending:
+        return
+
+    expander = make_expander(prisms, workers, stats=run.stats, memo=memo, score=fact_score)
+    try:
+        yield from _beam_levels(start, expander, beam_k, steps, run, pending, max_expansions)
+    finally:
+        expander.close()
+
+
+def _beam_levels(
+    start: State,
+    expander: Any,
+    beam_k: int,
+    steps: int,
+    run: _Run,
+    pending: Dict[str, GoalFn],
+    max_expansions: Optional[int],
+) -> Iterator[Tuple[str, SearchResult]]:
+    transpositions = run.transpositions
+    agenda = getattr(expander, "agenda", None)
+    beam = [start]
+    run.level(0, beam)
+
+    for level in range(1, steps + 1):
+        # Entries are (score, -generation order, child): the heap root is
+        # the candidate to evict next.  Children from workers are only
+        # rebuilt when they make the beam or reach a goal.
+        top: List[Tuple[int, int, Any]] = []
+        order = 0
+        exhausted = False
+
+        for state, children in expander.expand_level(beam, pending):
+            run.expanded(state, children)
+            for res in children:
+                for name, goal_fn in list(pending.items()):
+                    goal = run.check_child(name, goal_fn, res)
                     if goal:
-                        return SearchResult(True, new_state, goal)
+                        del pending[name]
+                        yield name, run.finish(True, res.state, goal, agenda)
+                if not pending:
+                    return
+                # The goals still pending treat a state that satisfied
+                # another goal like any other child, as their own runs would.
+                if isinstance(res, RemoteResult):
+                    key, child_score = res.fingerprint, res.score
+                else:
+                    key, child_score = res.state.fingerprint(), fact_score(res.state)
+                if not transpositions.admit_key(key):
+                    continue
 
-                    candidates.append(new_state)
+                # A non-goal state scores exactly its fact_score.
+                entry = (child_score, -order, res)
+                order += 1
+                if len(top) < beam_k:
+                    heapq.heappush(top, entry)
+                elif entry[:2] > top[0][:2]:
+                    heapq.heapreplace(top, entry)
 
-        if not candidates:
+            if max_expansions is not None and run.stats.expansions >= max_expansions:
+                exhausted = True
+                break
+
+        if exhausted or not top:
             break
 
-        candidates.sort(key=lambda s: score(s, goal_fn=goal_fn), reverse=True)
-        beam = candidates[:beam_k]
+        top.sort(key=lambda entry: entry[:2], reverse=True)
+        beam = [entry[2].state for entry in top]
+        run.stats.best_score = max(run.stats.best_score, top[0][0])
+        run.level(level, beam)
+
+    # Beam states were all goal-checked negatively when generated.
+    for name in pending:
+        yield name, run.finish(False, beam[0], None, agenda)
 
-    best = max(beam, key=lambda s: score(s, goal_fn=goal_fn)) if beam else start
-    return SearchResult(False, best, goal_fn(best))
+
+def best_first_search(
+    start: State,
+    prisms: Iterable[Prism],
+    *,
+    goal_fn: GoalFn = goal_checker_prop9,
+    heuristic: Heuristic = score_heuristic,
+    weight: float = 1.0,
+    depth_cost: float = 0.0,
+    max_expansions: int = 1000,
+    max_frontier: int = 10000,
+    transpositions: Optional[TranspositionTable] = None,
+    observer: Optional[SearchObserver] = None,
+    memo: Optional[PrismMemo] = None,
+) -> SearchResult:
+    """Expand the most promising state first from a heap-ordered frontier.
+
+    States are ordered by ``depth_cost * depth + weight * heuristic(state)``.
+    With the default ``depth_cost=0`` this is greedy best-first search; see
+    :func:`weighted_astar_search` for the path-cost-aware variant.  Unlike
+    :func:`beam_search`, no state is dropped because a level is full: the
+    frontier only sheds its worst half when it exceeds ``max_frontier``.
+    ``max_expansions`` bounds the number of states whose children are
+    generated.
+    """
+    if transpositions is None:
+        transpositions = TranspositionTable()
+    transpositions.admit(start)
+    engine = "best_first" if depth_cost == 0 else "weighted_astar"
+    run = _Run(engine, transpositions, observer)
+
+    initial_goal = run.check_goal(goal_fn, start, parent_failed=False)
+    if initial_goal:
+        return run.finish(True, start, initial_goal, None)
+
+    agenda = Agenda(prisms, stats=run.stats, memo=memo)
+    tiebreak = itertools.count()
+    frontier: List[Tuple[float, int, int, State]] = [(weight * heuristic(start), next(tiebreak), 0, start)]
+    best, best_score = start, fact_score(start)
+
+    while frontier and run.stats.expansions < max_expansions:
+        _, _, depth, state = heapq.heappop(frontier)
+        run.level(depth, [state])
+
+        children = list(agenda.expand(state))
+        run.expanded(state, children)
+        for res in children:
+            new_state = res.state
+
+            goal = run.check_goal(goal_fn, new_state)
+            if goal:
+                return run.finish(True, new_state, goal, agenda)
+
+            if not transpositions.admit(new_state):
+                continue
+
+            new_score = fact_score(new_state)
+            if new_score > best_score:
+                best, best_score = new_state, new_score
+
+            priority = depth_cost * (depth + 1) + weight * heuristic(new_state)
+            heapq.heappush(frontier, (priority, next(tiebreak), depth + 1, new_state))
+
+        if len(frontier) > max_frontier:
+            frontier = heapq.nsmallest(max_frontier // 2, frontier)
+            heapq.heapify(frontier)
+
+    return run.finish(False, best, None, agenda)
+
+
+def weighted_astar_search(
+    start: State,
+    prisms: Iterable[Prism],
+    *,
+    weight: float = 2.0,
+    **kwargs: Any,
+) -> SearchResult:
+    """Weighted A*: every prism application costs 1 and the heuristic is
+    inflated by ``weight`` (``weight=1`` is plain A*).  Accepts the keyword
+    arguments of :func:`best_first_search`."""
+    return best_first_search(start, prisms, weight=weight, depth_cost=1.0, **kwargs)
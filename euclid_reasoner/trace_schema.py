@@ -1,7 +1,39 @@
 from __future__ import annotations
 
+import sys
 from dataclasses import dataclass, field
-from typing import Dict, List
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+# Fact kinds whose operands can be swapped without changing the fact.
+SYMMETRIC_FACTS = frozenset({"EqSeg", "EqAng"})
+
+
+@dataclass(frozen=True)
+class FactRef:
+    """Structured identity of a fact named by a trace step.
+
+    ``kind`` is the fact type (``"OnRay"``, ``"EqSeg"``, ``"EqAng"``,
+    ``"Congruent"``, ``"Correspondence"``) and ``args`` the interned names
+    of its operands, sorted for symmetric kinds so that both spellings of an
+    equality compare equal.  ``label`` is the display string.
+    """
+
+    kind: str
+    args: Tuple[str, ...]
+    label: str = field(compare=False)
+
+
+def fact_ref(kind: str, *operands: Any, label: Optional[str] = None) -> FactRef:
+    """A :class:`FactRef`; ``label`` defaults to ``Kind(op1,op2,...)``."""
+    args = tuple(sys.intern(str(op)) for op in operands)
+    if label is None:
+        label = f"{kind}({','.join(args)})"
+    if kind in SYMMETRIC_FACTS:
+        args = tuple(sorted(args))
+    return FactRef(kind, args, label)
+
+
+FactItem = Union[str, FactRef]
 
 
 @dataclass(frozen=True)
@@ -21,3 +53,142 @@ class TraceStep:
     granularity: str = "macro"
     parents: List[str] = field(default_factory=list)
     meta: Dict[str, str] = field(default_factory=dict)
+    # Structured reference for the fact labels above that have one.
+    fact_refs: Dict[str, FactRef] = field(default_factory=dict)
+
+
+def build_step(
+    step_id: str,
+    *,
+    prism: str,
+    label: str,
+    space: str = "construction_space",
+    uses: Optional[List[str]] = None,
+    creates: Optional[List[str]] = None,
+    asserts: Optional[Sequence[FactItem]] = None,
+    rewrites: Optional[Sequence[FactItem]] = None,
+    used_facts: Optional[Sequence[FactItem]] = None,
+    created_objects: Optional[List[str]] = None,
+    derived_facts: Optional[Sequence[FactItem]] = None,
+    phase: str = "",
+    granularity: str = "macro",
+    parents: Optional[List[str]] = None,
+    meta: Optional[Dict[str, Any]] = None,
+) -> TraceStep:
+    """Build a :class:`TraceStep`, defaulting lists and stringifying ``meta``.
+
+    Facts may be given as :class:`FactRef`; the step lists their labels and
+    keeps the references in ``fact_refs``.
+    """
+    refs: Dict[str, FactRef] = {}
+    return TraceStep(
+        id=step_id,
+        prism=prism,
+        label=label,
+        space=space,
+        uses=uses or [],
+        creates=creates or [],
+        asserts=_fact_labels(asserts, refs),
+        rewrites=_fact_labels(rewrites, refs),
+        used_facts=_fact_labels(used_facts, refs),
+        created_objects=created_objects or [],
+        derived_facts=_fact_labels(derived_facts, refs),
+        phase=phase,
+        granularity=granularity,
+        parents=parents or [],
+        meta={k: str(v) for k, v in (meta or {}).items()},
+        fact_refs=refs,
+    )
+
+
+def _fact_labels(items: Optional[Sequence[FactItem]], refs: Dict[str, FactRef]) -> List[str]:
+    labels: List[str] = []
+    for item in items or ():
+        if isinstance(item, FactRef):
+            refs.setdefault(item.label, item)
+            labels.append(item.label)
+        else:
+            labels.append(item)
+    return labels
+
+
+class TraceRecord:
+    """One node of a state's trace, stored as an immutable parent-linked chain.
+
+    A state only holds the newest node, so copying a state and appending a
+    step are both O(1) and siblings share their whole history.  A node is a
+    hierarchical step (``htrace``), a plain message (``trace`` only), or a
+    step that is also listed in the human-readable trace.  Step ids are the
+    node's position among the steps of its chain.
+
+    A deferred step only holds the prism and the activation it fired on;
+    ``prism.render_step(activation)`` returns the :func:`build_step` keyword
+    arguments.  Children the search discards therefore never format a
+    string.
+    """
+
+    __slots__ = ("parent", "step_length", "trace_length", "message", "in_trace", "prism", "activation", "_step")
+
+    def __init__(
+        self,
+        parent: Optional["TraceRecord"],
+        *,
+        prism: Any = None,
+        activation: Any = None,
+        step: Optional[TraceStep] = None,
+        message: Optional[str] = None,
+        in_trace: bool = True,
+    ) -> None:
+        self.parent = parent
+        self.message = message
+        self.in_trace = in_trace
+        self.prism = prism
+        self.activation = activation
+        self._step = step
+        # Lengths of the step and linear traces ending at this node.
+        self.step_length = (0 if parent is None else parent.step_length) + (message is None)
+        self.trace_length = (0 if parent is None else parent.trace_length) + in_trace
+
+    @property
+    def is_step(self) -> bool:
+        return self.message is None
+
+    @property
+    def index(self) -> int:
+        """Position of this step in the hierarchical trace."""
+        return self.step_length - 1
+
+    @property
+    def step_id(self) -> str:
+        return f"hstep:{self.index}"
+
+    @property
+    def rendered(self) -> bool:
+        return self._step is not None
+
+    @property
+    def step(self) -> TraceStep:
+        if self._step is None:
+            self._step = build_step(self.step_id, **self.prism.render_step(self.activation))
+        return self._step
+
+    @property
+    def label(self) -> str:
+        return self.message if self.message is not None else self.step.label
+
+    def chain(self, stop: Optional["TraceRecord"] = None) -> List["TraceRecord"]:
+        """Nodes after ``stop`` (exclusive) up to this one, oldest first."""
+        nodes: List[TraceRecord] = []
+        node: Optional[TraceRecord] = self
+        while node is not None and node is not stop:
+            nodes.append(node)
+            node = node.parent
+        nodes.reverse()
+        return nodes
+
+    def __repr__(self) -> str:
+        if self.message is not None:
+            return f"TraceRecord(message={self.message!r})"
+        if self._step is None:
+            return f"TraceRecord({self.step_id}, {type(self.prism).__name__}, {self.activation!r})"
+        return f"TraceRecord({self._step!r})"
@@ -1,13 +1,58 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Optional, Tuple
+import copy
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
 
-from .core import Angle, State
+from .core import State
+
+
+@dataclass
+class SearchStats:
+    """Counters and timings collected during one search run."""
+
+    engine: str = ""
+    # Number of states kept after each level (beam) or popped (best-first).
+    beam_sizes: List[int] = field(default_factory=list)
+    expansions: int = 0
+    generated: int = 0
+    duplicates: int = 0
+    goal_checks: int = 0
+    prism_calls: Dict[str, int] = field(default_factory=dict)
+    prism_children: Dict[str, int] = field(default_factory=dict)
+    prism_time: Dict[str, float] = field(default_factory=dict)
+    activations_reused: int = 0
+    # Activations updated from the parent's by ``Prism.update_activations``.
+    activations_updated: int = 0
+    activations_recomputed: int = 0
+    # Prism expansions replayed from / added to the ``PrismMemo``.
+    memo_hits: int = 0
+    memo_misses: int = 0
+    # With ``workers``: beam states the workers rebuilt from their parent
+    # and delta, and states shipped to them in full.
+    states_from_parent: int = 0
+    states_shipped: int = 0
+    best_score: int = 0
+    wall_time: float = 0.0
+
+    def snapshot(self) -> "SearchStats":
+        """An independent copy of the counters as they are now."""
+        return copy.deepcopy(self)
+
+    @property
+    def memo_hit_rate(self) -> float:
+        lookups = self.memo_hits + self.memo_misses
+        return self.memo_hits / lookups if lookups else 0.0
+
+    def record_prism(self, prism: str, calls: int, children: int, elapsed: float) -> None:
+        self.prism_calls[prism] = self.prism_calls.get(prism, 0) + calls
+        self.prism_children[prism] = self.prism_children.get(prism, 0) + children
+        self.prism_time[prism] = self.prism_time.get(prism, 0.0) + elapsed
 
 
 @dataclass(frozen=True)
 class SearchResult:
     solved: bool
     state: State
-    target: Optional[Tuple[Angle, Angle]]
+    target: Optional[Tuple[Any, Any]]
+    stats: Optional[SearchStats] = field(default=None, compare=False)
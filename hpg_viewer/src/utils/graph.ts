@@ -197,6 +197,16 @@ export const filterGraph = (
   return { nodes, edges };
 };
 
+// Node centre written by the exporter's layout stage (meta x/y), if any.
+const getPrecomputedPosition = (node: HPGNode): { x: number; y: number } | null => {
+  const x = Number(node.meta?.x);
+  const y = Number(node.meta?.y);
+  if (node.meta?.x === undefined || node.meta?.y === undefined || !Number.isFinite(x) || !Number.isFinite(y)) {
+    return null;
+  }
+  return { x, y };
+};
+
 export const toFlowElements = (
   graph: HPGGraph,
   highlightGoalPath: boolean,
@@ -232,6 +242,18 @@ export const toFlowElements = (
     };
   });
 
+  const precomputed = graph.nodes.map(getPrecomputedPosition);
+  if (nodes.length > 0 && precomputed.every((position) => position !== null)) {
+    const layoutNodes = nodes.map((node, index) => {
+      const position = precomputed[index] as { x: number; y: number };
+      return {
+        ...node,
+        position: { x: position.x - 90, y: position.y - 28 },
+      };
+    });
+    return { nodes: layoutNodes, edges };
+  }
+
   const dagreGraph = new dagre.graphlib.Graph();
   dagreGraph.setDefaultEdgeLabel(() => ({}));
   dagreGraph.setGraph({ rankdir: 'LR', ranksep: 90, nodesep: 40 });
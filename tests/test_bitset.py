@@ -0,0 +1,39 @@
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from euclid_reasoner.bitset import BitSet, BitsetFacts
+from euclid_reasoner.core import Facts, Segment, State
+from euclid_reasoner.prisms import all_prisms
+from euclid_reasoner.search import beam_search, goal_checker_prop5
+
+
+def test_bitset_family_forks_and_reports_delta() -> None:
+    facts = BitsetFacts()
+    facts.add_on_ray("D1", "BA")
+    facts.add_eqseg(Segment("B", "D1"), Segment("B", "E_D1"))
+
+    child = facts.copy()
+    assert isinstance(child.on_rays, BitSet)
+    child.add_on_ray("E_D1", "BC")
+
+    assert len(facts.on_rays) == 1 and len(child.on_rays) == 2
+    assert [f.point for f in child.on_rays.delta()] == ["E_D1"]
+    assert child.has_eqseg(Segment("B", "E_D1"), Segment("B", "D1"))
+    assert not child.add_on_ray("D1", "BA")
+
+    plain = Facts()
+    plain.add_on_ray("E_D1", "BC")
+    plain.add_on_ray("D1", "BA")
+    plain.add_eqseg(Segment("B", "D1"), Segment("B", "E_D1"))
+    assert plain.fingerprint() == child.fingerprint()
+
+
+def test_search_runs_unchanged_on_bitset_facts() -> None:
+    plain = beam_search(State(), all_prisms(), goal_fn=goal_checker_prop5)
+    bitset = beam_search(State(facts=BitsetFacts()), all_prisms(), goal_fn=goal_checker_prop5)
+
+    assert bitset.solved is plain.solved is True
+    assert bitset.state.fingerprint() == plain.state.fingerprint()
+    assert list(bitset.state.trace) == list(plain.state.trace)
@@ -0,0 +1,95 @@
+import os
+import sys
+from functools import partial
+from pathlib import Path
+from typing import Optional
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from euclid_reasoner.bitset import BitsetFacts
+from euclid_reasoner.cache import SolveCache, cache_key, cached_beam_search, dumps_result
+from euclid_reasoner.core import Facts, State
+from euclid_reasoner.demo_prop9 import solve_prop9
+from euclid_reasoner.goals import Prop9Goal
+from euclid_reasoner.prisms import all_prisms
+from euclid_reasoner.search import goal_checker_prop5, goal_checker_prop9
+
+
+def test_memory_tier_returns_an_independent_copy() -> None:
+    cache = SolveCache()
+    first = solve_prop9(cache=cache)
+    second = solve_prop9(cache=cache)
+
+    assert second is not first and second.state is not first.state
+    assert second.target == first.target
+    assert second.state.fingerprint() == first.state.fingerprint()
+    assert (cache.hits, cache.misses) == (1, 1)
+    second.state.add_trace("scribble")
+    assert list(solve_prop9(cache=cache).state.trace) == list(first.state.trace)
+
+
+def test_disk_tier_round_trips_a_result(tmp_path: Path) -> None:
+    fresh = solve_prop9(cache=False)
+    solve_prop9(cache=SolveCache(tmp_path))
+
+    cached = solve_prop9(cache=SolveCache(tmp_path))
+    assert cached.solved and cached.target == fresh.target
+    assert list(cached.state.trace) == list(fresh.state.trace)
+    assert list(cached.state.htrace) == list(fresh.state.htrace)
+    assert cached.state.fingerprint() == fresh.state.fingerprint()
+    assert cached.stats.expansions == fresh.stats.expansions
+
+
+def test_key_covers_goal_and_budget_and_skips_anonymous_goals() -> None:
+    start, prisms = State(), all_prisms()
+    base = cache_key(start, prisms, goal_checker_prop9, 20, 10)
+
+    assert base == cache_key(State(), all_prisms(), goal_checker_prop9, 20, 10)
+    assert base != cache_key(start, prisms, goal_checker_prop5, 20, 10)
+    assert base != cache_key(start, prisms, goal_checker_prop9, 20, 9)
+    assert cache_key(start, prisms, lambda state: None, 20, 10) is None
+
+
+def test_results_keep_the_fact_backend_they_were_searched_with() -> None:
+    prisms = all_prisms()
+    plain = cache_key(State(), prisms, goal_checker_prop5, 20, 10)
+    assert plain != cache_key(State(facts=BitsetFacts()), prisms, goal_checker_prop5, 20, 10)
+
+    cache = SolveCache()
+    for facts_class in (BitsetFacts, BitsetFacts, Facts):
+        result = cached_beam_search(State(facts=facts_class()), prisms, goal_fn=goal_checker_prop5, cache=cache)
+        assert type(result.state.facts) is facts_class
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def _accept_if(flag: bool, state: State) -> Optional[tuple]:
+    return ("goal", "goal") if flag else None
+
+
+class _ParamGoal(Prop9Goal):
+    def __init__(self, strict: bool) -> None:
+        self.strict = strict
+
+
+def test_goals_with_bound_arguments_or_state_are_not_cached() -> None:
+    start, prisms = State(), all_prisms()
+
+    assert cache_key(start, prisms, partial(_accept_if, True), 5, 10) is None
+    assert cache_key(start, prisms, _ParamGoal(True), 5, 10) is None
+    assert cache_key(start, prisms, _accept_if, 5, 10) is not None
+
+    cache = SolveCache()
+    assert cached_beam_search(start, prisms, goal_fn=partial(_accept_if, True), beam_k=5, cache=cache).solved
+    assert not cached_beam_search(start, prisms, goal_fn=partial(_accept_if, False), beam_k=5, cache=cache).solved
+
+
+def test_disk_tier_evicts_least_recently_used_entries(tmp_path: Path) -> None:
+    result = solve_prop9(cache=False)
+    size = len(dumps_result(result))
+    cache = SolveCache(tmp_path, max_bytes=2 * size)
+
+    for stamp, key in enumerate(("a", "b", "c"), start=1):
+        cache.put(key, result)
+        os.utime(tmp_path / f"{key}.bin", (stamp, stamp))
+
+    assert sorted(path.stem for path in tmp_path.glob("*.bin")) == ["b", "c"]
@@ -0,0 +1,53 @@
+import random
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from euclid_reasoner.congruence import sss_index
+from euclid_reasoner.core import Segment, State, Triangle, match_sss
+
+
+def _brute_force_pairs(state: State) -> set:
+    tris = list(dict.fromkeys(state.triangles))
+    pairs = set()
+    for i in range(len(tris)):
+        for j in range(i + 1, len(tris)):
+            if match_sss(state.facts, tris[i], tris[j]) is not None:
+                pairs.add((tris[i], tris[j]))
+    return pairs
+
+
+def test_incremental_index_matches_full_scan_across_generations() -> None:
+    rng = random.Random(7)
+    points = [f"P{i}" for i in range(9)]
+    state = State()
+
+    for generation in range(8):
+        # Query the parent before forking so each child extends a cached index.
+        sss_index(state)
+        state = state.copy()
+        for _ in range(4):
+            a, b, c = rng.sample(points, 3)
+            state.triangles.append(Triangle(f"T_{a}{b}{c}", (a, b, c)))
+        for _ in range(6):
+            p, q, r, s = rng.sample(points, 4)
+            state.facts.add_eqseg(Segment(p, q), Segment(r, s))
+
+        found = {(t1, t2) for t1, t2, _ in sss_index(state).ordered_matches()}
+        assert found == _brute_force_pairs(state), generation
+
+
+def test_parent_mutated_after_copy_falls_back_to_full_build() -> None:
+    parent = State()
+    parent.triangles.extend([Triangle("T1", ("A", "B", "C")), Triangle("T2", ("X", "Y", "Z"))])
+    sss_index(parent)
+    child = parent.copy()
+    parent.facts.add_eqseg(Segment("A", "B"), Segment("Q", "R"))
+
+    child.facts.add_eqseg(Segment("A", "B"), Segment("X", "Y"))
+    child.facts.add_eqseg(Segment("B", "C"), Segment("Y", "Z"))
+    child.facts.add_eqseg(Segment("C", "A"), Segment("Z", "X"))
+
+    assert [(t1.name, t2.name) for t1, t2, _ in sss_index(child).ordered_matches()] == [("T1", "T2")]
+    assert not sss_index(parent).ordered_matches()
@@ -0,0 +1,68 @@
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from euclid_reasoner.core import (
+    Angle,
+    Facts,
+    Segment,
+    Triangle,
+    TriangleCorrespondence,
+    derive_angles_from_correspondence,
+    match_sss,
+)
+from euclid_reasoner.equality import EqualityClosure
+
+
+def test_closure_is_transitive_and_forks_are_isolated() -> None:
+    closure = EqualityClosure([("a", "b")])
+    child = closure.fork()
+    child.union("b", "c")
+
+    assert child.same("a", "c")
+    assert not closure.same("a", "c")
+    assert closure.same("a", "b")
+    assert not closure.same("x", "x")
+    assert closure.union("a", "b") is None
+
+
+def test_has_eqseg_sees_transitive_equalities() -> None:
+    facts = Facts()
+    facts.add_eqseg(Segment("A", "B"), Segment("C", "D"))
+    facts.add_eqseg(Segment("D", "C"), Segment("E", "F"))
+
+    assert facts.has_eqseg(Segment("B", "A"), Segment("F", "E"))
+    assert len(facts.eq_segs) == 2
+
+
+def test_match_sss_uses_classes_and_skips_trivial_self_match() -> None:
+    facts = Facts()
+    facts.add_eqseg(Segment("A", "B"), Segment("X", "Y"))
+    facts.add_eqseg(Segment("X", "Y"), Segment("P", "Q"))
+    facts.add_eqseg(Segment("B", "C"), Segment("Q", "R"))
+    facts.add_eqseg(Segment("C", "A"), Segment("R", "P"))
+
+    t1 = Triangle("T1", ("A", "B", "C"))
+    t2 = Triangle("T2", ("R", "Q", "P"))
+
+    assert match_sss(facts, t1, t2) == (("A", "P"), ("B", "Q"), ("C", "R"))
+    assert match_sss(facts, t1, t1) is None
+
+
+def test_angle_spellings_collapse_into_one_canonical_fact() -> None:
+    assert Angle("C", "B", "A") == Angle("A", "B", "C")
+
+    # Self-correspondence of an isosceles triangle swapping its base vertices.
+    corr = TriangleCorrespondence(
+        Triangle("T", ("A", "B", "C")),
+        Triangle("T", ("A", "B", "C")),
+        (("A", "C"), ("B", "B"), ("C", "A")),
+    )
+    facts = Facts()
+    for ang1, ang2 in derive_angles_from_correspondence(corr, facts.symbols):
+        facts.add_eqang(ang1, ang2)
+    facts.add_eqang(Angle("B", "A", "C"), Angle("A", "C", "B"))
+
+    assert len(facts.eq_angs) == 2
+    assert facts.has_eqang(Angle("C", "A", "B"), Angle("B", "C", "A"))
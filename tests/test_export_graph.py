@@ -1,3 +1,5 @@
+import io
+import json
 import sys
 from pathlib import Path
 
@@ -5,7 +7,9 @@ sys.path.append(str(Path(__file__).resolve().parents[1]))
 
 from euclid_reasoner.core import State
 from euclid_reasoner.demo_prop9 import solve_prop9
-from euclid_reasoner.exporters import hpg_to_graph_json, result_to_hpg
+from euclid_reasoner.exporters import hpg_to_chunks, hpg_to_graph_json, result_to_hpg, write_graph_json
+from euclid_reasoner.hpg_model import dumps_graph_json
+from euclid_reasoner.trace_schema import fact_ref
 from euclid_reasoner.types import SearchResult
 
 
@@ -145,3 +149,75 @@ def test_fact_space_nodes_are_marked_auxiliary() -> None:
     fact_space_views = [node for node in hpg["nodes"] if node["kind"] == "view" and node.get("space_id") == "fact_space"]
     assert fact_space_views
     assert any(node["meta"].get("auxiliary") == "true" for node in fact_space_views)
+
+
+def test_streaming_export_matches_in_memory_json() -> None:
+    result = solve_prop9()
+    expected = hpg_to_graph_json(result_to_hpg(result))
+
+    pretty, compact = io.StringIO(), io.StringIO()
+    write_graph_json(result, pretty)
+    write_graph_json(result, compact, indent=None)
+
+    assert pretty.getvalue() == json.dumps(expected, indent=2, sort_keys=True)
+    assert pretty.getvalue() == dumps_graph_json(expected)
+    assert compact.getvalue() == dumps_graph_json(expected, indent=None)
+    assert compact.getvalue() == json.dumps(expected, sort_keys=True, separators=(",", ":"))
+
+
+def test_entity_used_and_created_in_one_step_is_reinterpreted_not_explored() -> None:
+    state = State()
+    state.add_step(prism="P", label="place", space="construction_space", creates=["point:X"])
+    state.add_step(prism="Q", label="reuse", space="triangle_space", uses=["point:X"], creates=["point:X"])
+
+    hpg = result_to_hpg(SearchResult(solved=False, state=state, target=None))
+    edges = {(edge["type"], edge["from"], edge["to"]) for edge in hpg["edges"]}
+    old_view = "view:construction_space:point:X:constructed_point"
+    new_view = "view:triangle_space:point:X:triangle_vertex_candidate"
+
+    assert ("reinterprets", new_view, old_view) in edges
+    assert ("explores", new_view, old_view) not in edges
+    assert ("uses", "projection:hstep:1", new_view) in edges
+
+
+def test_trace_steps_carry_structured_fact_refs() -> None:
+    result = solve_prop9()
+    step = result.state.htrace[-1]
+    goal = fact_ref("EqAng", *result.target)
+
+    for label in [*step.asserts, *step.rewrites, *step.used_facts, *step.derived_facts]:
+        assert step.fact_refs[label].label == label
+    assert fact_ref("EqSeg", "AB", "CD") == fact_ref("EqSeg", "CD", "AB")
+    assert goal in step.fact_refs.values()
+    assert {ref.kind for ref in step.fact_refs.values()} == {"Congruent", "Correspondence", "EqAng", "EqSeg"}
+
+    hpg = result_to_hpg(result)
+    assert [edge["from"] for edge in hpg["edges"] if edge["type"] == "supports_goal"] == [f"fact:{goal.label}"]
+
+
+def test_chunks_partition_the_graph_by_space_and_step_window() -> None:
+    hpg = result_to_hpg(solve_prop9())
+    manifest, chunks = hpg_to_chunks(hpg, step_window=2)
+
+    node_ids = [node["id"] for chunk in chunks.values() for node in chunk["nodes"]]
+    assert sorted(node_ids) == sorted(node["id"] for node in hpg["nodes"])
+    assert sum(len(chunk["edges"]) for chunk in chunks.values()) == len(hpg["edges"])
+
+    chunk_of = {node["id"]: chunk_id for chunk_id, chunk in chunks.items() for node in chunk["nodes"]}
+    cross = {}
+    for chunk_id, chunk in chunks.items():
+        for edge in chunk["edges"]:
+            assert chunk_of[edge["from"]] == chunk_id
+            if chunk_of[edge["to"]] != chunk_id:
+                key = (chunk_id, chunk_of[edge["to"]])
+                cross[key] = cross.get(key, 0) + 1
+    assert {(c["from"], c["to"]): c["edges"] for c in manifest["cross_chunk_edges"]} == cross
+
+    for entry in manifest["chunks"]:
+        chunk = chunks[entry["id"]]
+        assert (entry["nodes"], entry["edges"]) == (len(chunk["nodes"]), len(chunk["edges"]))
+        if entry["steps"] is not None:
+            start, end = entry["steps"]
+            assert end - start == 1 and start % 2 == 0
+    assert chunk_of["projection:hstep:0"].endswith("steps-0000-0001")
+    assert all(chunk_of[node["id"]].endswith(".static") for node in hpg["nodes"] if node["kind"] == "space")
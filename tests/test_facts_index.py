@@ -0,0 +1,60 @@
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from euclid_reasoner.core import Angle, Facts, OnRay, Segment, State, Triangle
+
+
+def test_indexes_follow_adds_and_stay_isolated_across_copies() -> None:
+    facts = Facts()
+    facts.add_on_ray("D2", "BA")
+    facts.add_on_ray("D1", "BA")
+    facts.add_on_ray("E_D1", "BC")
+
+    child = facts.copy()
+    child.add_on_ray("D0", "BA")
+    child.add_eqang(Angle("D1", "B", "F"), Angle("E_D1", "B", "F"))
+    child.add_eqseg(Segment("B", "D1"), Segment("B", "E_D1"))
+
+    assert facts.all_points_on_ray("BA") == ["D1", "D2"]
+    assert child.all_points_on_ray("BA") == ["D0", "D1", "D2"]
+    assert child.all_points_on_ray("BC") == ["E_D1"]
+    child.add_on_ray("D1", "BC")
+    assert facts.rays_through("D1") == ["BA"]
+    assert child.rays_through("D1") == ["BA", "BC"]
+    assert child.rays_through("F") == []
+    assert facts.eqang_with_vertex("B") == []
+    assert len(child.eqang_with_vertex("B")) == 1
+    assert child.segments_at("D1") == [Segment("B", "D1")]
+    assert set(child.segments_at("B")) == {Segment("B", "D1"), Segment("B", "E_D1")}
+
+
+def test_indexes_are_built_for_facts_passed_to_the_constructor() -> None:
+    facts = Facts(
+        on_rays={OnRay("D1", "BA")},
+        eq_segs={(Segment("A", "B"), Segment("B", "C"))},
+    )
+    facts.add_eqseg(Segment("B", "C"), Segment("C", "A"))
+
+    assert facts.all_points_on_ray("BA") == ["D1"]
+    assert facts.rays_through("D1") == ["BA"]
+    classes = facts.triangle_side_classes(Triangle("T", ("A", "B", "C")))
+    assert len(set(classes)) == 1 and None not in classes
+
+
+def test_symbol_table_interns_primitives_and_orders_pairs_canonically() -> None:
+    state = State()
+    sym = state.symbols
+    child = state.copy()
+
+    assert child.symbols is sym
+    assert sym.segment("D1", "B") is sym.segment("B", "D1") == Segment("B", "D1")
+    assert sym.name("F_", "D1", "_", "E_D1") is sym.name("F_", "D1", "_", "E_D1")
+    assert sym.sides(("A", "B", "C"))[1] is sym.segment("C", "B")
+    assert sym.id(sym.angle("A", "B", "C")) == sym.id(Angle("A", "B", "C"))
+
+    seg_bd, seg_be = sym.segment("B", "D1"), sym.segment("B", "E_D1")
+    child.facts.add_eqseg(seg_be, seg_bd)
+    assert list(child.facts.eq_segs) == [(seg_bd, seg_be)]
+    assert not child.facts.add_eqseg(seg_bd, seg_be)
@@ -0,0 +1,46 @@
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from euclid_reasoner.agenda import Agenda
+from euclid_reasoner.core import Segment, State
+from euclid_reasoner.demo_prop10 import find_prop10_goal
+from euclid_reasoner.goals import goal_checker_prop5, goal_checker_prop9, goal_checker_prop10
+from euclid_reasoner.prisms import all_prisms
+
+
+def test_incremental_goals_agree_with_full_evaluation() -> None:
+    goals = (goal_checker_prop5, goal_checker_prop9, goal_checker_prop10)
+    agenda = Agenda(all_prisms())
+    frontier = [State()]
+    hits = {goal: 0 for goal in goals[:2]}
+    for _ in range(6):
+        children = [res.state for state in frontier for res in agenda.expand(state)]
+        for child in children:
+            for goal in goals:
+                full = goal.check(child)
+                if goal.check(child.parent) is None:
+                    assert goal.check_child(child) == full
+                if goal in hits:
+                    hits[goal] += full is not None
+        frontier = children
+
+    assert all(hits.values())
+
+
+def test_prop10_goal_sees_equalities_completed_by_a_later_point() -> None:
+    state = State()
+    state.facts.add_on_ray("X", "BA")
+    state.facts.add_eqseg(Segment("M", "X"), Segment("M", "Y"))
+    assert goal_checker_prop10(state) is None
+
+    child = state.copy()
+    child.facts.add_on_ray("Y", "BA")
+    expected = (Segment("M", "X"), Segment("M", "Y"))
+    assert goal_checker_prop10.check_child(child) == expected
+    assert find_prop10_goal(child) == expected
+
+    sibling = state.copy()
+    sibling.facts.add_on_ray("Y", "BC")
+    assert goal_checker_prop10.check_child(sibling) is None
@@ -0,0 +1,61 @@
+import json
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from euclid_reasoner.demo_prop9 import solve_prop9
+from euclid_reasoner.exporters import result_to_hpg
+from euclid_reasoner.hpg_binary import HPGBinaryReader, dumps_hpg_binary, load_hpg_binary, write_hpg_binary
+
+
+def test_binary_container_round_trips_an_export() -> None:
+    hpg = result_to_hpg(solve_prop9())
+
+    for compress in (True, False):
+        assert load_hpg_binary(dumps_hpg_binary(hpg, compress=compress)) == hpg
+    assert len(dumps_hpg_binary(hpg)) * 10 < len(json.dumps(hpg, indent=2, sort_keys=True))
+
+
+def test_reader_maps_the_file_and_decodes_records_on_access(tmp_path: Path) -> None:
+    hpg = result_to_hpg(solve_prop9())
+    path = tmp_path / "prop9.hpgb"
+    write_hpg_binary(hpg, path, compress=False)
+
+    with HPGBinaryReader(path) as reader:
+        assert not reader.compressed
+        assert len(reader.nodes) == len(hpg["nodes"])
+        assert reader.nodes[-1] == hpg["nodes"][-1]
+        assert reader.edges[1:3] == hpg["edges"][1:3]
+        assert list(reader.edges) == hpg["edges"]
+
+
+def test_reader_rejects_other_files() -> None:
+    with pytest.raises(ValueError):
+        HPGBinaryReader(b"\0" * 64)
+
+
+def test_reader_closes_the_file_when_the_header_is_rejected(tmp_path: Path) -> None:
+    if not os.path.isdir("/proc/self/fd"):
+        pytest.skip("needs /proc to count open files")
+    path = tmp_path / "bogus.hpgb"
+    path.write_bytes(b"\0" * 64)
+
+    before = len(os.listdir("/proc/self/fd"))
+    # Keeping the tracebacks keeps the half-built readers alive.
+    failures = []
+    for _ in range(5):
+        with pytest.raises(ValueError) as failure:
+            HPGBinaryReader(path)
+        failures.append(failure)
+    assert len(os.listdir("/proc/self/fd")) == before
+
+
+def test_none_values_are_rejected_rather_than_dropped() -> None:
+    with pytest.raises(TypeError):
+        dumps_hpg_binary({"nodes": [{"id": "a", "label": None, "meta": {}}], "edges": []})
+    with pytest.raises(TypeError):
+        dumps_hpg_binary({"nodes": [{"id": "a", "meta": {"x": None}}], "edges": []})
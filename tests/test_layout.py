@@ -0,0 +1,88 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from euclid_reasoner.demo_prop9 import solve_prop9
+from euclid_reasoner.exporters import result_to_hpg
+from euclid_reasoner.hpg_binary import dumps_hpg_binary, load_hpg_binary
+from euclid_reasoner.layout import LayoutCache, STEP_SEPARATION, apply_layout, graph_hash, layout_hpg
+
+
+def test_layout_is_deterministic_and_follows_proof_steps() -> None:
+    hpg = result_to_hpg(solve_prop9())
+    positions = layout_hpg(hpg, seed=3, iterations=60, time_budget=None, backend="python")
+
+    assert set(positions) == {node["id"] for node in hpg["nodes"]}
+    assert positions == layout_hpg(hpg, seed=3, iterations=60, time_budget=None, backend="python")
+    assert min(x for x, _ in positions.values()) == 0.0
+    first = positions["projection:hstep:0"][0]
+    last = positions["projection:hstep:4"][0]
+    assert last - first > 2 * STEP_SEPARATION
+
+
+def test_layout_cache_skips_unchanged_graphs(tmp_path: Path) -> None:
+    hpg = result_to_hpg(solve_prop9())
+    positions = layout_hpg(hpg, iterations=20, time_budget=None, cache=LayoutCache(tmp_path), backend="python")
+
+    relabelled = result_to_hpg(solve_prop9())
+    relabelled["nodes"][0]["label"] = "renamed"
+    assert graph_hash(relabelled) == graph_hash(hpg)
+    cache = LayoutCache(tmp_path)
+    assert layout_hpg(relabelled, iterations=20, time_budget=None, cache=cache, backend="python") == positions
+    assert (cache.hits, cache.misses) == (1, 0)
+
+    layout_hpg(hpg, seed=1, iterations=20, time_budget=None, cache=cache, backend="python")
+    assert cache.misses == 1
+
+
+def test_budget_cut_layouts_are_only_served_to_the_same_budget() -> None:
+    hpg = result_to_hpg(solve_prop9())
+    cache = LayoutCache()
+
+    layout_hpg(hpg, iterations=20, time_budget=0.0, cache=cache, backend="python")
+    full = layout_hpg(hpg, iterations=20, time_budget=None, cache=cache, backend="python")
+    assert (cache.hits, cache.misses) == (0, 2)
+    assert full == layout_hpg(hpg, iterations=20, time_budget=None, backend="python")
+    assert layout_hpg(hpg, iterations=20, time_budget=60.0, cache=cache, backend="python") == full
+    assert cache.hits == 1
+
+    other = LayoutCache()
+    cut = layout_hpg(hpg, iterations=20, time_budget=0.0, cache=other, backend="python")
+    assert cut != full
+    assert layout_hpg(hpg, iterations=20, time_budget=0.0, cache=other, backend="python") == cut
+    assert layout_hpg(hpg, iterations=20, time_budget=None, cache=other, backend="python") == full
+    assert (other.hits, other.misses) == (1, 2)
+
+
+def test_large_graph_cut_by_the_budget_is_reused_on_the_next_export(tmp_path: Path) -> None:
+    nodes = [{"id": f"n{i}", "kind": "object"} for i in range(400)]
+    edges = [{"from": f"n{i}", "to": f"n{(i * 7 + 1) % 400}"} for i in range(400)]
+    hpg = {"nodes": nodes, "edges": edges}
+
+    first = layout_hpg(hpg, iterations=10_000, time_budget=0.05, cache=LayoutCache(tmp_path), backend="python")
+    cache = LayoutCache(tmp_path)
+    assert layout_hpg(hpg, iterations=10_000, time_budget=0.05, cache=cache, backend="python") == first
+    assert (cache.hits, cache.misses) == (1, 0)
+
+
+def test_applied_layout_survives_the_binary_container() -> None:
+    hpg = result_to_hpg(solve_prop9())
+    apply_layout(hpg, layout_hpg(hpg, iterations=10, time_budget=None, backend="python"))
+
+    node = load_hpg_binary(dumps_hpg_binary(hpg))["nodes"][0]
+    assert float(node["meta"]["x"]) >= 0.0 and float(node["meta"]["y"]) >= 0.0
+
+
+def test_numpy_backend_matches_the_python_grid() -> None:
+    pytest.importorskip("numpy")
+    hpg = result_to_hpg(solve_prop9())
+
+    # Summation order differs, so long runs drift apart; short ones agree.
+    expected = layout_hpg(hpg, seed=2, iterations=30, time_budget=None, backend="python")
+    actual = layout_hpg(hpg, seed=2, iterations=30, time_budget=None, backend="numpy")
+    assert actual.keys() == expected.keys()
+    for node_id, (x, y) in expected.items():
+        assert actual[node_id] == pytest.approx((x, y), abs=0.5)
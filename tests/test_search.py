@@ -0,0 +1,207 @@
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from euclid_reasoner.agenda import Agenda
+from euclid_reasoner.core import Segment, State
+from euclid_reasoner.demo_prop9 import solve_prop9
+from euclid_reasoner.memo import PrismMemo
+from euclid_reasoner.prisms import all_prisms
+from euclid_reasoner.search import (
+    SearchObserver,
+    TranspositionTable,
+    beam_search,
+    best_first_search,
+    goal_checker_prop5,
+    goal_checker_prop9,
+    goal_checker_prop10,
+    multi_goal_search,
+    weighted_astar_search,
+)
+
+
+def test_fingerprint_ignores_the_order_facts_were_added() -> None:
+    first = State()
+    first.facts.add_on_ray("D1", "BA")
+    first.facts.add_eqseg(Segment("B", "D1"), Segment("B", "E_D1"))
+
+    second = State().copy()
+    second.facts.add_eqseg(Segment("E_D1", "B"), Segment("D1", "B"))
+    second = second.copy()
+    second.facts.add_on_ray("D1", "BA")
+    second.mode = "Other"
+
+    assert first.fingerprint() == second.fingerprint()
+
+    second.facts.add_on_ray("D2", "BA")
+    assert first.fingerprint() != second.fingerprint()
+
+
+def test_transposition_table_drops_duplicate_states() -> None:
+    table = TranspositionTable()
+    result = solve_prop9(transpositions=table)
+
+    assert result.solved is True
+    assert table.hits > 0
+    assert table.misses == len(table)
+
+
+def test_agenda_matches_direct_application_and_reuses_activations() -> None:
+    prisms = all_prisms()
+    agenda = Agenda(prisms)
+    frontier = [State()]
+
+    for _ in range(4):
+        children = []
+        for state in frontier:
+            scheduled = [res.description for res in agenda.expand(state)]
+            direct = [res.description for prism in prisms for res in prism.apply(state)]
+            assert scheduled == direct
+            children.extend(res.state for res in agenda.expand(state))
+        frontier = children[:6]
+
+    assert agenda.reused > 0
+
+
+def test_agenda_updates_activations_from_the_delta_and_drops_dead_ones() -> None:
+    prisms = all_prisms()
+    agenda = Agenda(prisms)
+    frontier = [State()]
+
+    for _ in range(4):
+        children = []
+        for state in frontier:
+            children.extend(res.state for res in agenda.expand(state))
+        for child in children:
+            delta = child.delta()
+            for prism in prisms:
+                scheduled = agenda.activations(prism, child, delta)
+                full = prism.activations(child, delta)
+                assert scheduled == [a for a in full if a in scheduled]
+                assert all(not prism.fire(child, a) for a in full if a not in scheduled)
+        frontier = children[:6]
+
+    assert agenda.updated > 0
+    assert agenda.recomputed < agenda.updated + agenda.reused
+
+
+def test_memoized_expansion_replays_the_same_children() -> None:
+    prisms = all_prisms()
+    agenda = Agenda(prisms, memo=PrismMemo())
+    frontier = [State()]
+
+    for _ in range(5):
+        children = []
+        for state in frontier:
+            replayed = list(agenda.expand(state))
+            direct = [res for prism in prisms for res in prism.apply(state)]
+            assert [res.description for res in replayed] == [res.description for res in direct]
+            assert [res.state.fingerprint() for res in replayed] == [res.state.fingerprint() for res in direct]
+            assert [res.state.mode for res in replayed] == [res.state.mode for res in direct]
+            children.extend(res.state for res in replayed)
+        frontier = children[:8]
+
+    assert agenda.memo_hits > 0
+
+
+def test_prism_memo_is_shared_across_runs() -> None:
+    memo = PrismMemo()
+    first = beam_search(State(), all_prisms(), memo=memo)
+    second = beam_search(State(), all_prisms(), memo=memo)
+
+    # Keys name only the facts ``fire`` reads, so sibling states hit too.
+    assert first.stats.memo_hit_rate > 0.3
+    assert second.target == first.target
+    assert list(second.state.htrace) == list(first.state.htrace)
+    assert second.stats.memo_misses == 0
+    assert second.stats.memo_hits == first.stats.memo_hits + first.stats.memo_misses
+    assert second.stats.memo_hit_rate == 1.0
+
+
+def test_best_first_and_weighted_astar_solve_prop9_and_prop5() -> None:
+    for goal_fn in (goal_checker_prop9, goal_checker_prop5):
+        for engine in (best_first_search, weighted_astar_search):
+            result = engine(State(), all_prisms(), goal_fn=goal_fn)
+            assert result.solved is True
+            assert result.target == goal_fn(result.state)
+
+
+def test_best_first_search_respects_expansion_limit() -> None:
+    result = best_first_search(State(), all_prisms(), max_expansions=1)
+    assert result.solved is False
+    assert len(result.state.trace) == 1
+
+
+def test_parallel_expansion_matches_serial_run() -> None:
+    serial = beam_search(State(), all_prisms(), goal_fn=goal_checker_prop5)
+    parallel = beam_search(State(), all_prisms(), goal_fn=goal_checker_prop5, workers=2)
+
+    assert parallel.solved == serial.solved
+    assert parallel.target == serial.target
+    assert list(parallel.state.trace) == list(serial.state.trace)
+    assert list(parallel.state.htrace) == list(serial.state.htrace)
+    assert parallel.state.fingerprint() == serial.state.fingerprint()
+
+
+def test_parallel_expansion_tests_unpicklable_goals_in_the_parent() -> None:
+    goals = {"prop9": goal_checker_prop9, "prop10": lambda state: goal_checker_prop10(state)}
+    serial = multi_goal_search(State(), all_prisms(), goals, beam_k=10, steps=6)
+    parallel = multi_goal_search(State(), all_prisms(), goals, beam_k=10, steps=6, workers=2)
+
+    for name in goals:
+        assert parallel[name].solved == serial[name].solved
+        assert parallel[name].target == serial[name].target
+        assert list(parallel[name].state.htrace) == list(serial[name].state.htrace)
+        assert parallel[name].stats.duplicates == serial[name].stats.duplicates
+
+
+class _Recorder(SearchObserver):
+    def __init__(self) -> None:
+        self.levels = []
+        self.expanded = 0
+        self.goals = []
+
+    def on_level(self, level, beam, stats) -> None:
+        self.levels.append((level, len(beam)))
+
+    def on_expand(self, state, children) -> None:
+        self.expanded += 1
+
+    def on_goal(self, state, target, stats) -> None:
+        self.goals.append(target)
+
+
+def test_beam_search_reports_stats_and_notifies_observer() -> None:
+    observer = _Recorder()
+    result = beam_search(State(), all_prisms(), observer=observer)
+    stats = result.stats
+
+    assert result.solved is True
+    assert stats.engine == "beam"
+    assert stats.expansions == observer.expanded > 0
+    assert stats.beam_sizes == [size for _, size in observer.levels]
+    assert 1 < stats.goal_checks <= stats.generated + 1
+    assert stats.prism_calls["CongruenceSSSPrism"] >= 1
+    assert sum(stats.prism_children.values()) == stats.generated
+    assert stats.activations_reused > 0
+    assert observer.goals == [result.target]
+
+
+def test_multi_goal_search_matches_separate_runs() -> None:
+    goals = {"prop5": goal_checker_prop5, "prop9": goal_checker_prop9, "never": lambda state: None}
+    batch = multi_goal_search(State(), all_prisms(), goals)
+
+    assert list(batch) == list(goals)
+    for name, goal_fn in goals.items():
+        alone = beam_search(State(), all_prisms(), goal_fn=goal_fn)
+        assert batch[name].solved == alone.solved
+        assert batch[name].target == alone.target
+        assert list(batch[name].state.trace) == list(alone.state.trace)
+    assert batch["never"].stats.expansions > batch["prop9"].stats.expansions
+
+
+def test_multi_goal_search_respects_shared_budget() -> None:
+    batch = multi_goal_search(State(), all_prisms(), {"never": lambda state: None}, max_expansions=2)
+    assert batch["never"].solved is False
+    assert batch["never"].stats.expansions == 2
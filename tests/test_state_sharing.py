@@ -0,0 +1,115 @@
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from euclid_reasoner.core import Segment, State, Triangle
+from euclid_reasoner.persistent import MAX_LAYER_DEPTH, PersistentList, PersistentSet
+from euclid_reasoner.prisms import ChoosePointOnRayBA
+
+
+def test_child_state_shares_parent_and_isolates_writes() -> None:
+    parent = State()
+    parent.facts.add_on_ray("D1", "BA")
+    parent.add_step(prism="P", label="Choose D1")
+
+    child = parent.copy()
+    child.facts.add_on_ray("E_D1", "BC")
+    child.facts.add_eqseg(Segment("B", "D1"), Segment("B", "E_D1"))
+    child.triangles.append(Triangle("T", ("A", "B", "C")))
+    child.add_step(prism="P", label="Copy BD1")
+
+    assert len(parent.facts.on_rays) == 1
+    assert not parent.facts.eq_segs
+    assert len(parent.triangles) == 0
+    assert list(parent.trace) == ["Choose D1"]
+
+    assert len(child.facts.on_rays) == 2
+    assert child.facts.has_eqseg(Segment("B", "E_D1"), Segment("B", "D1"))
+    assert list(child.trace) == ["Choose D1", "Copy BD1"]
+    assert child.htrace[-1].id == "hstep:1"
+    assert child.facts.on_rays.delta() == [next(f for f in child.facts.on_rays if f.point == "E_D1")]
+
+
+def test_parent_written_after_fork_does_not_leak_into_child() -> None:
+    parent = PersistentSet({1, 2})
+    child = parent.fork()
+    parent.add(3)
+    child.add(4)
+
+    assert set(parent) == {1, 2, 3}
+    assert set(child) == {1, 2, 4}
+    assert child.delta() == [4]
+
+
+def test_deep_lineage_is_compacted_without_losing_items_or_delta() -> None:
+    items = PersistentList([0])
+    for value in range(1, 3 * MAX_LAYER_DEPTH):
+        items = items.fork()
+        items.append(value)
+
+    assert items.depth <= MAX_LAYER_DEPTH
+    assert list(items) == list(range(3 * MAX_LAYER_DEPTH))
+    assert items[-1] == 3 * MAX_LAYER_DEPTH - 1
+    assert items[5] == 5
+    assert items.delta() == [3 * MAX_LAYER_DEPTH - 1]
+
+
+def test_hashed_list_membership_follows_appends_on_every_layer() -> None:
+    parent = PersistentList(["a"], hashed=True)
+    assert "a" in parent and "b" not in parent
+    parent.append("b")
+    child = parent.fork()
+    parent.append("c")
+    child.append("d")
+
+    assert "b" in parent and "c" in parent and "d" not in parent
+    assert "b" in child and "d" in child and "c" not in child
+    assert child.zobrist == PersistentList(["d", "b", "a"], hashed=True).zobrist
+
+
+def test_prism_steps_are_rendered_only_when_the_trace_is_read() -> None:
+    child = ChoosePointOnRayBA().apply(State())[0].state
+    record = child.trace_head
+    assert not record.rendered
+    assert len(child.htrace) == 1
+
+    step = child.htrace[0]
+    assert record.rendered
+    assert step.id == "hstep:0"
+    assert step.label == "Choose D1 on ray BA"
+    assert step.meta["movement"] == "construction"
+    assert list(child.trace) == ["Choose D1 on ray BA"]
+
+
+def test_trace_chain_is_shared_between_siblings_and_ids_follow_depth() -> None:
+    parent = State()
+    parent.add_step(prism="P", label="root")
+    left, right = parent.copy(), parent.copy()
+    left.add_trace("note")
+    left.add_step(prism="P", label="left")
+    right.add_step(prism="P", label="right")
+
+    assert left.trace_head.parent.parent is right.trace_head.parent is parent.trace_head
+    assert list(left.trace) == ["root", "note", "left"]
+    assert [step.id for step in left.htrace] == ["hstep:0", "hstep:1"]
+    assert right.htrace[-1].id == "hstep:1"
+    assert left.trace.delta() == ["note", "left"]
+    assert len(parent.htrace) == 1
+
+
+def test_state_accepts_initial_traces_and_views_append_to_the_chain() -> None:
+    seed = State()
+    seed.add_step(prism="P", label="root")
+    state = State(trace=["given"], htrace=list(seed.htrace))
+
+    assert list(state.trace) == ["given"]
+    assert [step.label for step in state.htrace] == ["root"]
+
+    child = state.copy()
+    child.trace.append("note")
+    child.htrace.append(seed.htrace[0])
+    assert list(child.trace) == ["given", "note"]
+    assert len(child.htrace) == 2
+    assert child.trace.delta() == ["note"]
+    assert list(state.trace) == ["given"]